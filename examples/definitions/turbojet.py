@@ -0,0 +1,26 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[2]))
+
+"""
+Engine definition example
+-------------------------
+Twin-spool turbojet engine with a compressor bleed and an electrical
+power plant, built from its declarative definition.
+"""
+
+from huracan.definition import load, build
+
+definition = load(Path(__file__).parent/'turbojet_1s-2s-bleed.json')
+
+engine = build(definition)
+
+engine.run(log=True)
+
+print(f'Definition digest: {engine.digest}')
+print(f'Thrust:            {engine.stream.thrust_total():.2f} [N]')
+
+engine.stream.plot(x='S', y='t0', show=True, colorblind=True)
@@ -0,0 +1,482 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan architecture search
+---------------------------
+
+Evolutionary search over engine architectures: mixed discrete and
+continuous spaces of turbojet topologies built from the existing
+components, with
+
+- 1 to n compressors, each with its own pressure ratio,
+- their assignment to shafts, each driven by its own turbine,
+- optionally, an intercooler after the first compressor,
+- optionally, an afterburner after the turbines,
+- optionally, a bleed after the first compressor, and its fraction,
+- any other continuous definition values, such as 'cc.t01'.
+
+    s = space(gas, {'LHV': 43e6}, compressors=3, PI=(1.5, 12),
+              intercooler=True, afterburner=True, bleed=(0.005, 0.05),
+              variables={'cc.t01': (1200, 1600)})
+
+    r = search(s, 'sfc', constraints=[constraint('thrust_total', lower=20e3)],
+               population=40, generations=50, workers=8)
+
+    r.definition, r.decisions, r.objective, r.statistics['best']
+
+Candidates are encoded as genomes of values between 0 and 1, and
+decoded into engine definitions (see huracan.definition). Genes
+which do not apply to a candidate (such as the pressure ratio of
+a third compressor in a two-compressor engine) are left out of its
+definition, so that identical engines have identical definitions.
+Each generation is deduplicated through an evaluation cache (see
+huracan.cache), and the engines not in it are run in parallel
+across worker processes.
+"""
+
+import os
+import numpy as np
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+
+from huracan.definition import build
+from huracan.cache import cache as evaluation_cache, key
+
+
+default_specs = {'inlet':              {'type': 'inlet', 'PI': 0.98},
+                 'compressor':         {'type': 'compressor', 'eta': 0.85},
+                 'intercooler':        {'type': 'intercooler', 'eta': 0.95, 'Q_out': 1e6},
+                 'bleed_duct':         {'type': 'bleed_duct', 'eta': 0.95, 't01': 300},
+                 'combustion_chamber': {'type': 'combustion_chamber', 'eta': 0.98, 'PI': 0.96, 't01': 1400},
+                 'turbine':            {'type': 'turbine', 'eta': 0.9},
+                 'afterburner':        {'type': 'afterburner', 'eta': 0.95, 't01': 1800},
+                 'nozzle':             {'type': 'nozzle', 'eta': 0.97},
+                 'shaft':              {'eta': 0.99}}
+
+
+class space:
+    """
+    Architecture space
+    ------------------
+
+    Candidate engines are named as follows:
+
+    - components: inlet 'i', compressors 'c1' to 'c<k>', intercooler
+      'ic', bleed duct 'bd', combustion chamber 'cc', turbines 't1' to
+      't<m>' (turbine j driving shaft j), afterburner 'ab', nozzle 'n'
+    - shafts:     's1' to 's<m>', from low to high pressure
+    - streams:    'core' ending in the nozzle, and, with a bleed, the
+                  'main' stream before it and the 'bleed' stream
+    """
+    def __init__(self, gas, fuel, compressors=3, PI=(1.5, 10), variables=None,
+                 intercooler=False, afterburner=False, bleed=None, specs=None):
+        """
+        :param gas:         Gas specification (see huracan.definition).
+        :param fuel:        Fuel specification.
+        :param compressors: Maximum number of compressors.
+        :param PI:          Bounds of the pressure ratio of each compressor.
+        :param variables:   Bounds of other continuous definition values of
+                            the candidates (see huracan.definition.override),
+                            such as 'cc.t01' or 'ab.t01'. Values of components
+                            absent from a candidate are left out.
+        :param intercooler: Whether to search over the presence of an intercooler.
+        :param afterburner: Whether to search over the presence of an afterburner.
+        :param bleed:       Bounds of the bleed fraction, to search over the
+                            presence of a bleed and its fraction.
+        :param specs:       Component specifications by component type, and
+                            the shaft specification under 'shaft', replacing
+                            the defaults.
+
+        :type gas:          dict
+        :type fuel:         dict
+        :type compressors:  int
+        :type PI:           tuple
+        :type variables:    dict of tuple
+        :type intercooler:  bool
+        :type afterburner:  bool
+        :type bleed:        tuple
+        :type specs:        dict
+        """
+        assert compressors >= 1, 'Architecture space: there must be at least one compressor.'
+
+        self.gas       = gas
+        self.fuel      = fuel
+        self.specs     = {**default_specs, **(specs if specs else {})}
+        self.variables = list(variables.keys()) if variables else []
+
+        # Genes: name, kind and bounds
+        genes = [('compressors', 'integer', (1, compressors))]
+        genes += [(f'c{i}.PI', 'continuous', PI) for i in range(1, compressors + 1)]
+        genes += [(f'c{i}.shaft', 'boolean', None) for i in range(2, compressors + 1)]
+        if intercooler and compressors > 1:
+            genes.append(('intercooler', 'boolean', None))
+        if afterburner:
+            genes.append(('afterburner', 'boolean', None))
+        if bleed is not None:
+            genes += [('bleed', 'boolean', None), ('bleed.fraction', 'continuous', bleed)]
+        genes += [(name, 'continuous', variables[name]) for name in self.variables]
+
+        self.genes    = genes
+        self.discrete = np.array([g[1] != 'continuous' for g in genes])
+
+    def __len__(self):
+        return len(self.genes)
+
+    def random(self, m, rng):
+        """
+        Random genomes.
+
+        :type m:   int
+        :type rng: np.random.Generator
+
+        :rtype: np.ndarray
+        """
+        return rng.random((m, len(self)))
+
+    def decode(self, u):
+        """
+        Decisions encoded by a genome: the values of the genes which
+        apply to the candidate.
+
+        :type u: np.ndarray
+
+        :rtype: dict
+        """
+        values = {}
+        for (name, kind, bounds), v in zip(self.genes, u):
+            if kind == 'integer':
+                values[name] = bounds[0] + min(int(v*(bounds[1] - bounds[0] + 1)), bounds[1] - bounds[0])
+            elif kind == 'boolean':
+                values[name] = bool(v >= 0.5)
+            else:
+                values[name] = float(bounds[0] + v*(bounds[1] - bounds[0]))
+
+        k = values['compressors']
+        decisions = {'compressors': k}
+        for i in range(1, k + 1):
+            decisions[f'c{i}.PI'] = values[f'c{i}.PI']
+
+        # Shaft of each compressor: compressors either share the shaft
+        # of the previous compressor or start a new one
+        shafts = [1]
+        for i in range(2, k + 1):
+            shafts.append(shafts[-1] + values[f'c{i}.shaft'])
+        decisions['shafts'] = shafts
+
+        decisions['intercooler'] = k > 1 and values.get('intercooler', False)
+        decisions['afterburner'] = values.get('afterburner', False)
+        if values.get('bleed', False):
+            decisions['bleed.fraction'] = values['bleed.fraction']
+
+        # Other definition values of the components of the candidate
+        present = ['i', 'cc', 'n'] + [f'c{i}' for i in range(1, k + 1)] + \
+                  [f't{j}' for j in range(1, shafts[-1] + 1)] + \
+                  (['ic'] if decisions['intercooler'] else []) + \
+                  (['ab'] if decisions['afterburner'] else []) + \
+                  (['bd'] if 'bleed.fraction' in decisions else [])
+        for name in self.variables:
+            if name.split('.', 1)[0] in present:
+                decisions[name] = values[name]
+
+        return decisions
+
+    def topology(self, decisions):
+        """
+        Discrete decisions of a candidate.
+
+        :type decisions: dict
+
+        :rtype: tuple
+        """
+        return (decisions['compressors'], tuple(decisions['shafts']), decisions['intercooler'],
+                decisions['afterburner'], 'bleed.fraction' in decisions)
+
+    def definition(self, u):
+        """
+        Engine definition of a genome.
+
+        :type u: np.ndarray
+
+        :rtype: dict
+        """
+        d = self.decode(u)
+        k = d['compressors']
+        m = d['shafts'][-1]
+
+        spec = lambda kind: deepcopy(self.specs[kind])
+
+        components = {'i': spec('inlet')}
+        for i in range(1, k + 1):
+            components[f'c{i}'] = {**spec('compressor'), 'PI': d[f'c{i}.PI']}
+        if d['intercooler']:
+            components['ic'] = spec('intercooler')
+        components['cc'] = {**spec('combustion_chamber'), 'fuel': 'fuel'}
+        for j in range(1, m + 1):
+            components[f't{j}'] = spec('turbine')
+        if d['afterburner']:
+            components['ab'] = {**spec('afterburner'), 'fuel': 'fuel'}
+        components['n'] = spec('nozzle')
+
+        # High pressure turbines first
+        downstream = [f'c{i}' for i in range(2, k + 1)]
+        if d['intercooler']:
+            downstream.insert(0, 'ic')
+        downstream += ['cc'] + [f't{j}' for j in range(m, 0, -1)] + (['ab'] if d['afterburner'] else []) + ['n']
+
+        shafts = {f's{j}': {**spec('shaft'),
+                            'components': [f'c{i}' for i in range(1, k + 1) if d['shafts'][i-1] == j] + [f't{j}']}
+                  for j in range(1, m + 1)}
+
+        definition = {'gas':        deepcopy(self.gas),
+                      'fuels':      {'fuel': deepcopy(self.fuel)},
+                      'components': components,
+                      'shafts':     shafts}
+
+        if 'bleed.fraction' in d:
+            components['bd'] = spec('bleed_duct')
+            definition['streams'] = {'main': ['i', 'c1'], 'core': downstream, 'bleed': ['bd']}
+            definition['splits']  = [{'stream': 'main', 'fraction': d['bleed.fraction'], 'into': ['core', 'bleed']}]
+        else:
+            definition['streams'] = {'core': ['i', 'c1'] + downstream}
+
+        for name in self.variables:
+            if name in d:
+                c, attr = name.split('.', 1)
+                components[c][attr] = d[name]
+
+        return definition
+
+
+def run(definition, outputs):
+    """
+    Outputs of an engine, or non-finite outputs if the engine
+    cannot be run (such as engines whose compressors do not
+    provide enough energy to the flow).
+
+    :type definition: dict
+    :type outputs:    list of str
+
+    :rtype: np.ndarray
+    """
+    try:
+        r = build(definition).run().results(outputs)
+        return np.array([float(np.squeeze(r[o])) for o in outputs])
+    except (AssertionError, ArithmeticError, ValueError):
+        return np.full(len(outputs), np.nan)
+
+
+class result:
+    """
+    Architecture search result
+    --------------------------
+    """
+    def __init__(self, space, u, outputs, objective, violation, statistics, evaluations, hits):
+        """
+        :param space:       Architecture space.
+        :param u:           Genome of the best candidate.
+        :param outputs:     Outputs of the best candidate.
+        :param objective:   Objective of the best candidate.
+        :param violation:   Largest relative constraint violation of the best candidate.
+        :param statistics:  Convergence statistics, by generation.
+        :param evaluations: Number of engine runs.
+        :param hits:        Number of candidates taken from the cache.
+        """
+        self.genome      = u
+        self.decisions   = space.decode(u)
+        self.definition  = space.definition(u)
+        self.outputs     = outputs
+        self.objective   = objective
+        self.violation   = violation
+        self.feasible    = violation <= 1e-6
+        self.statistics  = statistics
+        self.generations = len(statistics['generation']) - 1
+        self.evaluations = evaluations
+        self.hits        = hits
+
+
+def better(f1, v1, f2, v2):
+    """
+    Feasibility rules: feasible candidates are preferred to infeasible
+    ones, and among them those of lower objective (if feasible) or
+    lower constraint violation (if not).
+    """
+    return np.where((v1 <= 1e-6) & (v2 <= 1e-6), f1 <= f2, v1 < v2)
+
+
+def ranking(F, V):
+    """
+    Candidates from best to worst following the feasibility rules.
+    """
+    feasible = V <= 1e-6
+    return np.lexsort((np.where(feasible, F, V), ~feasible))
+
+
+def search(space, objective, constraints=None, maximize=False, population=40, generations=50, elite=2,
+           crossover=0.9, mutation=None, workers=None, cache=None, seed=None, tol=1e-6, patience=10):
+    """
+    Genetic search of the architecture space.
+
+    Parents are selected by binary tournaments following feasibility
+    rules, and their offspring bred by uniform crossover and mutation:
+    continuous genes are perturbed and discrete genes drawn anew. The
+    best candidates of each generation are kept in the next.
+
+    :param space:       Architecture space.
+    :param objective:   Output to optimize, such as 'sfc' or 'thrust_total'.
+    :param constraints: Constraints on engine outputs (see huracan.optimize.constraint).
+    :param maximize:    Whether to maximize the objective rather than minimize it.
+    :param population:  Population size.
+    :param generations: Maximum number of generations.
+    :param elite:       Number of best candidates kept in each generation.
+    :param crossover:   Crossover probability.
+    :param mutation:    Mutation probability of each gene. By default, one
+                        over the number of genes.
+    :param workers:     Number of worker processes. By default, one per CPU.
+                        With a single worker, engines are run in this process.
+    :param cache:       Evaluation cache (see huracan.cache.cache).
+    :param seed:        Random seed.
+    :param tol:         Relative tolerance on the improvement of the best objective.
+    :param patience:    Number of generations without improvement after which
+                        the search stops.
+
+    :type space:        space
+    :type objective:    str
+    :type constraints:  list of huracan.optimize.constraint
+    :type maximize:     bool
+    :type population:   int
+    :type generations:  int
+    :type elite:        int
+    :type crossover:    float
+    :type mutation:     float
+    :type workers:      int
+    :type cache:        huracan.cache.cache
+    :type seed:         int
+    :type tol:          float
+    :type patience:     int
+
+    :return: Best candidate and convergence statistics: for each
+             generation, the best and mean objective of the feasible
+             candidates, the fraction of feasible candidates, the number
+             of distinct candidates and topologies, and the number of
+             engine runs and cache hits.
+
+    :rtype: result
+    """
+    constraints = list(constraints) if constraints else []
+    outputs     = list(dict.fromkeys([objective] + [c.output for c in constraints]))
+    c           = evaluation_cache(maxsize=2**16) if cache is None else cache
+    rng         = np.random.default_rng(seed)
+    sign        = -1 if maximize else 1
+    mutation    = 1/len(space) if mutation is None else mutation
+
+    workers = workers if workers else os.cpu_count() or 1
+    pool    = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+
+    counts = {'evaluations': 0, 'hits': 0}
+
+    def evaluate(U):
+        definitions = [space.definition(u) for u in U]
+        keys        = [key(d, None, outputs) for d in definitions]
+
+        Y       = np.empty((len(U), len(outputs)))
+        missing = {}
+        for i, k in enumerate(keys):
+            v = c.get(k)
+            if v is None:
+                missing.setdefault(k, []).append(i)
+            else:
+                Y[i] = v
+
+        pending = [definitions[i[0]] for i in missing.values()]
+        if pool is None:
+            F = [run(d, outputs) for d in pending]
+        else:
+            F = list(pool.map(run, pending, [outputs]*len(pending),
+                              chunksize=max(1, len(pending)//(4*workers))))
+
+        for (k, i), f in zip(missing.items(), F):
+            c.set(k, f)
+            Y[i] = f
+
+        counts['evaluations'] += len(pending)
+        counts['hits']        += len(U) - len(pending)
+        return Y, keys
+
+    def objectives(Y):
+        return np.where(np.isfinite(Y[:, 0]), sign*Y[:, 0], np.inf)
+
+    def violations(Y):
+        v = np.zeros(len(Y))
+        for con in constraints:
+            v = np.maximum(v, con.violation(Y[:, outputs.index(con.output)]))
+        return np.where(np.all(np.isfinite(Y), axis=1), v, np.inf)
+
+    statistics = {k: [] for k in ['generation', 'best', 'mean', 'feasible', 'unique', 'topologies',
+                                  'evaluations', 'hits']}
+
+    def record(generation, U, K, F, V, runs, hits):
+        feasible = V <= 1e-6
+        statistics['generation'].append(generation)
+        statistics['best'].append(sign*np.min(F[feasible]) if np.any(feasible) else np.nan)
+        statistics['mean'].append(sign*np.mean(F[feasible]) if np.any(feasible) else np.nan)
+        statistics['feasible'].append(np.mean(feasible))
+        statistics['unique'].append(len(set(K)))
+        statistics['topologies'].append(len({space.topology(space.decode(u)) for u in U}))
+        statistics['evaluations'].append(runs)
+        statistics['hits'].append(hits)
+
+    try:
+        U    = space.random(population, rng)
+        Y, K = evaluate(U)
+        F, V = objectives(Y), violations(Y)
+        record(0, U, K, F, V, counts['evaluations'], counts['hits'])
+
+        best, stall = F[ranking(F, V)[0]], 0
+        for generation in range(1, generations + 1):
+            m = population - elite
+
+            # Binary tournament selection
+            a, b    = rng.integers(population, size=(2, 2*m))
+            winners = np.where(better(F[a], V[a], F[b], V[b]), a, b)
+            P1, P2  = U[winners[:m]], U[winners[m:]]
+
+            # Uniform crossover
+            cross = (rng.random(m) < crossover)[:, None] & (rng.random((m, len(space))) < 0.5)
+            C     = np.where(cross, P2, P1)
+
+            # Mutation
+            mutate     = rng.random((m, len(space))) < mutation
+            perturbed  = np.clip(C + 0.1*rng.standard_normal(C.shape), 0, 1 - 1e-12)
+            redrawn    = rng.random(C.shape)
+            C          = np.where(mutate, np.where(space.discrete, redrawn, perturbed), C)
+
+            runs, hits = counts['evaluations'], counts['hits']
+            Yc, Kc     = evaluate(C)
+            Fc, Vc     = objectives(Yc), violations(Yc)
+
+            # Elitism
+            keep = ranking(F, V)[:elite]
+            U = np.vstack([U[keep], C])
+            Y = np.vstack([Y[keep], Yc])
+            F = np.concatenate([F[keep], Fc])
+            V = np.concatenate([V[keep], Vc])
+            K = [K[i] for i in keep] + Kc
+
+            record(generation, U, K, F, V, counts['evaluations'] - runs, counts['hits'] - hits)
+
+            top = F[ranking(F, V)[0]]
+            if np.isfinite(best) and best - top <= tol*max(abs(best), 1e-12):
+                stall += 1
+                if stall >= patience:
+                    break
+            else:
+                stall = 0
+            best = min(best, top)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    i = ranking(F, V)[0]
+    return result(space, U[i], dict(zip(outputs, Y[i])), float(Y[i, 0]), float(V[i]),
+                  {k: np.array(v) for k, v in statistics.items()}, counts['evaluations'], counts['hits'])
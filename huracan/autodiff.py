@@ -0,0 +1,408 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan automatic differentiation
+---------------------------------
+
+Forward mode automatic differentiation of engine outputs with
+respect to engine definition values, such as component
+efficiencies, pressure ratios, the combustion chamber exit
+temperature or bypass fractions.
+
+Definition values are seeded as dual numbers: values carrying
+their derivatives with respect to all parameters. The thermodynamic
+processes, components, gas property models and streams then
+propagate the derivatives alongside the values, so that a single
+run of the engine yields the exact gradient of its outputs with
+respect to all parameters.
+
+    g = gradient(definition, ['c.eta', 'c.PI', 'cc.t01', 'bypass.fraction'])
+
+    g['thrust_total'].value, g['thrust_total']['c.PI']
+
+Branches (such as piecewise property models or choking) are taken
+on the values, and differentiated within the branch taken. Dual
+numbers may also carry arrays of values, as in batched runs.
+"""
+
+import numpy as np
+
+from huracan.definition import build
+
+
+class dual:
+    """
+    Dual number
+    -----------
+
+    Value (a float or an array) together with its derivatives with
+    respect to n parameters, stored along the last axis of grad.
+    """
+    __array_priority__ = 1000
+
+    def __init__(self, value, grad):
+        """
+        :param value: Value.
+        :param grad:  Derivatives of the value, of shape value.shape + (n,).
+
+        :type value:  float or np.ndarray
+        :type grad:   np.ndarray
+        """
+        self.value = value
+        self.grad  = grad
+
+    @classmethod
+    def seed(cls, value, i, n):
+        """
+        Dual number of an independent parameter: the i-th of n.
+        """
+        grad = np.zeros(np.shape(value) + (n,))
+        grad[..., i] = 1
+        return cls(value, grad)
+
+    def chain(self, value, derivative):
+        """
+        Dual number of a function of this one, given its value
+        and its derivative.
+        """
+        return dual(value, np.asarray(derivative)[..., None]*self.grad)
+
+    """
+    Arithmetic
+    """
+    def __add__(self, other):
+        if isinstance(other, dual):
+            return dual(self.value + other.value, self.grad + other.grad)
+        return dual(self.value + other, broadcast(self.grad, other))
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __neg__(self):
+        return dual(-self.value, -self.grad)
+
+    def __pos__(self):
+        return self
+
+    def __mul__(self, other):
+        if isinstance(other, dual):
+            return dual(self.value*other.value,
+                        self.grad*expand(other.value) + expand(self.value)*other.grad)
+        return dual(self.value*other, self.grad*expand(other))
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if isinstance(other, dual):
+            return self*other.reciprocal()
+        return dual(self.value/other, self.grad/expand(other))
+
+    def __rtruediv__(self, other):
+        return self.reciprocal()*other
+
+    def reciprocal(self):
+        return self.chain(1/self.value, -1/self.value**2)
+
+    def __pow__(self, other):
+        if isinstance(other, dual):
+            v = self.value**other.value
+            return dual(v, expand(other.value*self.value**(other.value - 1))*self.grad +
+                           expand(v*np.log(self.value))*other.grad)
+        if np.ndim(other) == 0 and other == 0:
+            return dual(self.value**0, np.zeros_like(self.grad))
+        return self.chain(self.value**other, other*self.value**(other - 1))
+
+    def __rpow__(self, other):
+        v = other**self.value
+        return self.chain(v, v*np.log(other))
+
+    def __abs__(self):
+        return self.chain(np.abs(self.value), np.sign(self.value))
+
+    """
+    Comparison: on values
+    """
+    def __lt__(self, other):
+        return self.value < value(other)
+
+    def __le__(self, other):
+        return self.value <= value(other)
+
+    def __gt__(self, other):
+        return self.value > value(other)
+
+    def __ge__(self, other):
+        return self.value >= value(other)
+
+    def __eq__(self, other):
+        return self.value == value(other)
+
+    def __ne__(self, other):
+        return self.value != value(other)
+
+    __hash__ = None
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __float__(self):
+        return float(self.value)
+
+    """
+    Array interface
+    """
+    @property
+    def shape(self):
+        return np.shape(self.value)
+
+    @property
+    def ndim(self):
+        return np.ndim(self.value)
+
+    @property
+    def size(self):
+        return np.size(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, item):
+        return dual(self.value[item], self.grad[item])
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs:
+            return NotImplemented
+
+        if ufunc in binary:
+            return binary[ufunc](*inputs)
+        if ufunc in unary:
+            return unary[ufunc](inputs[0])
+        if ufunc in comparisons:
+            return ufunc(*[value(x) for x in inputs])
+
+        return NotImplemented
+
+    def __array_function__(self, func, types, args, kwargs):
+        if func in functions:
+            return functions[func](*args, **kwargs)
+        return NotImplemented
+
+    def __repr__(self):
+        return f'dual({self.value}, {self.grad})'
+
+
+"""
+Helpers
+"""
+def value(x):
+    """
+    Value of a dual number, or the number itself.
+    """
+    return x.value if isinstance(x, dual) else x
+
+
+def expand(x):
+    """
+    Broadcast a value against the derivatives of a dual number.
+    """
+    return np.asarray(x)[..., None]
+
+
+def broadcast(grad, other):
+    """
+    Derivatives broadcast to the shape of the result of an
+    operation with a constant.
+    """
+    shape = np.broadcast_shapes(grad.shape[:-1], np.shape(other))
+    return np.broadcast_to(grad, shape + grad.shape[-1:])
+
+
+def derivatives(x, n):
+    """
+    Derivatives of a dual number, or zero for constants.
+    """
+    if isinstance(x, dual):
+        return x.grad
+    return np.zeros(np.shape(x) + (n,))
+
+
+def size(*args):
+    """
+    Number of parameters of a set of dual numbers.
+    """
+    return [a.grad.shape[-1] for a in args if isinstance(a, dual)][0]
+
+
+def where(condition, a, b):
+    n = size(a, b)
+    c = value(condition)
+    return dual(np.where(c, value(a), value(b)), np.where(expand(c), derivatives(a, n), derivatives(b, n)))
+
+
+def maximum(a, b):
+    return where(value(a) >= value(b), a, b)
+
+
+def minimum(a, b):
+    return where(value(a) <= value(b), a, b)
+
+
+def axes(a, axis):
+    """
+    Axes of the value of a dual number to reduce along, which are
+    also those of its derivatives.
+    """
+    if axis is None:
+        return tuple(range(np.ndim(a.value)))
+    return tuple(int(i) % np.ndim(a.value) for i in np.atleast_1d(axis))
+
+
+def mean(a, axis=None, keepdims=False):
+    axis = axes(a, axis)
+    return dual(np.mean(a.value, axis=axis, keepdims=keepdims), np.mean(a.grad, axis=axis, keepdims=keepdims))
+
+
+def total(a, axis=None, keepdims=False):
+    axis = axes(a, axis)
+    return dual(np.sum(a.value, axis=axis, keepdims=keepdims), np.sum(a.grad, axis=axis, keepdims=keepdims))
+
+
+binary = {
+    np.add:         lambda a, b: a + b if isinstance(a, dual) else b + a,
+    np.subtract:    lambda a, b: a - b if isinstance(a, dual) else (-b) + a,
+    np.multiply:    lambda a, b: a*b if isinstance(a, dual) else b*a,
+    np.true_divide: lambda a, b: a/b if isinstance(a, dual) else b.__rtruediv__(a),
+    np.power:       lambda a, b: a**b if isinstance(a, dual) else b.__rpow__(a),
+    np.maximum:     maximum,
+    np.minimum:     minimum,
+}
+
+unary = {
+    np.negative:   lambda a: -a,
+    np.positive:   lambda a: a,
+    np.absolute:   abs,
+    np.sqrt:       lambda a: a.chain(np.sqrt(a.value), 0.5/np.sqrt(a.value)),
+    np.exp:        lambda a: a.chain(np.exp(a.value), np.exp(a.value)),
+    np.log:        lambda a: a.chain(np.log(a.value), 1/a.value),
+    np.log10:      lambda a: a.chain(np.log10(a.value), 1/(a.value*np.log(10))),
+    np.square:     lambda a: a*a,
+    np.reciprocal: lambda a: a.reciprocal(),
+}
+
+comparisons = [np.greater, np.greater_equal, np.less, np.less_equal, np.equal, np.not_equal,
+               np.isfinite, np.isnan, np.isinf, np.sign]
+
+functions = {
+    np.where:        where,
+    np.mean:         mean,
+    np.sum:          total,
+    np.ndim:         lambda a: np.ndim(value(a)),
+    np.shape:        lambda a: np.shape(value(a)),
+    np.size:         lambda a, axis=None: np.size(value(a), axis),
+    np.squeeze:      lambda a, axis=None: dual(np.squeeze(a.value, axis),
+                                               a.grad.reshape(np.squeeze(a.value, axis).shape + a.grad.shape[-1:])),
+    np.broadcast_to: lambda a, shape, subok=False: dual(np.broadcast_to(a.value, shape),
+                                                        np.broadcast_to(a.grad, tuple(shape) + a.grad.shape[-1:])),
+    np.any:          lambda a, *args, **kwargs: np.any(value(a), *args, **kwargs),
+    np.all:          lambda a, *args, **kwargs: np.all(value(a), *args, **kwargs),
+}
+
+
+"""
+Gradients
+"""
+class derivative:
+    """
+    Output and its derivatives
+    --------------------------
+
+    Value of an engine output and its derivative with respect to
+    each parameter, accessed by parameter name.
+    """
+    def __init__(self, x, parameters):
+        """
+        :type x:          dual or float
+        :type parameters: list of str
+        """
+        self.parameters = list(parameters)
+        self.value      = value(x)
+        self.grad       = derivatives(x, len(self.parameters))
+
+    def __getitem__(self, parameter):
+        return self.grad[..., self.parameters.index(parameter)]
+
+    def __repr__(self):
+        return f'derivative({self.value}, {dict(zip(self.parameters, np.moveaxis(self.grad, -1, 0)))})'
+
+
+default_outputs = ['thrust_total', 'sfc', 'efficiency_total']
+
+
+def gradient(definition, parameters, outputs=None, values=None):
+    """
+    Engine outputs and their exact derivatives with respect to a
+    set of definition values, obtained in a single engine run.
+
+    :param definition: Engine definition.
+    :param parameters: Definition values (see huracan.definition.override)
+                       to differentiate with respect to, such as 'c.eta',
+                       'fan.PI', 'cc.t01' or 'bypass.fraction'. Their values
+                       are those of the definition unless given in values.
+    :param outputs:    Outputs (see huracan.definition.model.results).
+    :param values:     Definition values overriding those of the definition.
+
+    :type definition:  dict
+    :type parameters:  list of str
+    :type outputs:     list of str
+    :type values:      dict
+
+    :return: Value and derivatives of each output.
+
+    :rtype: dict of derivative
+    """
+    outputs = list(outputs) if outputs else default_outputs
+    values  = dict(values) if values else {}
+
+    n     = len(parameters)
+    seeds = {p: dual.seed(np.asarray(values[p], dtype=float) if p in values else current(definition, p), i, n)
+             for i, p in enumerate(parameters)}
+
+    model = build(definition, {**values, **seeds}).run()
+
+    return {k: derivative(v, parameters) for k, v in model.results(outputs).items()}
+
+
+def current(definition, path):
+    """
+    Value of a definition value (see huracan.definition.override)
+    in a definition.
+
+    :type definition: dict
+    :type path:       str
+
+    :rtype: float
+    """
+    name, attr = path.split('.', 1)
+    if name == 'gas':
+        return float(definition['gas'][attr])
+    if name in definition.get('components', {}):
+        spec = definition['components'][name]
+        if attr.startswith('fuel.'):
+            f = spec['fuel']
+            f = definition['fuels'][f] if isinstance(f, str) else f
+            return float(f[attr.split('.', 1)[1]])
+        return float(spec[attr])
+    if name in definition.get('shafts', {}):
+        return float(definition['shafts'][name][attr])
+    for s in definition.get('splits', []):
+        if s['into'][1] == name and attr == 'fraction':
+            return float(s['fraction'])
+    raise AssertionError(f'Automatic differentiation: {path} is not a value of the engine definition.')
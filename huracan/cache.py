@@ -0,0 +1,260 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan evaluation cache
+------------------------
+
+Memoization of engine evaluations, keyed by a canonical hash
+of the engine definition, its inputs and the requested outputs.
+
+Results are kept in an in-memory least recently used tier and,
+optionally, in an on-disk SQLite tier with size-based eviction,
+shared by all sessions and worker processes on a machine.
+
+    c = cache(path='~/.huracan/cache.sqlite')
+
+    c.evaluate(definition, inputs={'cc.t01': 1500}, outputs=['thrust_total', 'sfc'])
+"""
+
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+from collections import OrderedDict
+
+from huracan.definition import build, canonical
+
+
+default_outputs = ['thrust_total', 'sfc']
+
+
+def key(definition, inputs=None, outputs=None):
+    """
+    Canonical hash of an engine evaluation.
+
+    :type definition: dict
+    :type inputs:     dict
+    :type outputs:    list of str
+
+    :rtype: str
+    """
+    evaluation = {'definition': definition,
+                  'inputs':     inputs if inputs else {},
+                  'outputs':    list(outputs) if outputs else default_outputs}
+    return hashlib.sha256(canonical(evaluation).encode()).hexdigest()
+
+
+def evaluate(definition, inputs=None, outputs=None, cache=None):
+    """
+    Build and run an engine from its definition, overriding the
+    given inputs (see huracan.definition.override), and return
+    the requested outputs (see huracan.definition.model.results).
+
+    If a cache is provided, the results are looked up in it before
+    running the engine, and stored in it afterwards.
+
+    :type definition: dict
+    :type inputs:     dict
+    :type outputs:    list of str
+    :type cache:      cache
+
+    :rtype: dict
+    """
+    outputs = list(outputs) if outputs else default_outputs
+
+    if cache is not None:
+        return cache.evaluate(definition, inputs, outputs)
+
+    return build(definition, inputs).run().results(outputs)
+
+
+class lru:
+    """
+    Least recently used cache
+    -------------------------
+    """
+    def __init__(self, maxsize=1024):
+        """
+        :param maxsize: Maximum number of entries.
+
+        :type maxsize:  int
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, k, default=None):
+        if k in self.entries:
+            self.entries.move_to_end(k)
+            return self.entries[k]
+        return default
+
+    def set(self, k, v):
+        self.entries[k] = v
+        self.entries.move_to_end(k)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __contains__(self, k):
+        return k in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class store:
+    """
+    SQLite cache store
+    ------------------
+
+    On-disk cache tier. Entries are pickled, and the least recently
+    accessed entries are evicted when the total size of the stored
+    entries exceeds the maximum size of the store.
+    """
+    def __init__(self, path, max_bytes=256*2**20):
+        """
+        :param path:      Path of the SQLite database file.
+        :param max_bytes: Maximum total size of the stored entries.
+
+        :type path:       str
+        :type max_bytes:  int
+        """
+        self.path      = os.path.expanduser(str(path))
+        self.max_bytes = max_bytes
+        self.db        = None
+
+    def connect(self):
+        """
+        Open the database, creating it if it does not exist.
+        Connections are opened lazily, so that stores can be
+        sent to other processes.
+        """
+        if self.db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.db = sqlite3.connect(self.path, timeout=30)
+            self.db.execute('CREATE TABLE IF NOT EXISTS cache '
+                            '(key TEXT PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)')
+            self.db.commit()
+        return self.db
+
+    def get(self, k, default=None):
+        db  = self.connect()
+        row = db.execute('SELECT value FROM cache WHERE key = ?', (k,)).fetchone()
+        if row is None:
+            return default
+        db.execute('UPDATE cache SET accessed = ? WHERE key = ?', (time.time(), k))
+        db.commit()
+        return pickle.loads(row[0])
+
+    def set(self, k, v):
+        db   = self.connect()
+        blob = pickle.dumps(v)
+        db.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', (k, blob, len(blob), time.time()))
+        self.evict()
+        db.commit()
+
+    def evict(self):
+        """
+        Evict the least recently accessed entries until the total
+        size of the store is within its maximum size.
+        """
+        db   = self.connect()
+        size = db.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+        if size <= self.max_bytes:
+            return
+        for k, s in db.execute('SELECT key, size FROM cache ORDER BY accessed ASC, rowid ASC').fetchall():
+            db.execute('DELETE FROM cache WHERE key = ?', (k,))
+            size -= s
+            if size <= self.max_bytes:
+                break
+
+    def size(self):
+        """
+        Total size of the stored entries.
+        """
+        return self.connect().execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+
+    def clear(self):
+        self.connect().execute('DELETE FROM cache')
+        self.db.commit()
+
+    def __contains__(self, k):
+        return self.connect().execute('SELECT 1 FROM cache WHERE key = ?', (k,)).fetchone() is not None
+
+    def __len__(self):
+        return self.connect().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def __getstate__(self):
+        return {**self.__dict__, 'db': None}
+
+
+class cache:
+    """
+    Evaluation cache
+    ----------------
+
+    In-memory LRU tier, optionally backed by an on-disk store.
+    """
+    def __init__(self, maxsize=1024, path=None, max_bytes=256*2**20):
+        """
+        :param maxsize:   Maximum number of entries of the in-memory tier.
+        :param path:      Path of the on-disk store. If not provided,
+                          results are only cached in memory.
+        :param max_bytes: Maximum size of the on-disk store.
+
+        :type maxsize:    int
+        :type path:       str
+        :type max_bytes:  int
+        """
+        self.memory = lru(maxsize)
+        self.disk   = store(path, max_bytes) if path is not None else None
+
+        self.hits   = 0
+        self.misses = 0
+
+    def get(self, k, default=None):
+        v = self.memory.get(k, self)
+        if v is self and self.disk is not None:
+            v = self.disk.get(k, self)
+            if v is not self:
+                self.memory.set(k, v)
+        if v is self:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return v
+
+    def set(self, k, v):
+        self.memory.set(k, v)
+        if self.disk is not None:
+            self.disk.set(k, v)
+
+    def evaluate(self, definition, inputs=None, outputs=None):
+        """
+        Memoized engine evaluation (see huracan.cache.evaluate).
+
+        :type definition: dict
+        :type inputs:     dict
+        :type outputs:    list of str
+
+        :rtype: dict
+        """
+        outputs = list(outputs) if outputs else default_outputs
+
+        k = key(definition, inputs, outputs)
+        v = self.get(k)
+        if v is None:
+            v = evaluate(definition, inputs, outputs)
+            self.set(k, v)
+        return v
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
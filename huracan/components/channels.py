@@ -7,6 +7,7 @@ Engine channels
 """
 
 from huracan.engine import component
+from huracan.utils import where
 
 
 class intake(component):
@@ -80,11 +81,11 @@ class bleed_duct(component):
 
         dt = self.t01 - gas.t0
 
-        self.Q_out = dt*gas.mf*gas.cp(gas.t0) / self.eta
+        self.Q_out = dt*gas.mf*gas.cp0 / self.eta
 
         return gas.heat_exchange(eta=self.eta,
                                  PI=self.PI,
-                                 cp=gas.cp(gas.t0),
+                                 cp=gas.cp0,
                                  Q_ex=self.Q_out,
                                  )
     
@@ -126,13 +127,11 @@ class nozzle(component):
         """
         inv_PI = gas.p0/gas.p_0 if isinstance(self.PI, type(None)) else 1/self.PI
 
-        if inv_PI > self.inv_pi_crit(gas):
-            PI = 1/self.inv_pi_crit(gas)
-            self.choked = True
-        else:
-            PI = 1/inv_PI
+        inv_pi_crit = self.inv_pi_crit(gas)
 
-        return PI
+        self.choked = inv_PI > inv_pi_crit
+
+        return where(self.choked, 1/inv_pi_crit, 1/inv_PI)
 
     def inv_pi_crit(self, gas):
         """
@@ -149,5 +148,5 @@ class nozzle(component):
             1/PI_crit
 
         """
-        k = gas.k(gas.t0)
+        k = gas.k0
         return 1/(1-1/self.eta*((k-1)/(k+1)))**(k/(k-1))
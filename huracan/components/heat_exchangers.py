@@ -32,7 +32,7 @@ class heat_sink(component):
 
         return gas.heat_exchange(eta=self.eta,
                                  PI=self.PI,
-                                 cp=gas.cp(gas.t0),
+                                 cp=gas.cp0,
                                  Q_ex=-self.Q_out(gas),
                                  )
 
@@ -51,12 +51,15 @@ class intercooler(heat_sink):           # TODO: implement coolant-based intercoo
         """
         super().__init__(eta=eta)
 
-        self.Q_out = lambda _: Q_out
+        self.Q_removed = Q_out
 
     def Q_out(self, gas):
         """
         Heat removed by the intercooler.
 
+        At present, the heat removed is that given in the initialization
+        of the intercooler.
+
         Parameters:
         * Gas
         * Coolant
@@ -64,4 +67,4 @@ class intercooler(heat_sink):           # TODO: implement coolant-based intercoo
         * Contact area
         * Thermal exchange efficiency
         """
-        pass
+        return self.Q_removed
@@ -0,0 +1,394 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Component performance maps
+--------------------------
+
+Compressor, fan and turbine maps tabulating the corrected mass
+flow, pressure ratio and isentropic efficiency of the component
+against its corrected speed and an auxiliary beta coordinate
+(running along each speed line, from surge to choke).
+
+Maps are read from GasTurb-style tabular text files, composed of
+three blocks titled "Mass Flow", "Pressure Ratio" and "Efficiency".
+The first row of each block holds the beta values of its columns
+(after a placeholder entry), and each following row a corrected
+speed followed by the values of the block's quantity along that
+speed line:
+
+    Mass Flow
+    N/beta    0.0     0.5     1.0
+    0.8       14.1    13.2    12.0
+    1.0       21.4    20.4    19.0
+
+    Pressure Ratio
+    ...
+
+Lines starting with # are comments. For turbine maps, the
+pressure ratio block holds expansion ratios (inlet over outlet
+total pressure, larger than 1).
+
+Parsed maps can be compiled into a map library: a directory
+holding the arrays of each map as raw .npy files. Libraries are
+loaded through memory mapping, so that loading a map takes no
+parsing and worker processes share the same pages of memory.
+"""
+
+import os
+import numpy as np
+
+
+blocks = {'mass flow':      'Wc',
+          'pressure ratio': 'PI',
+          'efficiency':     'eta'}
+
+
+"""
+Corrected parameters
+"""
+t_ref = 288.15      # [K]  Reference temperature
+p_ref = 101325      # [Pa] Reference pressure
+
+
+def corrected_flow(mf, t0, p0):
+    """
+    Corrected mass flow.
+
+    :param mf: [kg/s] Mass flow
+    :param t0: [K]    Total temperature
+    :param p0: [Pa]   Total pressure
+    """
+    return mf*(t0/t_ref)**0.5/(p0/p_ref)
+
+
+def mass_flow(Wc, t0, p0):
+    """
+    Mass flow from the corrected mass flow.
+
+    :param Wc: [kg/s] Corrected mass flow
+    :param t0: [K]    Total temperature
+    :param p0: [Pa]   Total pressure
+    """
+    return Wc*(p0/p_ref)/(t0/t_ref)**0.5
+
+
+def corrected_speed(N, t0):
+    """
+    Corrected rotational speed.
+
+    :param N:  [-] Rotational speed (relative to the design speed)
+    :param t0: [K] Total temperature
+    """
+    return N/(t0/t_ref)**0.5
+
+
+"""
+Maps
+"""
+class performance_map:
+    """
+    Performance map
+    ---------------
+    """
+    def __init__(self, N, beta, Wc, PI, eta):
+        """
+        :param N:    Corrected speeds of the speed lines, in increasing order.
+        :param beta: Beta values, in increasing order.
+        :param Wc:   [kg/s] Corrected mass flow, one row per speed line.
+        :param PI:   Pressure ratio, one row per speed line.
+        :param eta:  Isentropic efficiency, one row per speed line.
+
+        :type N:     list of float
+        :type beta:  list of float
+        :type Wc:    list of list of float
+        :type PI:    list of list of float
+        :type eta:   list of list of float
+        """
+        self.N      = np.asarray(N, dtype=float)
+        self.beta   = np.asarray(beta, dtype=float)
+
+        # Stacked tables: a single gather interpolates all three quantities
+        self.tables = np.ascontiguousarray(np.stack([Wc, PI, eta]).astype(float))
+
+        assert self.tables.shape[1:] == (self.N.size, self.beta.size), \
+            'Performance map: the tables must have one row per speed line and one column per beta value.'
+
+    @classmethod
+    def from_tables(cls, N, beta, tables):
+        """
+        Create a performance map from its stacked tables, without
+        copying them (for example, from memory-mapped arrays).
+
+        :type N:      np.ndarray
+        :type beta:   np.ndarray
+        :type tables: np.ndarray
+        """
+        m = cls.__new__(cls)
+        m.N, m.beta, m.tables = N, beta, tables
+        return m
+
+    @property
+    def Wc(self):
+        return self.tables[0]
+
+    @property
+    def PI(self):
+        return self.tables[1]
+
+    @property
+    def eta(self):
+        return self.tables[2]
+
+    @staticmethod
+    def cell(grid, x):
+        """
+        Index of the grid cell containing x, and the relative position
+        of x in it. Points outside the grid are linearly extrapolated
+        from the closest cell.
+        """
+        i = np.clip(np.searchsorted(grid, x, side='right') - 1, 0, grid.size - 2)
+        return i, (x - grid[i])/(grid[i+1] - grid[i])
+
+    def scratch(self, n):
+        """
+        Buffers of the interpolation of n points, allocated on the
+        first evaluation and reused while the number of points does
+        not change.
+        """
+        b = getattr(self, 'buffers', None)
+        if b is None or b['N'].size != n:
+            b = self.buffers = {**{k: np.empty(n) for k in ['N', 'beta', 'u', 'v', 'a', 'w']},
+                                **{k: np.empty(n, dtype=np.intp) for k in ['i', 'j', 'k']},
+                                'corner': np.empty((3, n)),
+                                'dN':     np.diff(self.N),
+                                'dbeta':  np.diff(self.beta)}
+        return b
+
+    @staticmethod
+    def locate(grid, width, x, i, u, lo):
+        """
+        Cell of each point of x, as in cell, written into the
+        buffers i and u (lo being a work buffer).
+        """
+        i[:] = np.searchsorted(grid, x, side='right')
+        np.subtract(i, 1, out=i)
+        np.maximum(i, 0, out=i)
+        np.minimum(i, grid.size - 2, out=i)
+        np.take(grid, i, out=lo)
+        np.subtract(x, lo, out=u)
+        np.take(width, i, out=lo)
+        np.divide(u, lo, out=u)
+
+    def __call__(self, N, beta):
+        """
+        Bilinear interpolation of the map at the given corrected
+        speeds and beta values, which may be NumPy arrays.
+
+        The intermediate arrays of the interpolation of arrays of
+        points are written into buffers kept by the map (see scratch),
+        so that only the returned values are allocated.
+
+        :type N:    float or np.ndarray
+        :type beta: float or np.ndarray
+
+        :return: [float or np.ndarray] Corrected mass flow
+                 [float or np.ndarray] Pressure ratio
+                 [float or np.ndarray] Isentropic efficiency
+        """
+        t = self.tables
+
+        # Single points: the buffers would only add overhead
+        if np.ndim(N) == 0 and np.ndim(beta) == 0:
+            i, u = self.cell(self.N, N)
+            j, v = self.cell(self.beta, beta)
+            values = (t[:, i, j]*(1-v) + t[:, i, j+1]*v)*(1-u) + (t[:, i+1, j]*(1-v) + t[:, i+1, j+1]*v)*u
+            return tuple(float(x) for x in values)
+
+        points = np.broadcast(N, beta)
+        shape  = points.shape
+        b      = self.scratch(points.size)
+
+        np.copyto(b['N'].reshape(shape),    N)
+        np.copyto(b['beta'].reshape(shape), beta)
+
+        self.locate(self.N,    b['dN'],    b['N'],    b['i'], b['u'], b['w'])
+        self.locate(self.beta, b['dbeta'], b['beta'], b['j'], b['v'], b['w'])
+
+        # Flat index of the lower corner of each cell in the tables
+        k = b['k']
+        np.multiply(b['i'], self.beta.size, out=k)
+        np.add(k, b['j'], out=k)
+
+        # Weights of the corners, (1-u)(1-v), (1-u)v, uv and u(1-v),
+        # with a = 1-u and N = 1-v
+        u, v, w, a, c = b['u'], b['v'], b['w'], b['a'], b['corner']
+        np.subtract(1, u, out=a)
+        np.subtract(1, v, out=b['N'])
+
+        t      = t.reshape(3, -1)
+        values = np.empty((3, b['k'].size))
+        for corner, (step, p, q) in enumerate([(0,              a, b['N']),
+                                                (1,              a, v),
+                                                (self.beta.size, u, v),
+                                                (-1,             u, b['N'])]):
+            np.add(k, step, out=k)
+            np.multiply(p, q, out=w)
+            np.take(t, k, axis=1, out=c if corner else values)
+            if corner:
+                np.multiply(c, w, out=c)
+                np.add(values, c, out=values)
+            else:
+                np.multiply(values, w, out=values)
+
+        return values[0].reshape(shape), values[1].reshape(shape), values[2].reshape(shape)
+
+
+def read_map(path):
+    """
+    Read a performance map from a GasTurb-style tabular text file.
+
+    :type path: str
+
+    :rtype: performance_map
+    """
+    with open(path, 'r') as f:
+        return parse_map(f.read())
+
+
+def parse_map(text):
+    """
+    Parse a performance map from a GasTurb-style tabular text.
+
+    :type text: str
+
+    :rtype: performance_map
+    """
+    tables = {}
+    name   = None
+    rows   = []
+
+    def close():
+        if name is not None:
+            assert len(rows) > 1, f'Performance map: the {name} block has no speed lines.'
+            tables[blocks[name]] = np.array(rows, dtype=float)
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.lower() in blocks:
+            close()
+            name, rows = line.lower(), []
+            continue
+        assert name is not None, f'Performance map: values found outside of a block: {line}'
+        values = line.split()
+        rows.append([np.nan if rows == [] else float(values[0])] + [float(v) for v in values[1:]])
+
+    close()
+
+    assert set(tables.keys()) == set(blocks.values()), \
+        f'Performance map: the map must contain the blocks {list(blocks.keys())}.'
+
+    N    = tables['Wc'][1:, 0]
+    beta = tables['Wc'][0, 1:]
+
+    for t in tables.values():
+        assert np.array_equal(t[1:, 0], N) and np.array_equal(t[0, 1:], beta), \
+            'Performance map: all blocks must have the same speed lines and beta values.'
+
+    return performance_map(N, beta, **{k: t[1:, 1:] for k, t in tables.items()})
+
+
+"""
+Map libraries
+"""
+class library:
+    """
+    Map library
+    -----------
+
+    Directory of compiled performance maps. Each map is stored as
+    three raw .npy files, <name>.N.npy, <name>.beta.npy and
+    <name>.tables.npy, loaded with numpy.load(mmap_mode='r').
+    """
+    arrays = ['N', 'beta', 'tables']
+
+    def __init__(self, path):
+        """
+        :param path: Directory of the library. Created if it does not exist.
+
+        :type path: str
+        """
+        self.path = str(path)
+        self.maps = {}
+
+        os.makedirs(self.path, exist_ok=True)
+
+    def file(self, name, array):
+        return os.path.join(self.path, f'{name}.{array}.npy')
+
+    def names(self):
+        """
+        Names of the maps in the library.
+        """
+        suffix = '.tables.npy'
+        return sorted(f[:-len(suffix)] for f in os.listdir(self.path) if f.endswith(suffix))
+
+    def __contains__(self, name):
+        return os.path.isfile(self.file(name, 'tables'))
+
+    def __getitem__(self, name):
+        """
+        Load a map from the library, memory-mapped and read-only.
+
+        :type name: str
+
+        :rtype: performance_map
+        """
+        if name not in self.maps:
+            assert name in self, f'Map library: no map named {name} in {self.path}.'
+            self.maps[name] = performance_map.from_tables(*[np.load(self.file(name, a), mmap_mode='r')
+                                                            for a in self.arrays])
+        return self.maps[name]
+
+    def __setitem__(self, name, m):
+        """
+        Store a performance map in the library.
+
+        :type name: str
+        :type m:    performance_map
+        """
+        # The stacked tables are written last, as they mark the map as present
+        for a in self.arrays:
+            np.save(self.file(name, a), np.ascontiguousarray(getattr(m, a), dtype=float))
+        self.maps.pop(name, None)
+
+    def compile(self, sources):
+        """
+        Parse map files and store them in the library. Maps already
+        compiled from a source file older than their compiled arrays
+        are not parsed again.
+
+        :param sources: Map file paths, or dictionary of map names and
+                        map file paths. By default, maps are named after
+                        their file name, without its extension.
+
+        :type sources: list of str or dict
+
+        :return: Names of the compiled maps.
+        """
+        if not isinstance(sources, dict):
+            sources = {os.path.splitext(os.path.basename(s))[0]: s for s in sources}
+
+        compiled = []
+        for name, source in sources.items():
+            if name in self and os.path.getmtime(self.file(name, 'tables')) >= os.path.getmtime(source):
+                continue
+            self[name] = read_map(source)
+            compiled.append(name)
+        return compiled
+
+    def __getstate__(self):
+        # Memory-mapped maps are reloaded on unpickling
+        return {'path': self.path, 'maps': {}}
@@ -16,27 +16,17 @@ class plant:
     classes inherit the Q_min method, which returns the 
     heat required to power the rotary components of the engine.
     """
-    def Q_min(self, downstream):
+    def Q_min(self):
         """
-        Obtain the heat required by all downstream turbines.
+        Obtain the heat required by the turbines downstream of
+        the plant.
 
-        Assumptions:
-        - A single combustion chamber is used to power all
-          downstream turbines, without secondary combustion
-          chambers in any of the affluent streams.
-          If this is the case, the combustion chambers will
-          provide the heat required by each of their common
-          turbines (and so twice the amount needed).
-          For now, it is wise to ensure any secondary combustion
-          chambers do not have shared turbines with the main one.
-
-        :type downstream: list of stream
+        The power required by each shaft is allocated to its
+        turbines, and the power of each turbine to the combustion
+        chambers upstream of it, so that the power of turbines
+        shared by several combustion chambers is not counted twice
+        (see huracan.engine.power_balance).
 
         :return: Heat required by all downstream turbines.
         """
-        Qr = []
-        for stream in downstream:
-            for c in stream.components:
-                if c.__class__.__name__ == 'turbine':
-                    Qr.append(c.w_r())
-        return sum(Qr)
+        return self.stream.power_balance().heat(self)
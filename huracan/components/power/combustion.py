@@ -6,10 +6,12 @@ Combustion power plants
 -----------------------
 """
 
-from copy import deepcopy
+import numpy as np
 
 from huracan.engine import component
 from huracan.components.power import plant
+from huracan.thermo.properties import constant
+from huracan.thermo.processes import heat_exchange
 
 
 class combustor(component):
@@ -63,6 +65,10 @@ class combustor(component):
         chamber is obtained.
         This total temperature is then assumed to be the temperature
         at which the combustion process takes place.
+
+        If the specific heat capacity of the gas is constant, the
+        estimate is skipped. Otherwise, it is obtained from the heat
+        exchange process alone, without modifying (or copying) the gas.
         """
 
         assert hasattr(self, 'fmf'), \
@@ -72,11 +78,20 @@ class combustor(component):
 
         self.Q = self.fuel.mf*self.fuel.LHV      # Heat added to the flow
 
-        approx_process_t = deepcopy(gas).heat_exchange(eta=self.eta,
-                                                       PI=self.PI,
-                                                       cp=gas.cp(gas.t0),
-                                                       Q_ex=self.Q).t01
-        
+        if isinstance(gas.cp, constant):
+            return gas.heat_exchange(eta=self.eta,
+                                     PI=self.PI,
+                                     cp=gas.cp0,
+                                     Q_ex=self.Q)
+
+        approx_process_t = heat_exchange(mf=gas.mf,
+                                         cp=gas.cp0,
+                                         t00=gas.t0,
+                                         p00=gas.p0,
+                                         Q_ex=self.Q,
+                                         eta=self.eta,
+                                         PI=self.PI).t01
+
         return gas.heat_exchange(eta=self.eta,
                                  PI=self.PI,
                                  cp=gas.cp(approx_process_t),
@@ -152,14 +167,12 @@ class combustion_chamber(plant, combustor):
           minimum mass flow
         """
 
-        mf_min = self.mf_qr(self.Q_min(downstream=self.stream.downstream))
+        mf_min = self.mf_qr(self.Q_min())
 
         if not isinstance(self.t01, type(None)):
             mf_t01 = self.mf_dt(dt=self.t01 - gas.t0, gas=gas)
-            self.fuel.mf = mf_t01 if mf_t01 > mf_min else mf_min
-        elif not isinstance(self.fuel.mf, type(None)):
-            self.fuel.mf = self.fuel.mf if self.fuel.mf > mf_min else self.fuel.mf
-        else:
+            self.fuel.mf = np.maximum(mf_t01, mf_min)
+        elif isinstance(self.fuel.mf, type(None)):
             self.fuel.mf = mf_min
 
         gas += self.fuel
@@ -7,6 +7,7 @@ Rotary components
 """
 
 from huracan.engine import component
+from huracan.components.maps import corrected_speed, corrected_flow
 
 
 class screw(component):
@@ -19,15 +20,73 @@ class screw(component):
     def __init__(self,
                  eta,
                  PI=None,
-                 TAU=None):
+                 TAU=None,
+                 map=None,
+                 beta=None,
+                 N=None,
+                 Nc_design=None):
         """
-        :type eta: float
-        :type PI:  float
-        :type TAU: float
+        If a performance map is provided, the pressure ratio
+        and isentropic efficiency of the component are read
+        from it at the corrected speed of the component relative
+        to its design corrected speed, and the given beta value.
+
+        :param map:       Performance map.
+        :param beta:      Map beta coordinate.
+        :param N:         Rotational speed relative to the design speed.
+                          By default that of the shaft of the component.
+        :param Nc_design: Corrected speed of the component at the design
+                          point (see huracan.components.maps.corrected_speed).
+                          By default, the engine is taken to run at its
+                          design point, and it is that at the first run of
+                          the component (see huracan.offdesign.design_speeds).
+
+        :type eta:        float
+        :type PI:         float
+        :type TAU:        float
+        :type map:        huracan.components.maps.performance_map
+        :type beta:       float
+        :type N:          float
+        :type Nc_design:  float
+        """
+        self.eta  = eta
+        self.PI   = PI
+        self.TAU  = TAU
+        self.map  = map
+        self.beta = beta
+        self.N    = N
+
+        self.Nc_design = Nc_design
+
+        if map is not None:
+            assert beta is not None, f'{self.__class__.__name__}: a beta value must be given to read the performance map.'
+        else:
+            assert eta is not None, f'{self.__class__.__name__}: an isentropic efficiency or a performance map must be given.'
+
+    def lookup(self, gas):
         """
-        self.eta = eta
-        self.PI  = PI
-        self.TAU = TAU
+        Read the corrected mass flow, pressure ratio and isentropic
+        efficiency of the component from its performance map. The
+        corrected mass flow read from the map is kept as the Wc
+        attribute of the component, and the corrected mass flow of
+        the gas entering it as its Wc_in attribute: both must match
+        at a valid operating point.
+
+        The map is read at the corrected speed relative to the design
+        corrected speed, so that the component runs on its Nc=1 line
+        at the design point.
+        """
+        N = self.N if self.N is not None else self.shaft.N
+
+        if self.Nc_design is None:
+            self.Nc_design = corrected_speed(1, gas.t0)
+
+        self.Nc    = corrected_speed(N, gas.t0)/self.Nc_design
+        self.Wc_in = corrected_flow(gas.mf, gas.t0, gas.p0)
+
+        self.Wc, PI, eta = self.map(self.Nc, self.beta)
+
+        return PI, eta
 
 
 class compressor(screw):
@@ -38,19 +97,34 @@ class compressor(screw):
     Adiabatic compression.
     """
     def __init__(self,
-                 eta,
+                 eta=None,
                  PI=None,
-                 TAU=None):
+                 TAU=None,
+                 map=None,
+                 beta=None,
+                 N=None,
+                 Nc_design=None):
         """
-        :type eta: float
-        :type PI:  float
-        :type TAU: float
+        :type eta:       float
+        :type PI:        float
+        :type TAU:       float
+        :type map:       huracan.components.maps.performance_map
+        :type beta:      float
+        :type N:         float
+        :type Nc_design: float
         """
         super().__init__(eta=eta,
                          PI=PI,
-                         TAU=TAU)
+                         TAU=TAU,
+                         map=map,
+                         beta=beta,
+                         N=N,
+                         Nc_design=Nc_design)
 
     def tf(self, gas):
+        if self.map is not None:
+            PI, eta = self.lookup(gas)
+            return gas.compression(eta=eta, PI=PI)
         return gas.compression(eta=self.eta, PI=self.PI, TAU=self.TAU)
 
 
@@ -60,19 +134,34 @@ class turbine(screw):
     -------
 
     Adiabatic expansion.
+
+    The pressure ratios of turbine performance maps are
+    expansion ratios (inlet over outlet total pressure).
     """
     def __init__(self,
-                 eta,
+                 eta=None,
                  PI=None,
-                 TAU=None):
+                 TAU=None,
+                 map=None,
+                 beta=None,
+                 N=None,
+                 Nc_design=None):
         """
-        :type eta: float
-        :type PI:  float
-        :type TAU: float
+        :type eta:       float
+        :type PI:        float
+        :type TAU:       float
+        :type map:       huracan.components.maps.performance_map
+        :type beta:      float
+        :type N:         float
+        :type Nc_design: float
         """
         super().__init__(eta=eta,
                          PI=PI,
-                         TAU=TAU)
+                         TAU=TAU,
+                         map=map,
+                         beta=beta,
+                         N=N,
+                         Nc_design=Nc_design)
 
     def tf(self, gas):
         """
@@ -80,17 +169,28 @@ class turbine(screw):
         ratio has been provided, a minimum total temperature
         ratio is calculated.
         This temperature ratio is that required to power the
-        work exerting components in the turbine's shaft.
+        work exerting components in the turbine's shaft, and
+        it is calculated anew each time the turbine is run.
         """
+        if self.map is not None:
+            PI, eta = self.lookup(gas)
+            return gas.expansion(eta=eta, PI=1/PI)
+
+        TAU = self.TAU
+
         if isinstance(self.PI, type(None)) and isinstance(self.TAU, type(None)):
             t00 = self.stream.gas.t0
-            t01 = self.stream.gas.t0 - self.shaft.w_r()/(self.stream.gas.mf*self.stream.gas.cp(t00))
-            self.TAU = t01/t00
+            t01 = self.stream.gas.t0 - self.w_r()/(self.stream.gas.mf*self.stream.gas.cp0)
+            TAU = t01/t00
 
-        return gas.expansion(eta=self.eta, PI=self.PI, TAU=self.TAU)
+        return gas.expansion(eta=self.eta, PI=self.PI, TAU=TAU)
 
     def w_r(self):
-        return self.shaft.w_r()
+        """
+        Power required from the turbine: its share of the power
+        required by its shaft (see huracan.engine.power_balance).
+        """
+        return self.stream.power_balance().power(self)
 
 
 class fan(screw):
@@ -105,19 +205,34 @@ class fan(screw):
     """
 
     def __init__(self,
-                 eta,
+                 eta=None,
                  PI=None,
-                 TAU=None):
+                 TAU=None,
+                 map=None,
+                 beta=None,
+                 N=None,
+                 Nc_design=None):
         """
-        :type eta: float
-        :type PI:  float
-        :type TAU: float
+        :type eta:       float
+        :type PI:        float
+        :type TAU:       float
+        :type map:       huracan.components.maps.performance_map
+        :type beta:      float
+        :type N:         float
+        :type Nc_design: float
         """
         super().__init__(eta=eta,
-                         PI= PI,
-                         TAU=TAU)
+                         PI=PI,
+                         TAU=TAU,
+                         map=map,
+                         beta=beta,
+                         N=N,
+                         Nc_design=Nc_design)
 
     def tf(self, gas):
+        if self.map is not None:
+            PI, eta = self.lookup(gas)
+            return gas.compression(eta=eta, PI=PI)
         return gas.compression(eta=self.eta, PI=self.PI, TAU=self.TAU)
 
 
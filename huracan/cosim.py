@@ -0,0 +1,238 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan co-simulation
+---------------------
+
+Closed-loop simulation of transient engine models (see
+huracan.transient) with a controller in the loop. At each time
+step the controller reads the sensors of the engine:
+
+- 't':  time
+- 'N':  relative speed of each dynamic shaft, by shaft name
+- 't0': total temperature at the exit of each stage, by stage name
+- 'p0': total pressure at the exit of each stage, by stage name
+
+and sets its actuators, which are held during the step. Actuators
+are engine definition values (see huracan.definition.override),
+such as the fuel mass flow 'cc.fuel.mf' or a bleed fraction
+'bleed.fraction', or the exit area '<stream>.A_exit' of a stream
+whose nozzle area is a matching residual of the simulation.
+
+    def controller(t, sensors, actuators):
+        actuators['cc.fuel.mf'] += 0.01*(0.95 - sensors['N']['spool'])
+
+    sim = transient(definition, unknowns, residuals, inputs={'cc.t01': None})
+    co  = cosimulation(sim, controller, actuators={'cc.fuel.mf': 0.33}, capacity=10000)
+    co.run(t_end=60, dt=1e-2)
+
+    co.log['spool.N'], co.log['0.cc.t0'], co.log['cc.fuel.mf']
+
+Each step is recorded in a ring buffer of fixed capacity, keeping
+the latest steps of long closed-loop runs in bounded memory.
+"""
+
+import numpy as np
+
+from huracan.offdesign import nozzle_area
+
+
+class ring:
+    """
+    Ring buffer
+    -----------
+
+    Fixed capacity buffer of rows of named columns, overwriting
+    its oldest rows when full.
+    """
+    def __init__(self, capacity, columns):
+        """
+        :type capacity: int
+        :type columns:  list of str
+        """
+        self.columns  = list(columns)
+        self.index    = {c: i for i, c in enumerate(self.columns)}
+        self.capacity = capacity
+        self.data     = np.full((capacity, len(self.columns)), np.nan)
+        self.head     = 0
+        self.count    = 0
+
+    def append(self, row):
+        """
+        :type row: np.ndarray
+        """
+        self.data[self.head] = row
+        self.head  = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def array(self):
+        """
+        Stored rows, oldest first.
+
+        :rtype: np.ndarray
+        """
+        if self.count < self.capacity:
+            return self.data[:self.count].copy()
+        return np.roll(self.data, -self.head, axis=0)
+
+    def __getitem__(self, column):
+        """
+        Stored values of a column, oldest first.
+        """
+        i = self.index[column]
+        if self.count < self.capacity:
+            return self.data[:self.count, i].copy()
+        return np.concatenate([self.data[self.head:, i], self.data[:self.head, i]])
+
+    def __len__(self):
+        return self.count
+
+
+class cosimulation:
+    """
+    Controller-in-the-loop co-simulation
+    ------------------------------------
+    """
+    def __init__(self, sim, controller, actuators, stages=None, capacity=10000, method='heun'):
+        """
+        :param sim:        Transient simulation.
+        :param controller: Function of the time, sensors and actuators,
+                           setting the values of the actuators in place.
+        :param actuators:  Initial values of the actuators.
+        :param stages:     Stages whose total temperature and pressure are
+                           sensed. By default, all stages of the engine.
+        :param capacity:   Number of steps kept in the ring buffer.
+        :param method:     Integration method: 'euler' or 'heun'.
+
+        :type sim:         huracan.transient.transient
+        :type controller:  callable
+        :type actuators:   dict
+        :type stages:      list of str
+        :type capacity:    int
+        :type method:      str
+        """
+        assert method in ['euler', 'heun'], f'Co-simulation: unknown method {method}.'
+
+        self.sim        = sim
+        self.controller = controller
+        self.actuators  = dict(actuators)
+        self.method     = method
+
+        # Nozzle area actuators set the targets of nozzle area residuals
+        nozzles      = {f'{r.stream}.A_exit': r for r in sim.problem.residuals if isinstance(r, nozzle_area)}
+        self.nozzles = {a: nozzles[a] for a in self.actuators if a in nozzles}
+
+        # End-of-step solution, reused at the start of the next step
+        # if the controller holds the actuators
+        self.last = None
+
+        self.t = 0
+        self.x, s = sim.steady(0, inputs=self.inputs())
+        self.z    = np.array([s[u] for u in sim.problem.unknowns])
+
+        # Component of each stage
+        model       = s.model
+        self.names  = {c.stage: name for name, c in model.components.items() if hasattr(c, 'stage')}
+        self.stages = list(self.names.keys()) if stages is None else list(stages)
+
+        assert all(s in self.names for s in self.stages), \
+            f'Co-simulation: the stages of the engine are {list(self.names.keys())}.'
+
+        self.sensors = {'t':  self.t,
+                        'N':  {s: 1.0 for s in sim.shafts},
+                        't0': {s: np.nan for s in self.stages},
+                        'p0': {s: np.nan for s in self.stages}}
+        self.sense(model)
+
+        columns  = ['t'] + sim.states + list(self.actuators) + \
+                   [f'{s}.t0' for s in self.stages] + [f'{s}.p0' for s in self.stages] + sim.outputs
+        self.log = ring(capacity, columns)
+        self.row = np.empty(len(columns))
+        self.record(model)
+
+    def inputs(self):
+        """
+        Definition values set by the actuators.
+        """
+        for a, r in self.nozzles.items():
+            r.target = self.actuators[a]
+        return {k: v for k, v in self.actuators.items() if k not in self.nozzles}
+
+    def held(self, actuators):
+        """
+        Whether the actuators hold the given values.
+
+        :type actuators: dict
+        """
+        return actuators.keys() == self.actuators.keys() and \
+            all(np.array_equal(v, self.actuators[k]) for k, v in actuators.items())
+
+    def sense(self, model):
+        """
+        Update the sensors from the engine model at the current
+        time and states.
+        """
+        self.sensors['t'] = self.t
+        for i, s in enumerate(self.sim.shafts):
+            self.sensors['N'][s] = float(self.x[i])
+        for s in self.stages:
+            c = model[self.names[s]]
+            self.sensors['t0'][s] = float(c.t0)
+            self.sensors['p0'][s] = float(c.p0)
+
+    def record(self, model):
+        """
+        Record the current step in the ring buffer.
+        """
+        row, i = self.row, 0
+        for v in [[self.t], self.x, self.actuators.values(),
+                  self.sensors['t0'].values(), self.sensors['p0'].values(),
+                  [np.squeeze(v) for v in model.results(self.sim.outputs).values()]]:
+            for value in v:
+                row[i] = value
+                i += 1
+        self.log.append(row)
+
+    def step(self, dt):
+        """
+        Advance the co-simulation by one time step: the controller
+        sets the actuators from the current sensors, and the states
+        are integrated with the actuators held during the step.
+
+        :type dt: float
+        """
+        sim = self.sim
+
+        self.controller(self.t, self.sensors, self.actuators)
+        inputs = self.inputs()
+
+        if self.last is not None and self.held(self.last[0]):
+            f, s = self.last[1:]
+        else:
+            f, s = sim.derivatives(self.t, self.x, self.z, inputs=inputs)
+        if self.method == 'euler':
+            self.x = self.x + dt*f
+        else:
+            f2, _ = sim.derivatives(self.t + dt, self.x + dt*f, s.x, inputs=inputs)
+            self.x = self.x + dt/2*(f + f2)
+        self.t = self.t + dt
+
+        # Engine at the end of the step
+        f, s      = sim.derivatives(self.t, self.x, s.x, inputs=inputs)
+        self.z    = s.x
+        self.last = ({k: np.copy(v) for k, v in self.actuators.items()}, f, s)
+
+        self.sense(s.model)
+        self.record(s.model)
+
+    def run(self, t_end, dt):
+        """
+        Run the co-simulation until t_end.
+
+        :type t_end: float
+        :type dt:    float
+        """
+        while self.t < t_end - 1e-12:
+            self.step(min(dt, t_end - self.t))
+        return self.log
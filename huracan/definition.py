@@ -0,0 +1,485 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan engine definitions
+--------------------------
+
+Declarative engine definitions: plain dictionaries, which can be
+stored as JSON or TOML, describing the gas, fuels, components,
+shafts, streams, splits and merges of an engine. For example, a
+turbojet with a compressor bleed:
+
+    {
+        "gas":        {"mf": 160, "m": 0, "t_0": 288, "p_0": 101325,
+                       "cp": {"model": "piecewise_constant", "values": [1000, 1150], "breakpoints": [600]},
+                       "k":  {"model": "piecewise_constant", "values": [1.4, 1.33], "breakpoints": [600]}},
+        "fuels":      {"jet_a": {"LHV": 43e6}},
+        "components": {"i":  {"type": "inlet", "PI": 0.92},
+                       "c1": {"type": "compressor", "eta": 0.85, "PI": 4},
+                       "bd": {"type": "bleed_duct", "t01": 288.15, "eta": 0.95},
+                       "c2": {"type": "compressor", "eta": 0.85, "PI": 4},
+                       "cc": {"type": "combustion_chamber", "fuel": "jet_a", "eta": 0.97, "t01": 1450},
+                       "t1": {"type": "turbine", "eta": 0.9},
+                       "t2": {"type": "turbine", "eta": 0.9},
+                       "n":  {"type": "nozzle", "eta": 0.95}},
+        "shafts":     {"lp": {"components": ["c1", "t2"], "eta": 0.99},
+                       "hp": {"components": ["c2", "t1"], "eta": 0.99}},
+        "streams":    {"main":  ["i", "c1"],
+                       "core":  ["c2", "cc", "t1", "t2", "n"],
+                       "bleed": ["bd"]},
+        "splits":     [{"stream": "main", "fraction": 0.005, "into": ["core", "bleed"]}]
+    }
+
+- Gas properties are numbers (calorically perfect gas) or property
+  model specifications: the name of a model of huracan.thermo.properties
+  under "model" and its arguments.
+- Components are specified by their class under "type" and their
+  arguments. Fuels are referred to by name or given inline, and each
+  component is given its own fuel instance. Performance maps are
+  given as the path of a map file, as a map of a compiled map library
+  ({"library": <directory>, "name": <map>}), or inline as the arguments
+  of huracan.components.maps.performance_map.
+- Shafts are specified by their components and the arguments of
+  huracan.engine.shaft, optionally including their relative speed
+  "N" and, for transient simulation, their polar moment of inertia
+  "I" and design rotational speed "omega".
+- A split diverts the given fraction of the mass flow of a stream into
+  the second stream it splits into, as <stream>*fraction does.
+- A merge mixes the gases of a list of streams into a new stream:
+  {"streams": ["core", "bypass"], "into": "mixed"}.
+
+Definitions are identified by the digest of their canonical JSON
+serialization, so identical definitions have identical digests
+regardless of key order.
+
+Built engines can be run again with some of their values changed,
+without being built anew (see model.set and model.rerun).
+"""
+
+import json
+import inspect
+import hashlib
+import numpy as np
+from copy import deepcopy
+
+from huracan import components as huracan_components
+from huracan.engine import stream, shaft
+from huracan.components.maps import performance_map, read_map, library
+from huracan.thermo import properties
+from huracan.thermo.fluids import gas, fuel
+
+
+component_types = ['intake', 'inlet', 'nozzle', 'bleed_duct',
+                   'fan', 'prop', 'propfan', 'compressor', 'turbine',
+                   'combustion_chamber', 'afterburner',
+                   'electrical_system',
+                   'intercooler']
+
+property_models = ['constant', 'piecewise_constant', 'polynomial', 'tabulated']
+
+
+"""
+Serialization
+"""
+def canonical(definition):
+    """
+    Canonical JSON serialization of a definition.
+
+    NumPy arrays and scalars, as used in batched evaluations,
+    are serialized as lists and numbers.
+
+    :type definition: dict
+
+    :rtype: str
+    """
+    return json.dumps(definition, sort_keys=True, separators=(',', ':'), default=lambda o: np.asarray(o).tolist())
+
+
+def digest(definition):
+    """
+    SHA-256 digest of the canonical serialization of a definition.
+
+    :type definition: dict
+
+    :rtype: str
+    """
+    return hashlib.sha256(canonical(definition).encode()).hexdigest()
+
+
+def loads(text, fmt='json'):
+    """
+    Parse a definition from a JSON or TOML string.
+
+    :type text: str
+    :type fmt:  str
+
+    :rtype: dict
+    """
+    assert fmt in ['json', 'toml'], "Definition format must be either 'json' or 'toml'."
+
+    if fmt == 'json':
+        return json.loads(text)
+
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ImportError('Loading TOML engine definitions requires Python 3.11 or the tomli package.')
+
+    return tomllib.loads(text)
+
+
+def load(path):
+    """
+    Read a definition from a JSON (.json) or TOML (.toml) file.
+
+    :type path: str or pathlib.Path
+
+    :rtype: dict
+    """
+    path = str(path)
+    with open(path, 'r') as f:
+        return loads(f.read(), fmt='toml' if path.endswith('.toml') else 'json')
+
+
+def override(definition, values):
+    """
+    Return a copy of a definition with some of its values replaced.
+
+    Values are addressed by dotted paths:
+    - 'gas.<attribute>'        gas attributes, such as 'gas.m' or 'gas.t_0'
+    - '<component>.<argument>' component arguments, such as 'cc.t01'
+    - '<component>.fuel.<arg>' fuel arguments of a component, such as 'cc.fuel.mf'
+    - '<shaft>.<argument>'     shaft arguments, such as 'hp.eta' or 'hp.N'
+    - '<stream>.fraction'      fraction of the split diverting the given stream,
+                               such as a bleed fraction 'bleed.fraction'
+
+    :type definition: dict
+    :type values:     dict
+
+    :rtype: dict
+    """
+    d = deepcopy(definition)
+    for path, v in values.items():
+        name, attr = path.split('.', 1)
+        if name == 'gas':
+            d['gas'][attr] = v
+        elif name in d.get('components', {}) and attr.startswith('fuel.'):
+            f = d['components'][name]['fuel']
+            f = dict(d['fuels'][f]) if isinstance(f, str) else dict(f)
+            f[attr.split('.', 1)[1]] = v
+            d['components'][name]['fuel'] = f
+        elif name in d.get('components', {}):
+            d['components'][name][attr] = v
+        elif name in d.get('shafts', {}):
+            d['shafts'][name][attr] = v
+        elif attr == 'fraction' and name in [s['into'][1] for s in d.get('splits', [])]:
+            d['splits'] = [{**s, 'fraction': v} if s['into'][1] == name else s for s in d['splits']]
+        else:
+            raise AssertionError(f'Definition override: {name} is not the gas, a component, a shaft '
+                                 f'nor a diverted stream of the engine.')
+    return d
+
+
+"""
+Building
+"""
+def build_property(spec):
+    """
+    Create a property model from its specification.
+
+    :type spec: float or dict
+    """
+    if not isinstance(spec, dict):
+        return properties.constant(spec)
+
+    spec = dict(spec)
+    name = spec.pop('model')
+
+    assert name in property_models, f'Unknown property model {name}. Available models: {property_models}.'
+
+    return getattr(properties, name)(**spec)
+
+
+def build_gas(spec):
+    """
+    Create a gas from its specification.
+
+    :type spec: dict
+    """
+    spec = dict(spec)
+    spec['cp'] = build_property(spec['cp'])
+    spec['k']  = build_property(spec['k'])
+    return gas(**spec)
+
+
+libraries = {}
+
+
+def open_library(path):
+    """
+    Map library at the given path, opened once per process.
+
+    :type path: str
+    """
+    if path not in libraries:
+        libraries[path] = library(path)
+    return libraries[path]
+
+
+def build_component(spec, fuels):
+    """
+    Create a component from its specification.
+
+    :type spec:  dict
+    :type fuels: dict
+    """
+    spec = dict(spec)
+    kind = spec.pop('type')
+
+    assert kind in component_types, f'Unknown component type {kind}. Available components: {component_types}.'
+
+    if 'fuel' in spec:
+        f = spec['fuel']
+        spec['fuel'] = fuel(**(fuels[f] if isinstance(f, str) else f))
+
+    if 'map' in spec:
+        m = spec['map']
+        if isinstance(m, str):
+            spec['map'] = read_map(m)
+        elif 'library' in m:
+            spec['map'] = open_library(m['library'])[m['name']]
+        else:
+            spec['map'] = performance_map(**m)
+
+    return getattr(huracan_components, kind)(**spec)
+
+
+def arguments(c, spec):
+    """
+    Arguments of a component kept as its attributes of the same name,
+    which can be set once the component is built.
+
+    :type c:    component
+    :type spec: dict
+
+    :rtype: set of str
+    """
+    bound = inspect.signature(type(c)).bind_partial(**{k: v for k, v in spec.items() if k != 'type'})
+    bound.apply_defaults()
+    return {k for k, v in bound.arguments.items() if k != 'fuel' and k in vars(c) and vars(c)[k] is v}
+
+
+class model:
+    """
+    Engine model
+    ------------
+
+    Engine built from a definition. Its components, shafts and
+    streams are accessible by their names in the definition:
+
+        model[<component, shaft or stream name>]
+    """
+    def __init__(self, definition):
+        """
+        :type definition: dict
+        """
+        self.definition = definition
+
+        fuels = definition.get('fuels', {})
+
+        self.components = {name: build_component(spec, fuels) for name, spec in definition['components'].items()}
+        self.shafts     = {name: shaft(*[self.components[c] for c in spec['components']],
+                                       **{k: v for k, v in spec.items() if k != 'components'})
+                           for name, spec in definition.get('shafts', {}).items()}
+
+        self.build_streams(definition)
+
+        # Values which can be set on the built engine (see set)
+        self.arguments = {name: arguments(self.components[name], spec)
+                          for name, spec in definition['components'].items()}
+        self.fuels     = {name: dict(vars(c.fuel)) for name, c in self.components.items() if hasattr(c, 'fuel')}
+        self.splits    = {s['into'][1]: s['into'] for s in definition.get('splits', [])}
+        self.gas       = {**definition['gas'], 'cp': self.stream.gas.cp, 'k': self.stream.gas.k}
+        self.inlet     = self.stream.gas.snapshot()
+        self.values    = {}
+
+    def build_streams(self, definition):
+        """
+        Create the engine streams.
+
+        The root stream (the only stream neither created by a
+        split nor by a merge) is created first, and the splits
+        and merges are then performed as soon as the streams
+        they act on exist.
+        """
+        streams = definition['streams']
+        splits  = list(definition.get('splits', []))
+        merges  = list(definition.get('merges', []))
+
+        created = [n for s in splits for n in s['into']] + [m['into'] for m in merges]
+        root    = [name for name in streams if name not in created]
+
+        assert len(root) == 1, f'Engine definition: there must be a single root stream, found {root}.'
+
+        self.root    = root[0]
+        self.streams = {self.root: stream(build_gas(definition['gas']))}
+        self.extend(self.root, streams[self.root])
+
+        while splits or merges:
+            ready_splits = [s for s in splits if s['stream'] in self.streams]
+            ready_merges = [m for m in merges if all([n in self.streams for n in m['streams']])]
+
+            assert ready_splits or ready_merges, \
+                'Engine definition: some splits or merges act on streams which are never created.'
+
+            for s in ready_splits:
+                splits.remove(s)
+                a, b = s['into']
+                self.streams[a], self.streams[b] = self.streams[s['stream']].divert(s['fraction'], names=s.get('names', None))
+                self.extend(a, streams.get(a, []))
+                self.extend(b, streams.get(b, []))
+
+            for m in ready_merges:
+                merges.remove(m)
+                merged = self.streams[m['streams'][0]]
+                for n in m['streams'][1:]:
+                    merged = merged-self.streams[n]
+                self.streams[m['into']] = merged
+                self.extend(m['into'], streams.get(m['into'], []))
+
+    def extend(self, name, components):
+        """
+        Add components to a stream.
+
+        :type name:       str
+        :type components: list of str
+        """
+        for c in components:
+            self.streams[name]-self.components[c]
+
+    @property
+    def digest(self):
+        """
+        Digest of the definition of the engine, including the
+        values set on it since it was built.
+        """
+        return digest(override(self.definition, self.values) if self.values else self.definition)
+
+    def __getitem__(self, item):
+        for d in [self.components, self.shafts, self.streams]:
+            if item in d:
+                return d[item]
+        raise KeyError(f'{item} is not a component, shaft or stream of the engine.')
+
+    @property
+    def stream(self):
+        """
+        Root stream of the engine.
+        """
+        return self.streams[self.root]
+
+    def run(self, log=False):
+        """
+        Run the engine.
+        """
+        self.stream.run(log=log)
+        return self
+
+    def set(self, values):
+        """
+        Set definition values (see override) on the built engine, so
+        that it can be run again with them (see rerun) without being
+        built anew: its components, performance maps, shafts and
+        streams are kept.
+
+        :type values: dict
+        """
+        for path, v in values.items():
+            name, attr = path.split('.', 1)
+            if name == 'gas':
+                self.gas[attr] = build_property(v) if attr in ['cp', 'k'] else v
+                self.inlet     = None
+            elif name in self.components and attr.startswith('fuel.'):
+                self.fuels[name][attr.split('.', 1)[1]] = v
+            elif name in self.components:
+                assert attr in self.arguments[name], \
+                    f'Engine model: {attr} is not an argument of component {name} which can be set once built.'
+                setattr(self.components[name], attr, v)
+            elif name in self.shafts:
+                setattr(self.shafts[name], attr, v)
+            elif attr == 'fraction' and name in self.splits:
+                a, b = self.splits[name]
+                self.streams[a].runtime_d['fr'] = v
+                self.streams[b].runtime_d['fr'] = 1 - v
+            else:
+                raise AssertionError(f'Engine model: {name} is not the gas, a component, a shaft '
+                                     f'nor a diverted stream of the engine.')
+        self.values.update(values)
+        return self
+
+    def rerun(self, log=False):
+        """
+        Run the engine again from its inlet, with the values set on
+        it since it was built (see set). The fuel mass flows computed
+        in previous runs are discarded, and all streams start from the
+        inlet gas state, as when the engine is first run.
+        """
+        if self.inlet is None:
+            self.inlet = gas(**self.gas).snapshot()
+
+        for name, f in self.fuels.items():
+            vars(self.components[name].fuel).update(f)
+
+        for s in self.streams.values():
+            # Merged streams are mixed anew from their parents
+            if not (hasattr(s, 'parents') and len(s.parents) > 1):
+                s.gas.restore(self.inlet)
+            s.ran = False
+
+        return self.run(log=log)
+
+    def results(self, outputs):
+        """
+        Return a dictionary of engine outputs. Outputs are either
+        - the name of a stream or system method, such as 'thrust_total'
+          or 'sfc', evaluated on the root stream (and so on the engine
+          system if there is one), or
+        - a '<name>.<attribute>' path, such as 'cc.t0', 'cc.fuel.mf' or
+          'core.v_exit', evaluated on the given component, shaft or stream.
+
+        The engine must have been run.
+
+        :type outputs: list of str
+
+        :rtype: dict
+        """
+        results = {}
+        for output in outputs:
+            if '.' in output:
+                name, *attrs = output.split('.')
+                v = self[name]
+                for attr in attrs:
+                    v = getattr(v, attr)
+            else:
+                v = getattr(self.stream, output)
+            results[output] = v() if callable(v) else v
+        return results
+
+
+def build(definition, values=None):
+    """
+    Build an engine model from a definition, optionally
+    overriding some of its values (see override).
+
+    :type definition: dict
+    :type values:     dict
+
+    :rtype: model
+    """
+    if values:
+        definition = override(definition, values)
+    return model(definition)
@@ -17,7 +17,7 @@ import matplotlib.pyplot as plt
 from huracan.constants import R
 from huracan import component_codes
 from huracan.physical_quantities import physical_quantities
-from huracan.utils import markers, join_set_distance, delta, colorscheme_one
+from huracan.utils import markers, join_set_distance, delta, colorscheme_one, where
 
 
 class component_set_constructor(type):
@@ -99,6 +99,19 @@ class set_of_components:
                 # Replace public method by takeover
                 setattr(self, k, takeover(self, k))
 
+    def __getstate__(self):
+        """
+        The methods set as instance attributes when the set
+        is integrated in a superset are not pickled. They
+        are set anew when the set is unpickled.
+        """
+        return {k: v for k, v in self.__dict__.items() if not isinstance(v, types.MethodType)}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'superset' in state:
+            self.integrate_in_system()
+
 
 class set_of_streams:
     """
@@ -129,19 +142,46 @@ class component:
             s = stream()-other
             return s
 
+    inputs = ['eta', 'PI', 'TAU']
+
     def __call__(self, gas):
         """
         Component transfer function execution
+
+        The process attributes are set as attributes of the
+        component, except for the component inputs, which
+        are left untouched so that the component can be
+        re-run after being modified. The process itself is
+        kept as the process attribute of the component.
         """
         p = self.tf(gas)
+        self.process = p
         for k, v in p.__dict__.items():
+            if k in self.inputs:
+                continue
             if k[-2:] == '01':
                 k = k[0] + '0'
             setattr(self, k, v)
 
-        # Gas state variables
-        for sv in ['V', 'S', 'H']:
-            setattr(self, sv, getattr(gas, sv))
+        # Gas state after the component
+        self.outlet = gas.snapshot()
+
+    """
+    Gas state variables after the component
+
+    Computed from the outlet snapshot only when read.
+    """
+    @property
+    def V(self):
+        return self.outlet.V
+
+    @property
+    def S(self):
+        return self.outlet.S
+
+    @property
+    def H(self):
+        return self.outlet.H
 
 
 class shaft:
@@ -149,16 +189,29 @@ class shaft:
     Shaft
     -----
     """
-    def __init__(self, *args, eta, eta_gearbox=1):
-        """
-        :param args: list of components connected by the shaft.
-        :param eta:  mechanical efficiency of the shaft.
-
-        :type args:  component
-        :type eta:   float
+    def __init__(self, *args, eta, eta_gearbox=1, N=1, I=None, omega=None):
+        """
+        :param args:  list of components connected by the shaft.
+        :param eta:   mechanical efficiency of the shaft.
+        :param N:     rotational speed of the shaft relative to its
+                      design speed, used to read the performance maps
+                      of its components.
+        :param I:     [kg*m^2] polar moment of inertia of the shaft and
+                      the components it connects, used in transient
+                      simulations.
+        :param omega: [rad/s] design rotational speed of the shaft.
+
+        :type args:   component
+        :type eta:    float
+        :type N:      float
+        :type I:      float
+        :type omega:  float
         """
         self.eta         = eta
         self.eta_gearbox = eta_gearbox
+        self.N           = N
+        self.I           = I
+        self.omega       = omega
         self.components  = list(args)
 
         for c in args:
@@ -191,16 +244,185 @@ class shaft:
             "belongs have been run up to the respective work " \
             "exerting component."
 
-        work = np.array([c.w/self.eta_gearbox if c.__class__.__name__ in ['fan', 'prop', 'propfan']
-                         else c.w for c in wem])
-        etas = np.array([c.shaft.eta for c in wem])
-        w_r_m = np.sum(work/etas)                           # Power required by work exerting components
+        work = [c.w/self.eta_gearbox if c.__class__.__name__ in ['fan', 'prop', 'propfan']
+                else c.w for c in wem]
+        etas = [c.shaft.eta for c in wem]
+        w_r_m = sum([w/eta for w, eta in zip(work, etas)])  # Power required by work exerting components
 
         electrical = self.electrical_plants()               # FIXME: ugly
         w_r_e = sum([c.w_r for c in electrical])            # Power required by all electrical plants
 
         return w_r_m + w_r_e
 
+    def turbines(self):
+        """
+        Return a list of the turbines providing the power
+        required by the shaft: those whose work is set by the
+        power balance of the shaft (no pressure or temperature
+        ratio nor performance map given), or if there are none,
+        all turbines in the shaft.
+        """
+        turbines = [c for c in self.components if c.__class__.__name__ == 'turbine']
+        free     = [t for t in turbines if t.PI is None and t.TAU is None and t.map is None]
+        return free if free else turbines
+
+
+class power_balance:
+    """
+    Power balance
+    -------------
+
+    Allocation of the power required by all shafts to their
+    turbines, and of the power of the turbines to the combustion
+    chambers heating their flow, as a single linear map of the
+    power required by the shafts w_r and the power extracted by
+    the turbines whose pressure or temperature ratio or performance
+    map is given w_f (fixed turbines):
+
+        w_t = L [w_r, w_f]      Power of each turbine
+        Q   = B w_t             Heat required from each combustion chamber
+
+    The power of the turbines of all shafts is solved for at once from
+    a single linear system: the power of the turbines of each shaft adds
+    up to that required by the shaft, fixed turbines extract their own
+    power, and the remainder is split evenly among the turbines whose
+    work is set by the power balance (see shaft.turbines). The system
+    depends only on the structure of the engine, and is assembled and
+    solved once per run (see stream.power_balance), so that the power of
+    each turbine does not depend on the order in which the shafts are
+    processed. The power of a turbine is split evenly among the combustion
+    chambers upstream of it, so that no power is counted twice.
+
+    Fixed turbines must be upstream of the turbines whose work is set by
+    the power balance of their shaft, so that their power is known when
+    required.
+    """
+    def __init__(self, streams):
+        """
+        :type streams: list of stream
+        """
+        components = [c for s in streams for c in s.components]
+
+        self.shafts   = list(dict.fromkeys([c.shaft for c in components if hasattr(c, 'shaft')]))
+        self.turbines = [t for s in self.shafts for t in s.turbines()]
+        self.fixed    = [t for s in self.shafts for t in s.components
+                         if t.__class__.__name__ == 'turbine' and t not in s.turbines()]
+        self.chambers = [c for c in components if c.__class__.__name__ == 'combustion_chamber']
+
+        turbines   = self.turbines + self.fixed
+        self.index = {t: i for i, t in enumerate(turbines)}
+
+        ns, nf, m = len(self.shafts), len(self.fixed), len(turbines)
+
+        # Shaft incidence of the fixed turbines
+        self.F = np.array([[f.shaft is s for f in self.fixed] for s in self.shafts], dtype=float).reshape(ns, nf)
+
+        # Linear system M w_t = S [w_r, w_f], one equation per turbine
+        M   = np.zeros((m, m))
+        S   = np.zeros((m, ns + nf))
+        row = 0
+        for j, s in enumerate(self.shafts):
+            free = s.turbines()
+            if not free:
+                continue
+            # Power balance of the shaft
+            M[row, [self.index[t] for t in free + [f for f in self.fixed if f.shaft is s]]] = 1
+            S[row, j] = 1
+            row += 1
+            # Even split among the turbines providing the power of the shaft
+            for a, b in zip(free[:-1], free[1:]):
+                M[row, [self.index[a], self.index[b]]] = 1, -1
+                row += 1
+        for k, f in enumerate(self.fixed):
+            assert all([self.upstream(f, t) for t in f.shaft.turbines()]), \
+                'Power balance: the turbines of given work of a shaft must be upstream of ' \
+                'those whose work is set by the power balance of the shaft.'
+            M[row, self.index[f]] = 1
+            S[row, ns + k]        = 1
+            row += 1
+
+        self.L = np.linalg.solve(M, S) if m else np.zeros((0, ns + nf))
+        self.L[np.abs(self.L) < 1e-12] = 0
+
+        # Power of the turbines providing the power of each shaft per unit shaft power
+        self.A = self.L[:len(self.turbines), :ns]
+
+        # Combustion chambers heating the flow of each turbine
+        self.B = np.array([[self.upstream(c, t) for t in turbines] for c in self.chambers],
+                          dtype=float).reshape(len(self.chambers), m)
+        self.B = self.B/np.maximum(self.B.sum(axis=0), 1)
+
+        self.Q = self.B @ self.L
+        self.Q[np.abs(self.Q) < 1e-12] = 0
+
+    @staticmethod
+    def upstream(a, b):
+        """
+        Whether component a is upstream of component b: earlier in its
+        stream, or in a stream upstream of that of b.
+        """
+        if b.stream is a.stream:
+            return a.stream.components.index(b) > a.stream.components.index(a)
+        return any([b.stream is s for s in a.downstream])
+
+    def allocate(self, weights):
+        """
+        Weighted sum of the power required by the shafts and the power
+        extracted by the fixed turbines. Only the shafts and turbines
+        with non-zero weights are evaluated, so that only they must have
+        been run.
+
+        :param weights: One weight per shaft, followed by one per fixed turbine.
+
+        :type weights:  np.ndarray
+        """
+        ns = len(self.shafts)
+        return sum([w*self.shafts[j].w_r() if j < ns else w*self.extracted(self.fixed[j - ns])
+                    for j, w in enumerate(weights) if w != 0])
+
+    @staticmethod
+    def extracted(f):
+        """
+        Power extracted from the flow by a fixed turbine.
+
+        :type f: huracan.components.rotary.turbine
+        """
+        assert hasattr(f, 'w'), \
+            'Power balance: the turbines of given work of a shaft must be run before ' \
+            'the power required from the other turbines of the shaft is calculated.'
+        return -f.w
+
+    def power(self, t):
+        """
+        Power required from a turbine.
+
+        :type t: huracan.components.rotary.turbine
+        """
+        if t not in self.index:
+            return 0
+        return self.allocate(self.L[self.index[t]])
+
+    def heat(self, c):
+        """
+        Minimum heat required from a combustion chamber: the power
+        of the turbines it heats. The power of the fixed turbines it
+        heats cancels out, so that only the power of those upstream
+        of it is required.
+
+        :type c: huracan.components.power.combustion.combustion_chamber
+        """
+        return self.allocate(self.Q[self.chambers.index(c)])
+
+    def imbalance(self):
+        """
+        Power extracted from the flow by the turbines of each shaft
+        minus the power required by the shaft, once the engine is run.
+
+        :return: One entry per shaft.
+        """
+        return [-sum([c.w for c in s.components if c.__class__.__name__ == 'turbine']) - s.w_r()
+                for s in self.shafts]
+
 
 class stream(set_of_components, metaclass=component_set_constructor):
     """
@@ -325,8 +547,8 @@ class stream(set_of_components, metaclass=component_set_constructor):
             main.stream_id.append(names[0])
             div.stream_id.append(names[1])
         else:
-            mf_matrix = np.array([[main.gas.mf * fr,     main],
-                                  [div.gas.mf  * (1-fr), div]])
+            mf_matrix = np.array([[np.mean(main.gas.mf * fr),     main],
+                                  [np.mean(div.gas.mf  * (1-fr)), div]])
             mf_matrix = mf_matrix[mf_matrix[:, 0].argsort()]
 
             for i in range(mf_matrix[:, 1].size):
@@ -412,7 +634,7 @@ class stream(set_of_components, metaclass=component_set_constructor):
             print(section_name)
 
             if c.__class__.__name__ == 'nozzle':
-                if c.choked:
+                if np.any(c.choked):
                     print(' '*d + 'Choked flow')
             print(f'{" "*d} T0 {str(c.t0)[:10]} [K]')
             print(f'{" "*d} p0 {str(c.p0)[:10]} [Pa]')
@@ -430,14 +652,17 @@ class stream(set_of_components, metaclass=component_set_constructor):
 
         assert hasattr(self, 'gas'), 'stream does not have a gas attribute.'
 
+        self.balance = None
+
         self.choked = False                                 # FIXME: choked flow implementation is ugly
 
-        for c in self.components:
-            c(self.gas)                    # Run thermodynamic process on stream gas
-            c.stage = self.stage_name(c)   # Set component stage name
+        # Gas state snapshots at each stage boundary:
+        #    snapshots[i] is the state of the gas at the inlet of the
+        #    i-th component of the stream, and snapshots[-1] that at
+        #    the stream outlet.
+        self.snapshots = [self.gas.snapshot()]
 
-            if hasattr(c, 'choked') and c.choked:           # FIXME: ugly
-                self.choked = c.choked
+        self.execute(self.components)
 
         # Indicate stream has been run.
         self.ran = True
@@ -445,6 +670,62 @@ class stream(set_of_components, metaclass=component_set_constructor):
         if log:
             self.log()
 
+    def rerun(self, stage=None, log=True):
+        """
+        Re-run the stream from a given stage.
+
+        The gas is restored to the snapshot taken at the inlet
+        of the given stage, and the transfer functions of the
+        component at that stage and all components downstream
+        of it are executed. The upstream components are not
+        run again, so modifications of the components downstream
+        of the stage can be evaluated cheaply.
+
+        If no stage is given, the stream is re-run from its inlet.
+
+        :type stage: str
+        """
+        assert self.ran, 'The stream must be run before it can be re-run.'
+
+        i = 0 if isinstance(stage, type(None)) else self.stages().index(stage)
+
+        self.balance = None
+
+        if i == 0 and hasattr(self, 'parents') and len(self.parents) > 1:
+            # The inlet state of merged streams depends on their parents
+            self.merge()
+            self.snapshots = [self.gas.snapshot()]
+        else:
+            self.gas.restore(self.snapshots[i])
+            del self.snapshots[i+1:]
+
+        self.choked = False
+        for c in self.components[:i]:
+            if hasattr(c, 'choked'):
+                self.choked = self.choked | c.choked
+
+        self.execute(self.components[i:])
+
+        if log:
+            self.log()
+
+    def execute(self, components):
+        """
+        Execute the transfer functions of the given stream components,
+        recording a gas state snapshot after each of them.
+
+        :type components: list of component
+        """
+        for c in components:
+            c.inlet = self.snapshots[-1]   # Gas state before the component
+            c(self.gas)                    # Run thermodynamic process on stream gas
+            c.stage = self.stage_name(c)   # Set component stage name
+
+            self.snapshots.append(c.outlet)
+
+            if hasattr(c, 'choked'):                        # FIXME: ugly
+                self.choked = self.choked | c.choked
+
     def runtime(self):
         if hasattr(self, 'parents') and len(self.parents) > 1:
             self.merge()
@@ -454,16 +735,18 @@ class stream(set_of_components, metaclass=component_set_constructor):
             f(v)
 
     def merge(self):
-        if hasattr(self, 'gas'):
-            for s in self.parents:
-                self.gas += s.gas
-        else:
-            self.gas = self.parents[0].gas
-            for s in self.parents[1:]:
-                self.gas += s.gas
+        """
+        Merge the gases of the parent streams.
+
+        The mixture is always created anew from the parent
+        gases, so that the stream can be re-run.
+        """
+        self.gas = self.parents[0].gas
+        for s in self.parents[1:]:
+            self.gas += s.gas
 
     def fr(self, fr):
-        self.gas, _ = fr * deepcopy(self.gas)
+        self.gas, _ = deepcopy(self.gas) * fr        # fluid first, so that array fractions are not broadcast by NumPy
 
     """
     Stream fluid state
@@ -555,16 +838,20 @@ class stream(set_of_components, metaclass=component_set_constructor):
                 # taken.
                 t_before_exit = deepcopy(self.gas).absolute().t01
 
-        if self.choked:
-            return (self.gas.k(t_before_exit)*R*t_before_exit)**0.5         # M=1 immediately before nozzle exit
-        else:
-            assert t_before_exit - self.gas.t0 > 0, 'The total temperature of the flow is lower before ' \
-                                                    'the nozzle tha outside the engine: this happens due to the ' \
-                                                    'compressors not providing enough energy to the flow. You must ' \
-                                                    'either increase the pressure ratio of the compressors or ' \
-                                                    'decrease the power extracted from the flow to solve the ' \
-                                                    'inconsistency.'
-            return (2*self.gas.cp(t_before_exit)*(t_before_exit - self.gas.t0))**0.5    # Heat -> Kinetic energy
+        # M=1 immediately before nozzle exit
+        v_choked   = (self.gas.k(t_before_exit)*R*t_before_exit)**0.5
+        # Heat -> Kinetic energy
+        v_expanded = (2*self.gas.cp(t_before_exit)*np.maximum(t_before_exit - self.gas.t0, 0))**0.5
+
+        assert np.all((t_before_exit - self.gas.t0 > 0) | self.choked), \
+            'The total temperature of the flow is lower before ' \
+            'the nozzle tha outside the engine: this happens due to the ' \
+            'compressors not providing enough energy to the flow. You must ' \
+            'either increase the pressure ratio of the compressors or ' \
+            'decrease the power extracted from the flow to solve the ' \
+            'inconsistency.'
+
+        return where(self.choked, v_choked, v_expanded)
 
     def A_exit(self):
         """
@@ -572,6 +859,18 @@ class stream(set_of_components, metaclass=component_set_constructor):
         """
         return self.gas.mf*R*self.gas.t0/(self.gas.p0*self.v_exit())
 
+    """
+    Power balance
+    """
+    def power_balance(self):
+        """
+        Power balance of the shafts of the stream, built once
+        per run of the stream.
+        """
+        if getattr(self, 'balance', None) is None:
+            self.balance = power_balance([self])
+        return self.balance
+
     """
     Fuel consumption
     """
@@ -594,11 +893,10 @@ class stream(set_of_components, metaclass=component_set_constructor):
 
         If the flow is choked, the expansion of the gas contributes to the thrust of the flow.
         """
-        if self.choked:
-            return self.gas.mf * (self.v_exit() - self.gas.v_0) + self.A_exit() * (
-                        self.gas.p0 - self.gas.p_0)
-        else:
-            return self.gas.mf * (self.v_exit() - self.gas.v_0)
+        thrust = self.gas.mf * (self.v_exit() - self.gas.v_0)
+        if np.any(self.choked):
+            thrust = thrust + where(self.choked, self.A_exit() * (self.gas.p0 - self.gas.p_0), 0)
+        return thrust
 
     def thrust_prop(self):
         """
@@ -686,7 +984,8 @@ class stream(set_of_components, metaclass=component_set_constructor):
         """
         Stream propulsive efficiency.
         """
-        return 2/(1+self.v_exit()/self.gas.v_0) if self.gas.v_0 > 0 else 0
+        v_0 = where(self.gas.v_0 > 0, self.gas.v_0, np.inf)
+        return where(self.gas.v_0 > 0, 2/(1+self.v_exit()/v_0), 0)
 
     def efficiency_total(self):
         if hasattr(self, 'system'):
@@ -940,6 +1239,8 @@ class system(set_of_streams, metaclass=stream_set_constructor):
 
         self.sort_streams()
 
+        self.balance = None
+
         n = 0
         while not all([s.ran for s in self.streams]):
             for s in self.streams:
@@ -947,6 +1248,47 @@ class system(set_of_streams, metaclass=stream_set_constructor):
                     s._run(log)
             n += 1
 
+    def rerun(self, stage=None, log=True):
+        """
+        Re-run the system from a given stage.
+
+        The stream containing the stage is re-run from it, and
+        all streams downstream of it are re-run from their inlets.
+        Streams upstream of the stage, or in parallel to it, are
+        not run again.
+
+        If no stage is given, all streams are re-run from their inlets.
+
+        :type stage: str
+        """
+        assert all([s.ran for s in self.streams]), 'The system must be run before it can be re-run.'
+
+        self.sort_streams()
+
+        self.balance = None
+
+        if isinstance(stage, type(None)):
+            rerun = self.streams
+        else:
+            origin = [s for s in self.streams if stage in s.stages()]
+            assert len(origin) > 0, 'Specified a non-existent stage.'
+            origin[0]._rerun(stage, log)
+            rerun = [s for s in self.streams if origin[0] in self.ancestors(s)]
+
+        for s in rerun:
+            s._rerun(None, log)
+
+    def ancestors(self, s):
+        """
+        Return all streams upstream of a given stream.
+
+        :type s: stream
+        """
+        ancestors = []
+        for parent in getattr(s, 'parents', []):
+            ancestors += [parent] + self.ancestors(parent)
+        return ancestors
+
     def sort_streams(self):
         """
         Sort system streams based on their stream ID
@@ -967,6 +1309,18 @@ class system(set_of_streams, metaclass=stream_set_constructor):
             parents += s.parents if hasattr(s, 'parents') else []
         return parents
 
+    """
+    Power balance
+    """
+    def power_balance(self):
+        """
+        Power balance of the shafts of the system, built once
+        per run of the system.
+        """
+        if getattr(self, 'balance', None) is None:
+            self.balance = power_balance(self.streams)
+        return self.balance
+
     """
     Fuel consumption
     """
@@ -0,0 +1,923 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan off-design analysis
+---------------------------
+
+Off-design operating points are found by matching the engine
+components: a set of unknowns (engine definition values, such
+as the inlet mass flow, compressor pressure ratios or turbine
+temperature ratios) is solved for so that a set of matching
+residuals vanishes, such as
+
+- Mass flow continuity through components of fixed flow capacity
+  (corrected flow at their inlet equal to that at the design point)
+  or with performance maps (corrected flow at their inlet equal to
+  that read from their map)
+- Power balance of the shafts
+- Flow capacity of the nozzles (exit area equal to that at the
+  design point)
+
+The residuals are solved simultaneously with a Newton-Raphson
+method. The Jacobian is obtained by finite differences, all of
+which are evaluated in a single batched run of the engine: each
+unknown is given an array of values (the current point followed
+by one perturbation per unknown), which the engine processes
+element-wise.
+
+    residuals = [flow_capacity('t'), shaft_balance('hp'), nozzle_area('core')]
+
+    design(definition, residuals)
+
+    p = problem(definition,
+                unknowns={'gas.mf': 20, 'c.PI': 10, 't.TAU': 0.8},
+                residuals=residuals,
+                inputs={'cc.t01': 1300})
+
+    s = newton(p)
+
+For engines with many streams, shafts and bleeds, the Jacobian
+is sparse: most unknowns only affect their own shaft and the
+components downstream of them. Its sparsity pattern is derived
+from the dependency graph of the engine, so that unknowns which
+affect disjoint sets of residuals are perturbed together:
+
+    p = problem(definition, unknowns, residuals, inputs, sparse=True)
+
+Quasi-Newton methods reusing the Jacobian across iterations
+(chord) or updating it (Broyden) need a single engine evaluation
+per iteration, rather than one per unknown plus one:
+
+    s = newton(p, method='broyden')
+
+    print(s.report())
+
+Sweeps over many operating points are solved by continuation:
+the points are visited in an order in which each follows a close
+one, and each is solved from the solution of its closest already
+converged neighbour.
+
+    solutions = sweep(p, {'cc.t01': np.linspace(1400, 1000, 9)})
+"""
+
+import warnings
+import numpy as np
+
+from huracan.definition import build, override
+
+
+"""
+Matching residuals
+"""
+class residual:
+    """
+    Matching residual
+    -----------------
+
+    Difference between a value of the engine and its target,
+    normalized by a scale (by default the magnitude of the
+    target). Unless given, the target is set to the value at
+    the design point by the design function.
+    """
+    def __init__(self, target=None, scale=None):
+        """
+        :type target: float
+        :type scale:  float
+        """
+        self.target = target
+        self.scale  = scale
+
+    def __call__(self, model):
+        """
+        :type model: huracan.definition.model
+        """
+        assert self.target is not None, \
+            f'{self.__class__.__name__} residual has no target: provide one, or obtain it from the design point.'
+
+        scale = self.scale if self.scale is not None else max(abs(self.target), 1e-12)
+        return (self.value(model) - self.target)/scale
+
+    def design(self, model):
+        """
+        Set the target of the residual to its value in a
+        (design point) engine model, unless already given.
+
+        :type model: huracan.definition.model
+        """
+        if self.target is None:
+            self.target = float(self.value(model))
+
+    def reads(self, graph):
+        """
+        Stages of the dependency graph of the engine read by the
+        residual, or None if unknown (see sparsity).
+
+        :type graph: graph
+        """
+        return None
+
+
+class output(residual):
+    """
+    Output residual
+    ---------------
+
+    Any engine output (see huracan.definition.model.results),
+    such as 'thrust_total' or 'cc.t0'.
+    """
+    def __init__(self, name, target=None, scale=None):
+        """
+        :type name: str
+        """
+        super().__init__(target=target, scale=scale)
+        self.name = name
+
+    def value(self, model):
+        return model.results([self.name])[self.name]
+
+    def reads(self, graph):
+        if '.' in self.name:
+            name = self.name.split('.', 1)[0]
+            if name in graph.model.components:
+                return {graph.model.components[name]}
+            if name in graph.model.streams:
+                return {graph.exit(graph.model.streams[name])}
+        return None
+
+
+class flow_capacity(residual):
+    """
+    Flow capacity residual
+    ----------------------
+
+    Corrected mass flow at the inlet of a component:
+
+        mf*t0**0.5/p0
+    """
+    def __init__(self, component, target=None, scale=None):
+        """
+        :type component: str
+        """
+        super().__init__(target=target, scale=scale)
+        self.component = component
+
+    def value(self, model):
+        inlet = model[self.component].inlet
+        return inlet.mf*inlet.t0**0.5/inlet.p0
+
+    def reads(self, graph):
+        return {graph.inlet(graph.model[self.component])}
+
+
+class map_flow(residual):
+    """
+    Map flow residual
+    -----------------
+
+    Corrected mass flow entering a component with a performance
+    map relative to the corrected mass flow read from its map.
+    """
+    def __init__(self, component, scale=None):
+        """
+        :type component: str
+        """
+        super().__init__(target=0, scale=1 if scale is None else scale)
+        self.component = component
+
+    def value(self, model):
+        c = model[self.component]
+        return c.Wc_in/c.Wc - 1
+
+    def reads(self, graph):
+        return {graph.model[self.component]}
+
+
+class shaft_balance(residual):
+    """
+    Shaft power balance residual
+    ----------------------------
+
+    Power extracted from the flow by the turbines of a shaft
+    minus the power required by the shaft, relative to the
+    latter.
+    """
+    def __init__(self, shaft, scale=None):
+        """
+        :type shaft: str
+        """
+        super().__init__(target=0, scale=1 if scale is None else scale)
+        self.shaft = shaft
+
+    def value(self, model):
+        s = model[self.shaft]
+        w_r = s.w_r()
+        w_t = -sum([c.w for c in s.components if c.__class__.__name__ == 'turbine'])
+        return (w_t - w_r)/w_r
+
+    def reads(self, graph):
+        return set(graph.model[self.shaft].components)
+
+
+class nozzle_area(residual):
+    """
+    Nozzle area residual
+    --------------------
+
+    Exit area of a stream.
+    """
+    def __init__(self, stream, target=None, scale=None):
+        """
+        :type stream: str
+        """
+        super().__init__(target=target, scale=scale)
+        self.stream = stream
+
+    def value(self, model):
+        return model[self.stream].A_exit()
+
+    def reads(self, graph):
+        return {graph.exit(graph.model[self.stream])}
+
+
+def design(definition, residuals, inputs=None):
+    """
+    Run the engine at its design point and set the targets of
+    the given residuals to their design values.
+
+    :type definition: dict
+    :type residuals:  list of residual
+    :type inputs:     dict
+
+    :return: design point engine model
+    """
+    model = build(definition, inputs).run()
+    for r in residuals:
+        r.design(model)
+    return model
+
+
+def design_speeds(definition, inputs=None):
+    """
+    Set the design corrected speed of the components with performance
+    maps which are not given one to that at the design point, so that
+    their maps are read relative to it at off-design operating points
+    (see huracan.components.rotary.screw).
+
+    :type definition: dict
+    :type inputs:     dict
+
+    :return: Engine definition, copied if any design corrected speed is set.
+    """
+    missing = [name for name, spec in definition['components'].items()
+               if 'map' in spec and spec.get('Nc_design') is None]
+    if not missing:
+        return definition
+
+    model = build(definition, inputs).run()
+    return override(definition, {f'{name}.Nc_design': np.asarray(model[name].Nc_design).tolist() for name in missing})
+
+
+"""
+Jacobian structure
+"""
+class graph:
+    """
+    Dependency graph
+    ----------------
+
+    Directed graph of the stages of an engine model, joining each
+    stage to those whose state depends on it:
+
+    - The next stage of its stream. Each stream has an inlet and an
+      exit stage, and the exit of a stream leads to the inlet of the
+      streams split from or merged with it.
+    - Across shafts, the turbines powering a work exerting component
+      (unless their pressure or temperature ratio is given, or they
+      have a performance map), and the combustion chambers heating
+      the flow of those turbines.
+    """
+    def __init__(self, model):
+        """
+        :type model: huracan.definition.model
+        """
+        self.model = model
+        self.edges = {}
+
+        streams = []
+        pending = list(model.streams.values())
+        while pending:
+            s = pending.pop()
+            if s not in streams:
+                streams.append(s)
+                pending += getattr(s, 'parents', [])
+
+        for s in streams:
+            stages = [('inlet', s)] + s.components + [('exit', s)]
+            for a, b in zip(stages[:-1], stages[1:]):
+                self.edge(a, b)
+            for parent in getattr(s, 'parents', []):
+                self.edge(('exit', parent), ('inlet', s))
+
+        for c in model.components.values():
+            kind = c.__class__.__name__
+            if kind == 'turbine' and c.PI is None and c.TAU is None and c.map is None:
+                for p in self.power(c.shaft):
+                    self.edge(p, c)
+            if kind == 'combustion_chamber':
+                for s in c.downstream:
+                    for t in s.components:
+                        if t.__class__.__name__ == 'turbine':
+                            for p in self.power(t.shaft):
+                                self.edge(p, c)
+
+    def edge(self, a, b):
+        self.edges.setdefault(a, set()).add(b)
+
+    @staticmethod
+    def power(s):
+        """
+        Components setting the power required by a shaft.
+
+        :type s: huracan.engine.shaft
+        """
+        return s.w_exerting_machinery() + s.electrical_plants()
+
+    def reachable(self, stages):
+        """
+        Stages depending on (and including) the given stages.
+
+        :type stages: set
+
+        :rtype: set
+        """
+        reached = set(stages)
+        pending = list(stages)
+        while pending:
+            for b in self.edges.get(pending.pop(), ()):
+                if b not in reached:
+                    reached.add(b)
+                    pending.append(b)
+        return reached
+
+    def inlet(self, c):
+        """
+        Stage preceding a component, which sets its inlet state.
+
+        :type c: huracan.engine.component
+        """
+        i = c.stream.components.index(c)
+        return c.stream.components[i-1] if i > 0 else ('inlet', c.stream)
+
+    def exit(self, s):
+        """
+        Exit stage of a stream.
+
+        :type s: huracan.engine.stream
+        """
+        return ('exit', s)
+
+    def seeds(self, unknown):
+        """
+        Stages directly modified by an engine definition value
+        (see huracan.definition.override), or None if unknown.
+
+        :type unknown: str
+        """
+        name = unknown.split('.', 1)[0]
+        if name == 'gas':
+            return {('inlet', self.model.stream)}
+        if name in self.model.components:
+            return {self.model.components[name]}
+        if name in self.model.shafts:
+            return set(self.model.shafts[name].components)
+        return None
+
+
+def sparsity(model, unknowns, residuals):
+    """
+    Sparsity pattern of the Jacobian of a set of matching
+    residuals with respect to a set of unknowns, obtained from
+    the dependency graph of the engine: an unknown can only
+    affect a residual if the latter reads a stage depending on
+    the stages modified by the unknown. Unknowns or residuals
+    of unknown structure are assumed to affect or depend on
+    all others.
+
+    :type model:     huracan.definition.model
+    :type unknowns:  list of str
+    :type residuals: list of residual
+
+    :return: Boolean array, one row per residual and one
+             column per unknown.
+
+    :rtype: np.ndarray
+    """
+    g       = graph(model)
+    reached = [g.seeds(u) for u in unknowns]
+    reached = [None if s is None else g.reachable(s) for s in reached]
+    reads   = [r.reads(g) for r in residuals]
+
+    pattern = np.ones((len(residuals), len(unknowns)), dtype=bool)
+    for i, stages in enumerate(reads):
+        for j, affected in enumerate(reached):
+            if stages is not None and affected is not None:
+                pattern[i, j] = not stages.isdisjoint(affected)
+    return pattern
+
+
+def column_groups(pattern):
+    """
+    Group the columns of a sparse Jacobian so that no two columns
+    of a group have non-zero entries in the same row. All columns
+    of a group can then be estimated from a single perturbation.
+    Greedy grouping, in order of decreasing number of non-zeros.
+
+    :type pattern: np.ndarray
+
+    :rtype: list of list of int
+    """
+    groups = []
+    rows   = []
+    for j in np.argsort(-pattern.sum(axis=0), kind='stable'):
+        for g, r in zip(groups, rows):
+            if not np.any(r & pattern[:, j]):
+                g.append(int(j))
+                r |= pattern[:, j]
+                break
+        else:
+            groups.append([int(j)])
+            rows.append(pattern[:, j].copy())
+    return groups
+
+
+def solve(J, b, sparse=False):
+    """
+    Least squares solution of J x = b. Square systems are solved
+    with SciPy's sparse LU decomposition if sparse and SciPy is
+    available, and with NumPy otherwise.
+
+    :type J:      np.ndarray
+    :type b:      np.ndarray
+    :type sparse: bool
+    """
+    if sparse and J.shape[0] == J.shape[1]:
+        try:
+            from scipy.sparse import csc_matrix
+            from scipy.sparse.linalg import spsolve, MatrixRankWarning
+        except ImportError:
+            pass
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', MatrixRankWarning)
+                x = spsolve(csc_matrix(J), b)
+            if np.all(np.isfinite(x)):
+                return x
+    return np.linalg.lstsq(J, b, rcond=None)[0]
+
+
+"""
+Matching problem
+"""
+class problem:
+    """
+    Matching problem
+    ----------------
+    """
+    def __init__(self, definition, unknowns, residuals, inputs=None, sparse=False, persistent=False):
+        """
+        :param definition: Engine definition.
+        :param unknowns:   Definition values to solve for (see
+                           huracan.definition.override) and their
+                           initial guesses.
+        :param residuals:  Matching residuals.
+        :param inputs:     Fixed definition values defining the
+                           operating point, such as the flight Mach
+                           number or the combustor exit temperature.
+        :param sparse:     Whether to exploit the sparsity of the Jacobian
+                           (see sparsity): the columns of the Jacobian are
+                           then estimated in groups, and the Newton steps
+                           solved with sparse linear algebra.
+        :param persistent: Whether to keep the engine models built at the first
+                           evaluations, and at later evaluations set the values of
+                           the unknowns and inputs on them and run them again (see
+                           huracan.definition.model.set) rather than building the
+                           engine anew. Single points and batches are evaluated on
+                           separate models, and the model of a solution is then
+                           overwritten by later evaluations.
+
+        :type definition:  dict
+        :type unknowns:    dict
+        :type residuals:   list of residual
+        :type inputs:      dict
+        :type sparse:      bool
+        :type persistent:  bool
+        """
+        self.definition = design_speeds(definition)
+        self.unknowns   = list(unknowns.keys())
+        self.x0         = np.array(list(unknowns.values()), dtype=float)
+        self.residuals  = list(residuals)
+        self.inputs     = dict(inputs) if inputs else {}
+        self.sparse     = sparse
+        self.persistent = persistent
+
+        self.pattern = None
+        self.groups  = None
+
+        self.models = {}
+        self.point  = None
+
+        self.evaluations = 0
+
+    def structure(self):
+        """
+        Sparsity pattern of the Jacobian and groups of its columns
+        (see sparsity and column_groups), obtained once from the
+        engine built at the initial guess.
+
+        :return: [np.ndarray]         Sparsity pattern.
+                 [list of list of int] Column groups.
+        """
+        if self.pattern is None:
+            model        = build(self.definition, {**self.inputs, **dict(zip(self.unknowns, self.x0))})
+            self.pattern = sparsity(model, self.unknowns, self.residuals)
+            self.groups  = column_groups(self.pattern)
+        return self.pattern, self.groups
+
+    def evaluate(self, X):
+        """
+        Evaluate the residuals for a batch of values of the
+        unknowns in a single engine run.
+
+        :param X: Values of the unknowns, one column per point.
+
+        :type X:  np.ndarray
+
+        :return:  [np.ndarray] Residuals, one column per point.
+                  [model]      Engine model.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float).T).T
+        n = X.shape[1]
+
+        values = {**self.inputs, **{u: X[i] if n > 1 else X[i, 0] for i, u in enumerate(self.unknowns)}}
+
+        if self.persistent:
+            key = n > 1, tuple(values.keys())
+            if key in self.models:
+                model = self.models[key].set(values).rerun()
+            else:
+                model = self.models[key] = build(self.definition, values).run()
+            if n == 1:
+                self.point = X[:, 0].copy()
+        else:
+            model = build(self.definition, values).run()
+
+        self.evaluations += n
+
+        return np.array([np.broadcast_to(r(model), (n,)) for r in self.residuals]), model
+
+    def jacobian(self, x, r=None, step=1e-6):
+        """
+        Finite difference Jacobian of the residuals at x. All
+        perturbations (and the evaluation at x itself, if its
+        residuals are not given) are evaluated in a single
+        batched engine run.
+
+        If the problem is sparse, all unknowns of a column group
+        are perturbed together, and so a single perturbation is
+        needed per group rather than per unknown.
+
+        :param step: Relative finite difference step.
+
+        :return:     [np.ndarray] Jacobian
+                     [np.ndarray] Residuals at x
+        """
+        h = step*np.maximum(np.abs(x), 1)
+
+        if self.sparse:
+            pattern, groups = self.structure()
+            group = np.empty(len(x), dtype=int)
+            for g, columns in enumerate(groups):
+                group[columns] = g
+            H = np.zeros((len(x), len(groups)))
+            H[np.arange(len(x)), group] = h
+        else:
+            H = np.diag(h)
+
+        X = x[:, None] + H
+
+        if r is None:
+            F, _ = self.evaluate(np.hstack([x[:, None], X]))
+            r, F = F[:, 0], F[:, 1:]
+        else:
+            F, _ = self.evaluate(X)
+
+        if self.sparse:
+            return np.where(pattern, (F[:, group] - r[:, None])/h[None, :], 0), r
+
+        return (F - r[:, None])/h[None, :], r
+
+
+class solution:
+    """
+    Matching solution
+    -----------------
+    """
+    def __init__(self, problem, x, r, iterations, converged, model,
+                 evaluations=None, jacobians=0, history=None, J=None):
+        """
+        :param x:           Values of the unknowns.
+        :param r:           Residuals.
+        :param iterations:  Number of iterations.
+        :param converged:   Whether the residuals were brought within tolerance.
+        :param model:       Engine model run at the solution.
+        :param evaluations: Number of engine evaluations (operating points
+                            evaluated) used by the solver.
+        :param jacobians:   Number of finite difference Jacobians evaluated.
+        :param history:     Norm of the residuals at each iteration.
+        :param J:           Last Jacobian (or Jacobian approximation) used.
+        """
+        self.x           = x
+        self.r           = r
+        self.unknowns    = dict(zip(problem.unknowns, x))
+        self.iterations  = iterations
+        self.evaluations = problem.evaluations if evaluations is None else evaluations
+        self.jacobians   = jacobians
+        self.history     = history if history is not None else []
+        self.converged   = converged
+        self.model       = model
+        self.J           = J
+
+    def __getitem__(self, item):
+        return self.unknowns[item]
+
+    def report(self):
+        """
+        Convergence report: norm of the residuals at each iteration,
+        and number of engine evaluations and Jacobians.
+
+        :rtype: str
+        """
+        lines  = [f'{"Converged" if self.converged else "Not converged"} in {self.iterations} iterations, '
+                  f'{self.evaluations} evaluations, {self.jacobians} Jacobians']
+        lines += [f'    {i:>4d}  |r| = {n:.3e}' for i, n in enumerate(self.history)]
+        return '\n'.join(lines)
+
+
+def report(solutions):
+    """
+    Convergence report of a set of matching solutions, such as
+    those of a sweep.
+
+    :type solutions: list of solution
+
+    :rtype: str
+    """
+    converged = sum(s.converged for s in solutions)
+    return f'{converged}/{len(solutions)} points converged, ' \
+           f'{sum(s.iterations for s in solutions)} iterations, ' \
+           f'{sum(s.evaluations for s in solutions)} evaluations, ' \
+           f'{sum(s.jacobians for s in solutions)} Jacobians'
+
+
+methods = ['newton', 'chord', 'broyden']
+
+
+def newton(problem, x0=None, tol=1e-8, maxiter=50, step=1e-6, max_change=0.2,
+           method='newton', J0=None, contraction=0.5, halvings=4):
+    """
+    Newton-Raphson solution of a matching problem.
+
+    Three methods are available:
+
+    - newton:  the Jacobian is evaluated by finite differences at
+               every iteration, in a single batched run together
+               with the residuals.
+    - chord:   the Jacobian is reused across iterations.
+    - broyden: the Jacobian is updated with Broyden's rank-one
+               update after each iteration.
+
+    With the chord and Broyden methods each iteration costs a single
+    engine evaluation, and the Jacobian is only evaluated again when
+    an iteration fails to reduce the norm of the residuals by the
+    given contraction factor. An initial Jacobian, such as that of a
+    solution at a neighbouring operating point, can be provided.
+
+    Steps which increase the norm of the residuals, or lead to points
+    where the engine cannot be run, are halved up to a given number of
+    times. If they still do, the step is rejected when the Jacobian was
+    reused, and retried within the same iteration with the Jacobian
+    evaluated again. Otherwise the step is accepted, or the solver stops
+    if the engine cannot be run.
+
+    :param x0:          Initial guess. By default that of the problem.
+    :param tol:         Tolerance on the norm of the residuals.
+    :param maxiter:     Maximum number of iterations.
+    :param step:        Relative finite difference step.
+    :param max_change:  Maximum relative change of any unknown in a
+                        single iteration.
+    :param method:      'newton', 'chord' or 'broyden'.
+    :param J0:          Initial Jacobian, used by the chord and Broyden methods.
+    :param contraction: Residual reduction per iteration below which the
+                        chord and Broyden methods evaluate the Jacobian again.
+    :param halvings:    Maximum number of step halvings per iteration.
+
+    :type problem:      problem
+    :type x0:           np.ndarray
+    :type method:       str
+    :type J0:           np.ndarray
+
+    :rtype: solution
+    """
+    assert method in methods, f'Unknown method {method}. Available methods: {methods}.'
+
+    x = np.array(problem.x0 if x0 is None else x0, dtype=float)
+
+    start     = problem.evaluations
+    jacobians = 0
+    history   = []
+
+    J = np.array(J0, dtype=float) if J0 is not None and method != 'newton' else None
+
+    F, model = problem.evaluate(x)
+    r        = F[:, 0]
+
+    converged = False
+    for i in range(maxiter + 1):
+        history.append(float(np.linalg.norm(r)))
+
+        # Convergence is checked before any Jacobian is evaluated
+        if history[-1] < tol:
+            converged = True
+            break
+        if i == maxiter:
+            break
+
+        while True:
+            fresh = J is None or method == 'newton'
+            if fresh:
+                J, _ = problem.jacobian(x, r=r, step=step)
+                jacobians += 1
+
+            dx = solve(J, -r, sparse=problem.sparse)
+
+            # Limit the change of the unknowns
+            ratio = np.max(np.abs(dx)/(max_change*np.maximum(np.abs(x), 1e-12)))
+            dx    = dx/max(ratio, 1)
+
+            # Halve steps which increase the norm of the residuals, or
+            # which lead to points where the engine cannot be run
+            for k in range(halvings + 1):
+                try:
+                    F, trial = problem.evaluate(x + dx)
+                    r_new    = F[:, 0]
+                except (AssertionError, ArithmeticError, ValueError):
+                    trial, r_new = None, np.full(len(r), np.nan)
+                if np.linalg.norm(r_new) <= history[-1]:
+                    break
+                if k < halvings:
+                    dx = dx/2
+
+            # The Jacobian is stale: evaluate it again at x, and retry
+            # the step within the same iteration
+            if not np.linalg.norm(r_new) <= history[-1] and not fresh:
+                J = None
+                continue
+            break
+
+        if not np.linalg.norm(r_new) <= history[-1] and trial is None:
+            break
+
+        if method != 'newton' and np.linalg.norm(r_new) > contraction*history[-1]:
+            J = None
+        elif method == 'broyden':
+            J = J + np.outer(r_new - r - J @ dx, dx)/np.dot(dx, dx)
+
+        x, r, model = x + dx, r_new, trial
+
+    if problem.persistent and not np.array_equal(problem.point, x):
+        # The model was last run at a rejected trial point
+        _, model = problem.evaluate(x)
+
+    return solution(problem, x, r, i, converged, model,
+                    evaluations=problem.evaluations - start,
+                    jacobians=jacobians,
+                    history=history,
+                    J=J)
+
+
+"""
+Sweeps
+"""
+def continuation_order(points):
+    """
+    Order in which to visit a set of operating points so that
+    each point follows a close one: a nearest neighbour path
+    through the points, starting at the first one. The inputs
+    are normalized by their range.
+
+    :param points: Values of the inputs, one row per point.
+
+    :type points:  np.ndarray
+
+    :rtype: np.ndarray
+    """
+    points = normalize(points)
+
+    order   = [0]
+    visited = np.zeros(len(points), dtype=bool)
+    visited[0] = True
+
+    for _ in range(len(points) - 1):
+        d = np.sum((points - points[order[-1]])**2, axis=1)
+        d[visited] = np.inf
+        order.append(int(np.argmin(d)))
+        visited[order[-1]] = True
+
+    return np.array(order)
+
+
+def normalize(points):
+    """
+    Operating points with each input normalized by its range.
+    """
+    points = np.asarray(points, dtype=float)
+    span   = np.ptp(points, axis=0)
+    return (points - points.min(axis=0))/np.where(span > 0, span, 1)
+
+
+def sweep(problem, inputs, solver=None, order=True, predictor=True, reuse=False, database=None, **kwargs):
+    """
+    Solve a matching problem over a set of operating points by
+    continuation. Each point is solved starting from the solution
+    of its closest converged point, so that along throttle lines
+    or altitude sweeps only a few iterations are needed per point.
+
+    :param problem:   Matching problem. Its inputs are updated with
+                      those of each point, and restored afterwards.
+    :param inputs:    Definition values defining each operating point:
+                      one array of values per input, all of the same length.
+    :param solver:    Solver taking the problem and an initial guess
+                      x0, such as newton (default).
+    :param order:     Whether to visit the points in continuation order
+                      (see continuation_order) rather than as given.
+    :param predictor: Whether to extrapolate the initial guess of each
+                      point linearly from its two closest converged
+                      points, rather than taking that of the closest.
+    :param reuse:     Whether to pass the Jacobian of the closest converged
+                      point to the solver as its initial Jacobian J0 (see
+                      the chord and Broyden methods of newton).
+    :param database:  Warm-start database (see huracan.warmstart). Points
+                      without converged neighbours start from the closest
+                      stored solution, and converged solutions are stored.
+    :param kwargs:    Keyword arguments of the solver.
+
+    :type problem:   problem
+    :type inputs:    dict
+    :type order:     bool
+    :type predictor: bool
+    :type reuse:     bool
+    :type database:  huracan.warmstart.database
+
+    :return: Solutions, in the order of the given points.
+
+    :rtype: list of solution
+    """
+    solver = newton if solver is None else solver
+
+    names  = list(inputs.keys())
+    points = np.column_stack([np.atleast_1d(np.asarray(inputs[n], dtype=float)) for n in names])
+    scaled = normalize(points)
+
+    fixed     = problem.inputs
+    solutions = [None]*len(points)
+    converged = []
+
+    # The inputs of the problem are restored even if a solve raises
+    try:
+        for k in (continuation_order(points) if order else range(len(points))):
+            x0, J0 = None, None
+            if converged:
+                d = np.sum((scaled[converged] - scaled[k])**2, axis=1)
+                a, b = [converged[i] for i in np.argsort(d)[:2]] if len(converged) > 1 else [converged[0]]*2
+                x0 = solutions[a].x
+                J0 = solutions[a].J if reuse else None
+                # Linear extrapolation from the two closest converged points
+                if predictor and a != b:
+                    ab = scaled[a] - scaled[b]
+                    x0 = x0 + (solutions[a].x - solutions[b].x)*np.dot(scaled[k] - scaled[a], ab)/np.dot(ab, ab)
+
+            problem.inputs = {**fixed, **{n: float(points[k, j]) for j, n in enumerate(names)}}
+            if x0 is None and database is not None:
+                x0 = database.nearest(problem)
+            solutions[k]   = solver(problem, x0=x0, **({'J0': J0} if J0 is not None else {}), **kwargs)
+
+            if solutions[k].converged:
+                converged.append(k)
+                # Stored under the inputs of the point, fixed and swept
+                if database is not None:
+                    database.add(problem, solutions[k])
+    finally:
+        problem.inputs = fixed
+
+    return solutions
@@ -0,0 +1,394 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan design optimization
+---------------------------
+
+Optimization of engine definition values (design variables, such
+as pressure ratios, efficiencies or the combustion chamber exit
+temperature) to minimize or maximize an engine output, such as
+the specific fuel consumption or the total efficiency, subject to
+bounds on the design variables and on any engine outputs, such as
+the turbine inlet temperature or the nozzle exit area.
+
+    r = optimize(definition, 'sfc',
+                 variables={'f.PI': (1.2, 1.8), 'c.PI': (8, 30), 'cc.t01': (1200, 1700)},
+                 constraints=[constraint('cc.t0', upper=1600),
+                              constraint('core.A_exit', upper=0.5)])
+
+    r.x, r.objective, r.feasible
+
+Two methods are available:
+
+- slsqp:     SciPy's sequential least squares programming, with
+             gradients obtained by finite differences.
+- evolution: SciPy-free differential evolution, with constraints
+             handled by feasibility rules.
+
+The method defaults to slsqp if SciPy is available. Either way,
+each iteration evaluates all the points it needs (its finite
+difference stencil or its population) in a single batched engine
+run, and points already evaluated are taken from a cache (see
+huracan.cache).
+"""
+
+import numpy as np
+
+from huracan.definition import build
+from huracan.cache import cache as evaluation_cache, key
+
+
+class constraint:
+    """
+    Output constraint
+    -----------------
+
+    Lower and/or upper bound on an engine output (see
+    huracan.definition.model.results).
+    """
+    def __init__(self, output, lower=None, upper=None):
+        """
+        :type output: str
+        :type lower:  float
+        :type upper:  float
+        """
+        assert lower is not None or upper is not None, \
+            f'Constraint on {output}: at least a lower or an upper bound must be given.'
+
+        self.output = output
+        self.lower  = lower
+        self.upper  = upper
+
+    def margins(self, v):
+        """
+        Margins of the output values v with respect to its bounds,
+        relative to the bounds: negative where violated.
+
+        :type v: np.ndarray
+
+        :rtype: list of np.ndarray
+        """
+        margins = []
+        if self.lower is not None:
+            margins.append((v - self.lower)/max(abs(self.lower), 1e-12))
+        if self.upper is not None:
+            margins.append((self.upper - v)/max(abs(self.upper), 1e-12))
+        return margins
+
+    def gradients(self, dv):
+        """
+        Gradients of the margins given those of the output dv.
+
+        :type dv: np.ndarray
+
+        :rtype: list of np.ndarray
+        """
+        gradients = []
+        if self.lower is not None:
+            gradients.append(dv/max(abs(self.lower), 1e-12))
+        if self.upper is not None:
+            gradients.append(-dv/max(abs(self.upper), 1e-12))
+        return gradients
+
+    def violation(self, v):
+        """
+        Relative violation of the constraint by the output values v.
+
+        :type v: np.ndarray
+
+        :rtype: np.ndarray
+        """
+        return np.maximum(-np.min(self.margins(v), axis=0), 0)
+
+
+class evaluator:
+    """
+    Batched evaluator
+    -----------------
+
+    Engine outputs at points of the design variables. The points
+    not in the cache are evaluated in a single batched engine run.
+    """
+    def __init__(self, definition, variables, outputs, values=None, cache=None):
+        """
+        :param definition: Engine definition.
+        :param variables:  Names of the design variables.
+        :param outputs:    Outputs to evaluate.
+        :param values:     Fixed definition values.
+        :param cache:      Evaluation cache. By default, an in-memory cache.
+
+        :type definition:  dict
+        :type variables:   list of str
+        :type outputs:     list of str
+        :type values:      dict
+        :type cache:       huracan.cache.cache
+        """
+        self.definition = definition
+        self.variables  = list(variables)
+        self.outputs    = list(outputs)
+        self.values     = dict(values) if values else {}
+        self.cache      = evaluation_cache(maxsize=2**16) if cache is None else cache
+
+        self.evaluations = 0
+        self.runs        = 0
+
+    def key(self, x):
+        return key(self.definition, {**self.values, **dict(zip(self.variables, map(float, x)))}, self.outputs)
+
+    def run(self, X):
+        """
+        Outputs at the points X in a single batched engine run.
+        If the engine cannot be run at some of the points (such as
+        points where the compressors do not provide enough energy
+        to the flow), the batch is bisected to isolate them, and
+        they are given non-finite outputs.
+
+        :rtype: np.ndarray
+        """
+        self.runs += 1
+        try:
+            model = build(self.definition, {**self.values, **dict(zip(self.variables, X.T))}).run()
+            r     = model.results(self.outputs)
+            return np.column_stack([np.broadcast_to(r[o], (len(X),)) for o in self.outputs]).astype(float)
+        except (AssertionError, ArithmeticError, ValueError):
+            if len(X) == 1:
+                return np.full((1, len(self.outputs)), np.nan)
+            return np.vstack([self.run(X[:len(X)//2]), self.run(X[len(X)//2:])])
+
+    def __call__(self, X):
+        """
+        :param X: Points, one row per point.
+
+        :type X:  np.ndarray
+
+        :return: Outputs, one row per point and one column per output.
+
+        :rtype: np.ndarray
+        """
+        X    = np.atleast_2d(np.asarray(X, dtype=float))
+        Y    = np.empty((len(X), len(self.outputs)))
+        keys = [self.key(x) for x in X]
+
+        missing = {}
+        for i, k in enumerate(keys):
+            v = self.cache.get(k)
+            if v is None:
+                missing.setdefault(k, []).append(i)
+            else:
+                Y[i] = v
+
+        if missing:
+            rows = [i[0] for i in missing.values()]
+            F    = self.run(X[rows])
+            self.evaluations += len(rows)
+            for (k, i), f in zip(missing.items(), F):
+                self.cache.set(k, f)
+                Y[i] = f
+
+        return Y
+
+
+class result:
+    """
+    Optimization result
+    -------------------
+    """
+    def __init__(self, variables, x, outputs, objective, violation, iterations, evaluator, history):
+        """
+        :param variables:  Names of the design variables.
+        :param x:          Optimal values of the design variables.
+        :param outputs:    Outputs at the optimum.
+        :param objective:  Objective at the optimum.
+        :param violation:  Largest relative constraint violation at the optimum.
+        :param iterations: Number of iterations.
+        :param evaluator:  Evaluator used.
+        :param history:    Best objective at each iteration.
+        """
+        self.x          = dict(zip(variables, x))
+        self.outputs    = outputs
+        self.objective  = objective
+        self.violation  = violation
+        self.feasible   = violation <= 1e-6
+        self.iterations = iterations
+        self.evaluations = evaluator.evaluations
+        self.runs       = evaluator.runs
+        self.history    = history
+
+    def __getitem__(self, item):
+        return self.x[item]
+
+
+methods = ['slsqp', 'evolution']
+
+
+def optimize(definition, objective, variables, constraints=None, maximize=False, values=None,
+             method=None, x0=None, cache=None, maxiter=100, tol=1e-6, step=1e-6, population=None, seed=None):
+    """
+    Optimize an engine output over a set of design variables.
+
+    :param definition:  Engine definition.
+    :param objective:   Output to optimize, such as 'sfc' or 'efficiency_total'.
+    :param variables:   Design variables (see huracan.definition.override)
+                        and their bounds.
+    :param constraints: Constraints on engine outputs.
+    :param maximize:    Whether to maximize the objective rather than minimize it.
+    :param values:      Fixed definition values, such as the flight Mach number.
+    :param method:      'slsqp' or 'evolution'. By default slsqp if SciPy
+                        is available, and evolution otherwise.
+    :param x0:          Initial design. By default the center of the bounds.
+    :param cache:       Evaluation cache (see huracan.cache.cache).
+    :param maxiter:     Maximum number of iterations.
+    :param tol:         Tolerance on the objective.
+    :param step:        Relative finite difference step (slsqp).
+    :param population:  Population size (evolution). By default 15 per variable.
+    :param seed:        Random seed (evolution).
+
+    :type definition:   dict
+    :type objective:    str
+    :type variables:    dict of tuple
+    :type constraints:  list of constraint
+    :type maximize:     bool
+    :type values:       dict
+    :type method:       str
+    :type x0:           dict
+
+    :rtype: result
+    """
+    constraints = list(constraints) if constraints else []
+
+    if method is None:
+        try:
+            import scipy.optimize
+            method = 'slsqp'
+        except ImportError:
+            method = 'evolution'
+    assert method in methods, f'Unknown method {method}. Available methods: {methods}.'
+
+    names   = list(variables.keys())
+    bounds  = np.array([variables[n] for n in names], dtype=float)
+    lo, span = bounds[:, 0], bounds[:, 1] - bounds[:, 0]
+    outputs = list(dict.fromkeys([objective] + [c.output for c in constraints]))
+    f       = evaluator(definition, names, outputs, values, cache)
+    sign    = -1 if maximize else 1
+
+    def design(U):
+        """
+        Design variables from their values normalized by their bounds.
+        """
+        return lo + np.clip(U, 0, 1)*span
+
+    def objectives(Y):
+        return np.where(np.isfinite(Y[:, 0]), sign*Y[:, 0], np.inf)
+
+    def violations(Y):
+        v = np.zeros(len(Y))
+        for c in constraints:
+            v = np.maximum(v, c.violation(Y[:, outputs.index(c.output)]))
+        return np.where(np.all(np.isfinite(Y), axis=1), v, np.inf)
+
+    u0 = np.full(len(names), 0.5) if x0 is None else (np.array([x0[n] for n in names], dtype=float) - lo)/span
+
+    if method == 'slsqp':
+        u, iterations, history = slsqp(f, design, outputs, constraints, sign, u0, maxiter, tol, step)
+    else:
+        u, iterations, history = evolution(f, design, objectives, violations, sign, u0, maxiter, tol, population, seed)
+
+    x = design(u)
+    Y = f(x)
+    return result(names, x, dict(zip(outputs, Y[0])), float(Y[0, 0]), float(violations(Y)[0]),
+                  iterations, f, history)
+
+
+def slsqp(f, design, outputs, constraints, sign, u0, maxiter, tol, step):
+    """
+    Sequential least squares programming over the normalized
+    design variables. The objective, the constraints and their
+    gradients are obtained from a single batched run of the
+    current point and its finite difference stencil, cached
+    for the objective and constraint functions to share.
+    """
+    from scipy.optimize import minimize
+
+    n     = len(u0)
+    Y0    = f(design(u0))
+    scale = max(abs(float(Y0[0, 0])), 1e-12) if np.isfinite(Y0[0, 0]) else 1
+
+    def stencil(u):
+        # Forward differences, stepping backwards at the upper bounds
+        h = np.where(u + step <= 1, step, -step)
+        U = np.vstack([u, u + np.diag(h)])
+        Y = f(design(U))
+        return Y[0], (Y[1:] - Y[0]).T/h
+
+    def fun(u):
+        return sign*stencil(u)[0][0]/scale
+
+    def jac(u):
+        return sign*stencil(u)[1][0]/scale
+
+    cons = []
+    for c in constraints:
+        i = outputs.index(c.output)
+        for j in range(len(c.margins(0.))):
+            cons.append({'type': 'ineq',
+                         'fun':  lambda u, c=c, i=i, j=j: c.margins(stencil(u)[0][i])[j],
+                         'jac':  lambda u, c=c, i=i, j=j: c.gradients(stencil(u)[1][i])[j]})
+
+    history = []
+    r = minimize(fun, u0, jac=jac, method='SLSQP', bounds=[(0, 1)]*n, constraints=cons,
+                 options={'maxiter': maxiter, 'ftol': tol},
+                 callback=lambda u: history.append(float(fun(u))*scale*sign))
+
+    return np.clip(r.x, 0, 1), r.nit, history
+
+
+def evolution(f, design, objectives, violations, sign, u0, maxiter, tol, population, seed):
+    """
+    Differential evolution (rand/1/bin) over the normalized design
+    variables. Each generation is evaluated in a single batched
+    run. Candidates replace their parents following feasibility
+    rules: feasible points are preferred to infeasible ones, and
+    among them those of lower objective (if feasible) or lower
+    constraint violation (if not). The candidates are ranked by the
+    signed objective, and the history records the objective itself.
+    """
+    rng = np.random.default_rng(seed)
+    n   = len(u0)
+    m   = population if population is not None else 15*n
+
+    U    = rng.random((m, n))
+    U[0] = u0
+    Y    = f(design(U))
+    F, V = objectives(Y), violations(Y)
+
+    def better(f1, v1, f2, v2):
+        return np.where((v1 <= 1e-6) & (v2 <= 1e-6), f1 <= f2, v1 < v2)
+
+    feasible   = V <= 1e-6
+    best       = np.argmin(np.where(feasible, F, np.inf)) if np.any(feasible) else np.argmin(V)
+    generation = -1
+
+    history = []
+    for generation in range(maxiter):
+        # Mutation and crossover
+        r = np.array([rng.choice(np.delete(np.arange(m), i), 3, replace=False) for i in range(m)])
+        M = np.clip(U[r[:, 0]] + rng.uniform(0.5, 1)*(U[r[:, 1]] - U[r[:, 2]]), 0, 1)
+        C = np.where(rng.random((m, n)) < 0.9, M, U)
+        j = rng.integers(n, size=m)
+        C[np.arange(m), j] = M[np.arange(m), j]
+
+        Yc     = f(design(C))
+        Fc, Vc = objectives(Yc), violations(Yc)
+
+        replace = better(Fc, Vc, F, V)
+        U[replace], F[replace], V[replace] = C[replace], Fc[replace], Vc[replace]
+
+        feasible = V <= 1e-6
+        best     = np.argmin(np.where(feasible, F, np.inf)) if np.any(feasible) else np.argmin(V)
+        history.append(float(sign*F[best]))
+
+        if np.all(feasible) and np.ptp(F) <= tol*max(abs(F[best]), 1e-12):
+            break
+
+    return U[best], generation + 1, history
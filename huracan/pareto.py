@@ -0,0 +1,281 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan Pareto fronts
+---------------------
+
+Multi-objective post-processing of columnar results (dictionaries
+of arrays, one value per point, as returned by sweeps, throttle
+matching and batched evaluations): non-dominated fronts, their
+crowding distances and their hypervolumes.
+
+    p = front(results, ['thrust_total', 'sfc', 'core.A_exit'], maximize=['thrust_total'])
+
+    p['sfc'], p['crowding']
+
+Objectives are gathered into a matrix of one row per point, with
+maximized objectives negated so that all are minimized. The first
+front is found by sorting, in O(n log n) time, for two and three
+objectives, and by vectorized pairwise comparisons for more. Points
+with non-finite objectives belong to no front.
+"""
+
+import numpy as np
+
+
+def matrix(results, objectives, maximize=None):
+    """
+    Objectives of each point, all to be minimized.
+
+    :param results:    Columnar results.
+    :param objectives: Names of the objective columns.
+    :param maximize:   Names of the objectives to maximize.
+
+    :type results:     dict of np.ndarray
+    :type objectives:  list of str
+    :type maximize:    list of str
+
+    :return: Objectives, one row per point and one column per objective.
+
+    :rtype: np.ndarray
+    """
+    maximize = maximize if maximize else []
+
+    assert all(m in objectives for m in maximize), 'Pareto front: maximized outputs must be objectives.'
+
+    return np.column_stack([(-1 if o in maximize else 1)*np.asarray(results[o], dtype=float).ravel()
+                            for o in objectives])
+
+
+def nondominated(F):
+    """
+    Points of the first non-dominated front: those not dominated by
+    any other point. Identical points do not dominate each other.
+
+    :param F: Objectives to minimize, one row per point.
+
+    :type F:  np.ndarray
+
+    :rtype: np.ndarray of bool
+    """
+    F      = np.atleast_2d(np.asarray(F, dtype=float))
+    finite = np.all(np.isfinite(F), axis=1)
+    mask   = np.zeros(len(F), dtype=bool)
+    if not np.any(finite):
+        return mask
+
+    # Distinct points, sorted lexicographically
+    U, inverse = np.unique(F[finite], axis=0, return_inverse=True)
+
+    m = U.shape[1]
+    if m == 1:
+        first = U[:, 0] == U[0, 0]
+    elif m == 2:
+        first = sweep2(U)
+    elif m == 3:
+        first = sweep3(U)
+    else:
+        first = ~dominated(U)
+
+    mask[finite] = first[inverse.ravel()]
+    return mask
+
+
+def sweep2(U):
+    """
+    First front of distinct points sorted lexicographically, with two
+    objectives: points whose second objective is lower than that of
+    all the points before them.
+    """
+    before = np.concatenate([[np.inf], np.minimum.accumulate(U[:-1, 1])])
+    return U[:, 1] < before
+
+
+def sweep3(U):
+    """
+    First front of distinct points sorted lexicographically, with three
+    objectives: points no point before them improves on in both their
+    second and third objectives. The points are swept in order, keeping
+    the lowest third objective of the points before them up to each
+    value of the second objective in a Fenwick tree over the ranks of the
+    second objectives, so that each point is checked and inserted in
+    O(log n) time.
+    """
+    n     = len(U)
+    rank  = (np.unique(U[:, 1], return_inverse=True)[1].ravel() + 1).tolist()
+    tree  = [np.inf]*(n + 1)
+    first = np.zeros(n, dtype=bool)
+    for i, (k, z) in enumerate(zip(rank, U[:, 2].tolist())):
+        # Lowest third objective of the points before with lower or equal second objective
+        j, low = k, np.inf
+        while j:
+            low = min(low, tree[j])
+            j  &= j - 1
+        if low <= z:
+            continue
+        first[i] = True
+        # Points dominated by others need not be inserted, as the others dominate all they do
+        while k <= n:
+            tree[k] = min(tree[k], z)
+            k += k & -k
+    return first
+
+
+def dominated(U, memory=2**24):
+    """
+    Points dominated by any other point, by vectorized pairwise
+    comparisons in blocks of rows.
+
+    :param U:      Distinct objectives to minimize, one row per point.
+    :param memory: Maximum number of pairwise comparisons per block.
+
+    :type U:       np.ndarray
+    :type memory:  int
+
+    :rtype: np.ndarray of bool
+    """
+    n, m   = U.shape
+    block  = max(1, memory//(n*m))
+    result = np.empty(n, dtype=bool)
+    for start in range(0, n, block):
+        B = U[start:start + block, None, :]
+        result[start:start + block] = np.any(np.all(U <= B, axis=2) & np.any(U < B, axis=2), axis=1)
+    return result
+
+
+def ranks(F):
+    """
+    Non-dominated sorting: index of the front of each point, the
+    first front being 0. Each front is found among the points not
+    in the previous ones. Points with non-finite objectives are
+    given rank -1.
+
+    :param F: Objectives to minimize, one row per point.
+
+    :type F:  np.ndarray
+
+    :rtype: np.ndarray of int
+    """
+    F         = np.atleast_2d(np.asarray(F, dtype=float))
+    rank      = np.full(len(F), -1)
+    remaining = np.flatnonzero(np.all(np.isfinite(F), axis=1))
+
+    r = 0
+    while len(remaining):
+        first = nondominated(F[remaining])
+        rank[remaining[first]] = r
+        remaining = remaining[~first]
+        r += 1
+    return rank
+
+
+def crowding(F):
+    """
+    Crowding distance of each point of a front: the sum over the
+    objectives of the distance between its two neighbours along the
+    objective, relative to the range of the objective. Points at
+    the ends of the front along any objective are given an infinite
+    distance.
+
+    :param F: Objectives of the points of a front, one row per point.
+
+    :type F:  np.ndarray
+
+    :rtype: np.ndarray
+    """
+    F = np.atleast_2d(np.asarray(F, dtype=float))
+    n = len(F)
+    if n < 3:
+        return np.full(n, np.inf)
+
+    order = np.argsort(F, axis=0, kind='stable')
+    S     = np.take_along_axis(F, order, axis=0)
+    span  = S[-1] - S[0]
+    span[span == 0] = 1
+
+    d = np.zeros(n)
+    np.add.at(d, order[1:-1], (S[2:] - S[:-2])/span)
+    d[order[0]]  = np.inf
+    d[order[-1]] = np.inf
+    return d
+
+
+def hypervolume(F, reference):
+    """
+    Hypervolume dominated by a set of points and bounded by a reference
+    point: the measure of the region of objective space dominated by
+    the points and dominating the reference point. Points not strictly
+    dominating the reference point do not contribute.
+
+    Computed exactly: in O(n log n) time for two objectives, and by
+    slicing along the last objective for more, which grows quickly
+    with the number of objectives.
+
+    :param F:         Objectives to minimize, one row per point.
+    :param reference: Reference point, in the same form as the rows
+                      of F (maximized objectives negated).
+
+    :type F:          np.ndarray
+    :type reference:  np.ndarray
+
+    :rtype: float
+    """
+    F = np.atleast_2d(np.asarray(F, dtype=float))
+    r = np.asarray(reference, dtype=float)
+    F = F[np.all(np.isfinite(F), axis=1) & np.all(F < r, axis=1)]
+    if not len(F):
+        return 0.
+    return volume(F[nondominated(F)], r)
+
+
+def volume(P, r):
+    """
+    Hypervolume of non-dominated points P, all dominating r.
+    """
+    m = P.shape[1]
+    if m == 1:
+        return float(r[0] - P[:, 0].min())
+    if m == 2:
+        # Along the front, the first objective increases and the second decreases
+        P = P[np.argsort(P[:, 0])]
+        x = np.append(P[1:, 0], r[0])
+        return float(np.sum((x - P[:, 0])*(r[1] - P[:, 1])))
+
+    P = P[np.argsort(P[:, -1])]
+    z = np.append(P[1:, -1], r[-1])
+    total = 0.
+    for k in range(len(P)):
+        if z[k] > P[k, -1]:
+            S = P[:k+1, :-1]
+            total += volume(S[nondominated(S)], r[:-1])*(z[k] - P[k, -1])
+    return total
+
+
+def front(results, objectives, maximize=None):
+    """
+    Points of the first non-dominated front of columnar results,
+    ordered by their first objective, with their crowding distances
+    in a 'crowding' column.
+
+    :param results:    Columnar results.
+    :param objectives: Names of the objective columns.
+    :param maximize:   Names of the objectives to maximize.
+
+    :type results:     dict of np.ndarray
+    :type objectives:  list of str
+    :type maximize:    list of str
+
+    :return: Columnar results of the front. Columns with a value per
+             point are subset, and other values are kept as they are.
+
+    :rtype: dict
+    """
+    F     = matrix(results, objectives, maximize)
+    n     = len(F)
+    index = np.flatnonzero(nondominated(F))
+    index = index[np.argsort(F[index, 0], kind='stable')]
+
+    p = {k: np.asarray(v)[index] if np.ndim(v) > 0 and np.shape(v)[0] == n else v for k, v in results.items()}
+    p['crowding'] = crowding(F[index])
+    return p
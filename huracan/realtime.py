@@ -0,0 +1,288 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan real-time simulation
+----------------------------
+
+Fixed-latency stepping of transient engine models, for hardware
+in the loop benches and other real-time uses.
+
+Matching an engine at each instant takes several engine runs, and
+so its latency is neither small nor bounded. Instead, the transient
+simulation (see huracan.transient) is compiled into a plan: the
+rates of change of its states and its outputs, tabulated over a grid
+of values of its states and inputs. Real-time steps then only
+interpolate the plan, multilinearly, into buffers allocated when
+the stepper is created, and integrate the states in place.
+
+    p = plan(sim, {'spool.N': np.linspace(0.7, 1.1, 41),
+                   'cc.t01':  np.linspace(1000, 1500, 26)})
+    p.save('turbojet.plan.npz')
+
+    rt = realtime(plan.load('turbojet.plan.npz'), dt=1e-3)
+    while bench:
+        rt.step([t01])
+        rt.x, rt.y
+
+    rt.latency()
+
+States and inputs outside of the plan are held at its edges.
+"""
+
+import time
+import bisect
+import numpy as np
+
+from huracan.offdesign import continuation_order
+
+
+class plan:
+    """
+    Compiled transient simulation
+    -----------------------------
+    """
+    def __init__(self, sim, grid, t=0, tol=1e-8):
+        """
+        :param sim:  Transient simulation.
+        :param grid: Values of each state of the simulation and of each
+                     input to tabulate the simulation over. Inputs not in
+                     the grid take their values at time t.
+        :param t:    Time at which inputs not in the grid are evaluated.
+        :param tol:  Tolerance of the algebraic solution at each point.
+
+        :type sim:   huracan.transient.transient
+        :type grid:  dict of np.ndarray
+        :type t:     float
+        :type tol:   float
+        """
+        assert all(s in grid for s in sim.states), \
+            f'Real-time plan: the grid must contain all states of the simulation: {sim.states}.'
+
+        self.states  = list(sim.states)
+        self.inputs  = [k for k in grid.keys() if k not in self.states]
+        self.outputs = list(sim.outputs)
+        self.axes    = [np.asarray(grid[k], dtype=float) for k in self.states + self.inputs]
+
+        for k, a in zip(self.states + self.inputs, self.axes):
+            assert a.ndim == 1 and len(a) > 1 and np.all(np.diff(a) > 0), \
+                f'Real-time plan: the grid of {k} must be strictly increasing and have at least two values.'
+
+        ns     = len(self.states)
+        shape  = tuple(len(a) for a in self.axes)
+        points = np.stack(np.meshgrid(*self.axes, indexing='ij'), axis=-1).reshape(-1, len(shape))
+        table  = np.full((len(points), ns + len(self.outputs)), np.nan)
+
+        # Neighbouring points are solved in succession, each starting
+        # from the algebraic solution of the previous one
+        self.converged = np.zeros(len(points), dtype=bool)
+        z = None
+        for k in continuation_order(points):
+            values = dict(zip(self.inputs, points[k, ns:]))
+            dx, s  = sim.derivatives(t, points[k, :ns], z, tol=tol, inputs=values)
+            if s.converged:
+                table[k, :ns] = dx
+                table[k, ns:] = [np.squeeze(v) for v in s.model.results(self.outputs).values()]
+                self.converged[k] = True
+                z = s.x
+
+        self.table = table
+        self.shape = shape
+
+    @classmethod
+    def from_tables(cls, states, inputs, outputs, axes, table):
+        """
+        Plan from its tables, as saved by plan.save.
+        """
+        p = cls.__new__(cls)
+        p.states    = list(states)
+        p.inputs    = list(inputs)
+        p.outputs   = list(outputs)
+        p.axes      = [np.asarray(a, dtype=float) for a in axes]
+        p.shape     = tuple(len(a) for a in p.axes)
+        p.table     = np.ascontiguousarray(table, dtype=float)
+        p.converged = np.all(np.isfinite(p.table), axis=1)
+        return p
+
+    def save(self, path):
+        """
+        Save the plan to a NumPy .npz file.
+
+        :type path: str
+        """
+        np.savez(path,
+                 states=np.array(self.states), inputs=np.array(self.inputs), outputs=np.array(self.outputs),
+                 table=self.table, **{f'axis_{i}': a for i, a in enumerate(self.axes)})
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a plan saved by plan.save.
+
+        :type path: str
+
+        :rtype: plan
+        """
+        with np.load(path) as f:
+            n = len([k for k in f.files if k.startswith('axis_')])
+            return cls.from_tables([str(s) for s in f['states']], [str(s) for s in f['inputs']],
+                                   [str(s) for s in f['outputs']], [f[f'axis_{i}'] for i in range(n)], f['table'])
+
+
+class realtime:
+    """
+    Real-time stepper
+    -----------------
+    """
+    def __init__(self, plan, dt, x0=None, u0=None, method='heun'):
+        """
+        :param plan:   Compiled transient simulation.
+        :param dt:     Time step.
+        :param x0:     Initial states. By default, the midpoint of the grid.
+        :param u0:     Initial inputs. By default, the midpoint of the grid.
+        :param method: Integration method: 'euler' or 'heun'.
+
+        :type plan:    plan
+        :type dt:      float
+        :type x0:      np.ndarray
+        :type u0:      np.ndarray
+        :type method:  str
+        """
+        assert method in ['euler', 'heun'], f'Real-time stepper: unknown method {method}.'
+        assert np.all(plan.converged), \
+            'Real-time stepper: the plan has points whose algebraic solution did not converge.'
+
+        self.plan   = plan
+        self.dt     = float(dt)
+        self.method = method
+
+        ns = len(plan.states)
+        d  = len(plan.axes)
+
+        self.ns    = ns
+        self.axes  = [a.tolist() for a in plan.axes]
+        self.table = plan.table.reshape(-1, plan.table.shape[-1])
+
+        # Row offset of each corner of a grid cell
+        strides      = np.cumprod((plan.shape[1:] + (1,))[::-1])[::-1]
+        self.strides = strides.tolist()
+        bits         = [[(c >> j) & 1 for j in range(d)] for c in range(2**d)]
+        self.corners = [(b, sum(s*bj for s, bj in zip(self.strides, b))) for b in bits]
+
+        # Buffers
+        self.x = np.empty(ns)
+        self.u = np.empty(d - ns)
+        self.y = np.empty(len(plan.outputs))
+
+        self.point  = [0.0]*d
+        self.cell   = [0]*d
+        self.frac   = [0.0]*d
+        self.rows   = np.empty(2**d, dtype=np.intp)
+        self.w      = np.empty(2**d)
+        self.values = np.empty((2**d, self.table.shape[1]))
+        self.f      = np.empty(self.table.shape[1])
+        self.k1     = np.empty(ns)
+        self.xp     = np.empty(ns)
+
+        self.reset(x0, u0)
+
+    def reset(self, x0=None, u0=None, t0=0):
+        """
+        Reset the stepper to given states, inputs and time, and
+        its latency statistics.
+        """
+        mid    = [0.5*(a[0] + a[-1]) for a in self.plan.axes]
+        self.x[:] = mid[:self.ns] if x0 is None else x0
+        self.u[:] = mid[self.ns:] if u0 is None else u0
+        self.t    = t0
+        self.steps  = 0
+        self.worst  = 0
+        self.total  = 0
+        self.evaluate(self.x)
+        self.y[:] = self.f[self.ns:]
+
+    def evaluate(self, x):
+        """
+        Interpolate the plan at states x and the current inputs
+        into the buffer f: rates of change of the states followed
+        by the outputs.
+        """
+        point = self.point
+        for j in range(self.ns):
+            point[j] = x[j]
+        for j in range(len(self.u)):
+            point[self.ns + j] = self.u[j]
+
+        base = 0
+        for j, a in enumerate(self.axes):
+            i = min(max(bisect.bisect_right(a, point[j]) - 1, 0), len(a) - 2)
+            f = (point[j] - a[i])/(a[i+1] - a[i])
+            self.frac[j] = 0.0 if f < 0 else 1.0 if f > 1 else f
+            base += i*self.strides[j]
+
+        for c, (bits, offset) in enumerate(self.corners):
+            w = 1.0
+            for j, b in enumerate(bits):
+                w *= self.frac[j] if b else 1 - self.frac[j]
+            self.rows[c] = base + offset
+            self.w[c]    = w
+
+        np.take(self.table, self.rows, axis=0, out=self.values)
+        np.dot(self.w, self.values, out=self.f)
+
+    def step(self, u=None):
+        """
+        Advance the states by one time step.
+
+        :param u: Inputs during the step, in the order of the
+                  inputs of the plan. By default, the previous ones.
+
+        :type u:  sequence of float
+
+        :return: States at the end of the step. The outputs at the
+                 start of the step are left in y.
+
+        :rtype: np.ndarray
+        """
+        start = time.perf_counter_ns()
+
+        if u is not None:
+            self.u[:] = u
+
+        ns = self.ns
+        self.evaluate(self.x)
+        self.y[:]  = self.f[ns:]
+        self.k1[:] = self.f[:ns]
+
+        if self.method == 'euler':
+            self.x += self.dt*self.k1
+        else:
+            np.multiply(self.k1, self.dt, out=self.xp)
+            self.xp += self.x
+            self.evaluate(self.xp)
+            self.k1 += self.f[:ns]
+            self.k1 *= self.dt/2
+            self.x  += self.k1
+
+        self.t += self.dt
+
+        elapsed     = time.perf_counter_ns() - start
+        self.steps += 1
+        self.total += elapsed
+        if elapsed > self.worst:
+            self.worst = elapsed
+
+        return self.x
+
+    def latency(self):
+        """
+        Step latency statistics since the last reset.
+
+        :return: Worst-case and mean step latency in seconds, and
+                 number of steps.
+
+        :rtype: dict
+        """
+        return {'worst': self.worst*1e-9,
+                'mean':  self.total*1e-9/max(self.steps, 1),
+                'steps': self.steps}
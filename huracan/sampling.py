@@ -0,0 +1,251 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan adaptive sampling
+-------------------------
+
+Sampling of engine outputs over a design or operating space,
+refined where the outputs change fastest. Uniform grids spend
+most of their evaluations where the outputs are nearly linear,
+such as far from nozzle choking; instead, the space is divided
+into cells, starting from a coarse grid, and only the cells over
+which the outputs are not well approximated are subdivided.
+
+    s = sampler(definition, {'c.PI': (2, 40), 'gas.m': (0, 0.9)},
+                outputs=['sfc', 'thrust_total', 'choked'], tol=1e-3)
+    r = s.run()
+
+    r['c.PI'], r['gas.m'], r['sfc'], s.error, s.converged
+
+The error of a cell is estimated at its center, as the difference
+between the outputs there and their multilinear interpolation from
+the corners of the cell, relative to the range of each output over
+all samples. Cells whose error exceeds the tolerance are bisected
+along every variable. Discrete outputs, such as the choked state of
+a nozzle, are refined instead wherever they change within a cell,
+down to the smallest cell size, as are cells containing points
+where the engine cannot be run.
+
+Each refinement evaluates all its new points in a single batched
+engine run (see huracan.optimize.evaluator), and stops once the
+estimated error of all cells is within the tolerance.
+"""
+
+import numpy as np
+from itertools import product
+
+from huracan.optimize import evaluator
+
+
+default_outputs = ['sfc', 'thrust_total', 'choked']
+
+
+class sampler:
+    """
+    Adaptive sampler
+    ----------------
+    """
+    def __init__(self, definition, variables, outputs=None, tol=1e-2, discrete=None, values=None, cache=None,
+                 initial=3, min_size=1/64, max_points=2000):
+        """
+        :param definition: Engine definition.
+        :param variables:  Definition values (see huracan.definition.override)
+                           spanning the sampled space, and their bounds.
+        :param outputs:    Outputs to sample (see huracan.definition.model.results).
+        :param tol:        Tolerance on the interpolation error of each output,
+                           relative to its range: a number, or a number per output.
+        :param discrete:   Discrete outputs. By default, choked states: the outputs
+                           named 'choked' or ending in '.choked'.
+        :param values:     Fixed definition values.
+        :param cache:      Evaluation cache (see huracan.cache.cache).
+        :param initial:    Number of points of the initial grid along each variable.
+        :param min_size:   Smallest cell size, relative to the bounds of each variable.
+        :param max_points: Maximum number of samples.
+
+        :type definition:  dict
+        :type variables:   dict of tuple
+        :type outputs:     list of str
+        :type tol:         float or dict
+        :type discrete:    list of str
+        :type values:      dict
+        :type cache:       huracan.cache.cache
+        :type initial:     int
+        :type min_size:    float
+        :type max_points:  int
+        """
+        assert initial >= 2, 'Adaptive sampling: the initial grid must have at least two points along each variable.'
+
+        self.names   = list(variables.keys())
+        self.outputs = list(outputs) if outputs else default_outputs
+        discrete     = discrete if discrete is not None else \
+                       [o for o in self.outputs if o == 'choked' or o.endswith('.choked')]
+
+        self.discrete = np.array([o in discrete for o in self.outputs])
+        self.tol      = np.array([tol.get(o, np.inf) if isinstance(tol, dict) else tol for o in self.outputs])
+
+        bounds    = np.array([variables[n] for n in self.names], dtype=float)
+        self.lo   = bounds[:, 0]
+        self.span = bounds[:, 1] - bounds[:, 0]
+
+        self.f          = evaluator(definition, self.names, self.outputs, values, cache)
+        self.max_points = max_points
+
+        # Cells are hypercubes of an integer lattice, whose smallest
+        # cells are 1 wide: initial cells are 2**levels wide
+        levels     = max(0, int(np.ceil(np.log2(1/((initial - 1)*min_size)))))
+        self.scale = (initial - 1)*2**levels
+        self.bits  = np.array(list(product([0, 1], repeat=len(self.names))))
+
+        self.index = {}
+        self.X     = []
+        self.Y     = []
+
+        d           = len(self.names)
+        lower       = np.array(list(product(range(initial - 1), repeat=d)))*2**levels
+        self.lower  = lower.reshape(-1, d)
+        self.size   = np.full(len(self.lower), 2**levels)
+        self.errors = np.full(len(self.lower), np.inf)
+
+        self.iterations = 0
+        self.converged  = False
+
+        self.evaluate(self.points(self.lower, self.size))
+
+    def points(self, lower, size):
+        """
+        Corners of cells and, for cells which can be bisected, their centers.
+        """
+        corners = (lower[:, None, :] + size[:, None, None]*self.bits[None]).reshape(-1, lower.shape[1])
+        split   = size >= 2
+        centers = lower[split] + size[split, None]//2
+        return np.vstack([corners, centers])
+
+    def evaluate(self, P):
+        """
+        Evaluate the lattice points not yet sampled in a single batched run.
+        """
+        new = list(dict.fromkeys(p for p in map(tuple, P.tolist()) if p not in self.index))
+        if not new:
+            return
+        X = self.lo + np.array(new, dtype=float)/self.scale*self.span
+        Y = self.f(X)
+        for p, x, y in zip(new, X, Y):
+            self.index[p] = len(self.X)
+            self.X.append(x)
+            self.Y.append(y)
+
+    def rows(self, P):
+        return np.array([self.index[p] for p in map(tuple, P.tolist())])
+
+    def estimate(self):
+        """
+        Estimated interpolation error of each cell: largest over the
+        outputs of the error relative to the tolerance, so that cells
+        are within tolerance where the error is at most 1. Cells where
+        a discrete output changes or the engine cannot be run everywhere
+        are given an infinite error, and cells which cannot be bisected
+        zero error.
+
+        :rtype: np.ndarray
+        """
+        Y      = np.array(self.Y)
+        finite = np.isfinite(Y)
+        range_ = np.array([np.ptp(Y[finite[:, j], j]) if np.any(finite[:, j]) else 0 for j in range(Y.shape[1])])
+        range_ = np.where(range_ > 0, range_, 1)
+
+        errors = np.zeros(len(self.lower))
+        split  = self.size >= 2
+        if not np.any(split):
+            return errors
+
+        lower, size = self.lower[split], self.size[split]
+        corners = Y[self.rows((lower[:, None, :] + size[:, None, None]*self.bits[None]).reshape(-1, lower.shape[1]))]
+        corners = corners.reshape(len(lower), len(self.bits), -1)
+        centers = Y[self.rows(lower + size[:, None]//2)]
+
+        samples  = np.concatenate([corners, centers[:, None]], axis=1)
+        invalid  = np.any(~np.isfinite(samples), axis=(1, 2)) & np.any(np.isfinite(samples), axis=(1, 2))
+        changed  = np.any(np.any(samples != samples[:, :1], axis=1) & self.discrete, axis=1)
+        relative = np.abs(centers - corners.mean(axis=1))/range_/self.tol
+        error    = np.max(np.where(self.discrete, 0, np.nan_to_num(relative, nan=0)), axis=1)
+
+        errors[split] = np.where(invalid | changed, np.inf, error)
+        return errors
+
+    def refine(self):
+        """
+        Bisect the cells whose estimated error exceeds the tolerance,
+        worst first and within the maximum number of samples, and
+        evaluate the new points in a single batched run.
+
+        :return: Whether any cell was refined.
+
+        :rtype: bool
+        """
+        self.errors = self.estimate()
+        worst       = np.argsort(-self.errors, kind='stable')
+        worst       = worst[self.errors[worst] > 1]
+        if not len(worst):
+            self.converged = True
+            return False
+
+        # New points of each bisected cell: the corners and centers of its children
+        budget, chosen, pending = self.max_points - len(self.X), [], set()
+        for c in worst:
+            half     = self.size[c]//2
+            children = self.lower[c] + half*self.bits
+            new      = {p for p in map(tuple, self.points(children, np.full(len(children), half)).tolist())
+                        if p not in self.index} - pending
+            if len(new) > budget:
+                break
+            budget -= len(new)
+            pending |= new
+            chosen.append(c)
+
+        if not chosen:
+            return False
+
+        keep       = np.setdiff1d(np.arange(len(self.lower)), chosen)
+        half       = self.size[chosen]//2
+        children   = (self.lower[chosen][:, None, :] + half[:, None, None]*self.bits[None]).reshape(-1, self.lower.shape[1])
+        self.lower = np.vstack([self.lower[keep], children])
+        self.size  = np.concatenate([self.size[keep], np.repeat(half, len(self.bits))])
+
+        self.evaluate(np.array(sorted(pending)).reshape(-1, self.lower.shape[1]))
+        self.iterations += 1
+        return True
+
+    def run(self):
+        """
+        Refine until the estimated error of all cells is within the
+        tolerance, or the maximum number of samples is reached.
+
+        :return: Columnar results: the variables and outputs at each sample.
+
+        :rtype: dict
+        """
+        while self.refine():
+            pass
+        self.errors = self.estimate()
+        return self.results()
+
+    @property
+    def error(self):
+        """
+        Largest estimated error of the cells relative to the tolerance,
+        excluding those where a discrete output changes or the engine
+        cannot be run everywhere.
+        """
+        finite = self.errors[np.isfinite(self.errors)]
+        return float(finite.max()) if len(finite) else 0.
+
+    def results(self):
+        """
+        Columnar results: the variables and outputs at each sample.
+
+        :rtype: dict
+        """
+        X, Y = np.array(self.X), np.array(self.Y)
+        return {**{n: X[:, j] for j, n in enumerate(self.names)},
+                **{o: Y[:, j] == 1 if self.discrete[j] else Y[:, j] for j, o in enumerate(self.outputs)}}
@@ -7,9 +7,11 @@ Huracan fluid models
 """
 
 from copy import deepcopy
+from collections import namedtuple
 
 from huracan.constants import R
 from huracan.engine import stream, component
+from huracan.thermo.properties import constant, mixed
 from huracan.thermo.processes import absolute, diffusion, compression, heat_exchange, expansion
 
 
@@ -36,8 +38,8 @@ class fluid:
         """
         mf, df = deepcopy(f), deepcopy(f)
 
-        mf.mf *= 1 - fr
-        df.mf *= fr
+        mf.mf = mf.mf*(1 - fr)
+        df.mf = df.mf*fr
 
         return mf, df
 
@@ -54,6 +56,60 @@ class fluid:
         return self._diversion(self, other)
 
 
+class snapshot(namedtuple('snapshot', ['mf', 'cp', 'k', 'm', 'v_0', 't_0', 'p_0', 't0', 'p0', 'S'])):
+    """
+    Gas state snapshot
+    ------------------
+
+    Immutable record of the state of a gas instance at a given
+    stage boundary. Only the state scalars and references to
+    the gas' property functions are stored, so that keeping one
+    snapshot per stage is cheap.
+    """
+    __slots__ = ()
+
+    @property
+    def V(self):
+        """
+        Specific volume.
+        """
+        return self.t0*R/self.p0
+
+    @property
+    def E(self):
+        """
+        Specific internal energy.
+        """
+        return self.cp(self.t0)/self.k(self.t0)*self.t0
+
+    @property
+    def H(self):
+        """
+        Specific enthalpy.
+        """
+        return self.E + self.p0*self.V
+
+
+def state_variable(f):
+    """
+    Gas state variable decorator.
+
+    The decorated method is turned into a property which is
+    computed the first time it is accessed after a change of
+    state of the gas, and cached until the next one.
+    """
+    name = f.__name__
+
+    def get(self):
+        try:
+            return self.state_cache[name]
+        except KeyError:
+            v = self.state_cache[name] = f(self)
+            return v
+
+    return property(get, doc=f.__doc__)
+
+
 class gas(fluid):
     """
     Ideal gas model
@@ -63,6 +119,15 @@ class gas(fluid):
     - Mass flow
     - Constant pressure specific heat capacity
     - Ratio of specific heat capacities
+
+    If the specific heat capacity and ratio of specific
+    heats are given as numbers, the gas is calorically
+    perfect, and its properties are never evaluated as
+    functions of temperature.
+
+    Gases whose properties are given as property models
+    (see huracan.thermo.properties) rather than lambda
+    functions can be pickled.
     """
     def __init__(self, mf, cp, k,
                  m, t_0, p_0):
@@ -75,12 +140,15 @@ class gas(fluid):
         :param p_0: [Pa] Initial pressure      |
 
         :type mf:   float
-        :type cp:   (T: float) -> float
-        :type k:    (T: float) -> float
+        :type cp:   float, property model or (T: float) -> float
+        :type k:    float, property model or (T: float) -> float
         :type m:    float
         :type t_0:  float
         :type p_0:  float
         """
+        cp = cp if callable(cp) else constant(cp)
+        k  = k  if callable(k)  else constant(k)
+
         self.mf  = mf
         self.cp  = cp
         self.k   = k
@@ -99,13 +167,105 @@ class gas(fluid):
     def state(self):
         """
         Update gas state variables.
-        - V - Specific volume
-        - S - Specific entropy
-        - H - Specific enthalpy
+
+        The state variables are computed lazily: this method
+        only discards the values cached for the previous state
+        of the gas, and must be called after every change of
+        state.
+        """
+        self.state_cache = {}
+
+        # Calorically perfect gases: no property evaluation
+        if isinstance(self.cp, constant):
+            self.state_cache['cp0'] = self.cp.value
+        if isinstance(self.k, constant):
+            self.state_cache['k0'] = self.k.value
+
+    @state_variable
+    def cp0(self):
+        """
+        Constant pressure specific heat at the total temperature of the gas.
+        """
+        return self.cp(self.t0)
+
+    @state_variable
+    def k0(self):
+        """
+        Specific heat ratio at the total temperature of the gas.
+        """
+        return self.k(self.t0)
+
+    @state_variable
+    def V(self):
+        """
+        Specific volume.
+        """
+        return self.t0*R/self.p0
+
+    @state_variable
+    def E(self):
+        """
+        Specific internal energy.
+        """
+        return self.cp0/self.k0*self.t0
+
+    @state_variable
+    def H(self):
+        """
+        Specific enthalpy.
+        """
+        return self.E + self.p0*self.V
+
+    @property
+    def calorically_perfect(self):
+        """
+        Whether the specific heat capacity and ratio of specific
+        heats of the gas are independent of temperature.
+        """
+        return isinstance(self.cp, constant) and isinstance(self.k, constant)
+
+    def snapshot(self):
+        """
+        Return an immutable snapshot of the current gas state.
+
+        :return: snapshot instance
+        """
+        return snapshot(mf  = self.mf,
+                        cp  = self.cp,
+                        k   = self.k,
+                        m   = self.m,
+                        v_0 = self.v_0,
+                        t_0 = self.t_0,
+                        p_0 = self.p_0,
+                        t0  = self.t0,
+                        p0  = self.p0,
+                        S   = self.S)
+
+    def restore(self, s):
+        """
+        Set the state of the gas to that recorded in a snapshot.
+
+        :type s: snapshot
+
+        :return: gas instance
+        """
+        for k, v in s._asdict().items():
+            setattr(self, k, v)
+
+        self.state()
+
+        return self
+
+    @classmethod
+    def from_snapshot(cls, s):
+        """
+        Create a new gas instance from a snapshot.
+
+        :type s: snapshot
+
+        :return: gas instance
         """
-        self.V  =  self.t0*R/self.p0
-        self.E  =  self.cp(self.t0)/self.k(self.t0)*self.t0
-        self.H  =  self.E + self.p0*self.V
+        return cls.__new__(cls).restore(s)
 
     def __add__(self, other):
         """
@@ -124,7 +284,7 @@ class gas(fluid):
         if isinstance(other, gas):
             return mixture(self, other)
         if isinstance(other, fuel):
-            self.mf += other.mf
+            self.mf = self.mf + other.mf     # Not in place: snapshots may hold the mass flow array
             return self
 
     def __sub__(self, other):
@@ -189,8 +349,8 @@ class gas(fluid):
         :return:    process instance
         """
 
-        k   = self.k(self.t0)
-        cp  = self.cp(self.t0)
+        k   = self.k0
+        cp  = self.cp0
 
         p = diffusion(mf  = self.mf,
                       cp  = cp,
@@ -241,8 +401,8 @@ class gas(fluid):
         :return:    process instance
         """
 
-        k   = self.k(self.t0)
-        cp  = self.cp(self.t0)
+        k   = self.k0
+        cp  = self.cp0
 
         p   = compression(mf  = self.mf,
                           cp  = cp,
@@ -290,8 +450,8 @@ class gas(fluid):
         :return:    process instance
         """
 
-        k   = self.k(self.t0)
-        cp  = self.cp(self.t0)
+        k   = self.k0
+        cp  = self.cp0
 
         p   = expansion(mf  = self.mf,
                         cp  = cp,
@@ -348,7 +508,7 @@ class gas(fluid):
         self.t0 = p.t01
         self.p0 = p.p01
 
-        self.S  += Q_ex/self.t0
+        self.S  = self.S + Q_ex/self.t0
 
         self.state()
 
@@ -381,8 +541,8 @@ class mixture(gas):
         """
         Total temperature of fluid mixture.
         """
-        n = gas1.mf*gas1.cp(gas1.t0)*gas1.t0 + gas2.mf*gas2.cp(gas2.t0)*gas2.t0
-        d = gas1.mf*gas1.cp(gas1.t0) + gas2.mf*gas2.cp(gas2.t0)
+        n = gas1.mf*gas1.cp0*gas1.t0 + gas2.mf*gas2.cp0*gas2.t0
+        d = gas1.mf*gas1.cp0 + gas2.mf*gas2.cp0
         t0_f = n / d
         return t0_f
 
@@ -401,16 +561,18 @@ class mixture(gas):
         """
         Constant pressure specific heat at of fluid mixture.
         """
-        cp_f = lambda t: (gas1.cp(t)*gas1.mf + gas2.cp(t)*gas2.mf) / (gas1.mf + gas2.mf)
-        return cp_f
+        if isinstance(gas1.cp, constant) and isinstance(gas2.cp, constant):
+            return constant((gas1.cp.value*gas1.mf + gas2.cp.value*gas2.mf) / (gas1.mf + gas2.mf))
+        return mixed([gas1.cp, gas2.cp], [gas1.mf, gas2.mf])
 
     @classmethod
     def _mix_k(cls, gas1, gas2):
         """
         Specific heat ratio of fluid mixture.
         """
-        cp_f = lambda t: (gas1.k(t)*gas1.mf + gas2.k(t)*gas2.mf) / (gas1.mf + gas2.mf)
-        return cp_f
+        if isinstance(gas1.k, constant) and isinstance(gas2.k, constant):
+            return constant((gas1.k.value*gas1.mf + gas2.k.value*gas2.mf) / (gas1.mf + gas2.mf))
+        return mixed([gas1.k, gas2.k], [gas1.mf, gas2.mf])
 
     def __init__(self, gas1, gas2):
         """
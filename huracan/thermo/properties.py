@@ -0,0 +1,211 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan gas property models
+---------------------------
+
+Gas properties as functions of temperature. Unlike lambda
+functions, property models can be pickled, so gases, streams
+and systems using them can be sent to other processes.
+
+All models accept both scalar temperatures and NumPy arrays
+of temperatures, as well as dual numbers (see huracan.autodiff),
+whose derivatives are propagated with those of the models.
+"""
+
+import numpy as np
+from numpy.polynomial import polynomial as P
+
+
+def is_dual(T):
+    """
+    Whether a value is a dual number (see huracan.autodiff), checked
+    by its interface so that the thermodynamic models do not depend
+    on automatic differentiation.
+    """
+    return hasattr(T, 'grad') and hasattr(T, 'chain')
+
+
+class model:
+    """
+    Property model
+    --------------
+    """
+    def __call__(self, T):
+        """
+        :type T: float or np.ndarray
+        """
+        if is_dual(T):
+            return T.chain(self(T.value), self.derivative(T.value))
+        v = self.evaluate(T)
+        return float(v) if np.ndim(v) == 0 else v
+
+    def derivative(self, T, h=1e-6):
+        """
+        Derivative of the property with respect to temperature. By
+        default, by central differences of relative step h.
+
+        :type T: float or np.ndarray
+        """
+        dT = h*np.maximum(np.abs(T), 1)
+        return (self.evaluate(T + dT) - self.evaluate(T - dT))/(2*dT)
+
+
+class constant(model):
+    """
+    Constant property
+    -----------------
+
+    Temperature independent gas property, as in
+    calorically perfect gases.
+    """
+    def __init__(self, value):
+        """
+        :param value: Value of the property.
+
+        :type value:  float
+        """
+        self.value = value
+
+    def __call__(self, T):
+        """
+        :type T: float or np.ndarray
+        """
+        return self.value
+
+    def __repr__(self):
+        return f'constant({self.value})'
+
+
+class piecewise_constant(model):
+    """
+    Piecewise constant property
+    ---------------------------
+
+    Property taking a constant value in each of a series of
+    temperature ranges. For example,
+
+        piecewise_constant(values=[1000, 1150], breakpoints=[600])
+
+    is equivalent to
+
+        lambda T: 1150 if T > 600 else 1000
+    """
+    def __init__(self, values, breakpoints):
+        """
+        :param values:      Value of the property in each temperature range.
+        :param breakpoints: Upper temperature limits of each range but the last.
+
+        :type values:       list of float
+        :type breakpoints:  list of float
+        """
+        assert len(values) == len(breakpoints) + 1, \
+            'Piecewise constant property: there must be a value for each range between breakpoints.'
+
+        self.values      = np.asarray(values, dtype=float)
+        self.breakpoints = np.asarray(breakpoints, dtype=float)
+
+    def evaluate(self, T):
+        return self.values[np.searchsorted(self.breakpoints, T, side='left')]
+
+    def derivative(self, T):
+        return np.zeros(np.shape(T))
+
+    def __repr__(self):
+        return f'piecewise_constant(values={self.values.tolist()}, breakpoints={self.breakpoints.tolist()})'
+
+
+class polynomial(model):
+    """
+    Polynomial property
+    -------------------
+
+        c[0] + c[1]*T + c[2]*T**2 + ...
+    """
+    def __init__(self, coefficients):
+        """
+        :param coefficients: Polynomial coefficients, in increasing order.
+
+        :type coefficients:  list of float
+        """
+        self.coefficients = np.asarray(coefficients, dtype=float)
+
+    def evaluate(self, T):
+        return P.polyval(T, self.coefficients)
+
+    def derivative(self, T):
+        return P.polyval(T, P.polyder(self.coefficients))
+
+    def __repr__(self):
+        return f'polynomial(coefficients={self.coefficients.tolist()})'
+
+
+class tabulated(model):
+    """
+    Tabulated property
+    ------------------
+
+    Property linearly interpolated in a table. Outside
+    the table the property takes the value of the
+    closest table entry.
+    """
+    def __init__(self, T, values):
+        """
+        :param T:      [K] Table temperatures, in increasing order.
+        :param values: Property values at the table temperatures.
+
+        :type T:       list of float
+        :type values:  list of float
+        """
+        assert len(T) == len(values), 'Tabulated property: T and values must have the same length.'
+
+        self.T      = np.asarray(T, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+
+    def evaluate(self, T):
+        return np.interp(T, self.T, self.values)
+
+    def derivative(self, T):
+        slope = np.diff(self.values)/np.diff(self.T)
+        i     = np.clip(np.searchsorted(self.T, T, side='right') - 1, 0, len(slope) - 1)
+        return np.where((T < self.T[0]) | (T > self.T[-1]), 0, slope[i])
+
+    def __repr__(self):
+        return f'tabulated(T={self.T.tolist()}, values={self.values.tolist()})'
+
+
+class mixed(model):
+    """
+    Mixed property
+    --------------
+
+    Weighted average of a number of property models, such
+    as the mass flow averaged property of a gas mixture.
+    """
+    def __init__(self, models, weights):
+        """
+        :param models:  Property models of the components of the mixture.
+        :param weights: Weight of each component, such as its mass flow.
+
+        :type models:   list of model
+        :type weights:  list of float
+        """
+        self.models  = list(models)
+        self.weights = list(weights)
+
+    def __call__(self, T):
+        """
+        Mixed properties are evaluated directly, as their weights
+        may carry derivatives themselves.
+
+        :type T: float or np.ndarray
+        """
+        v = self.evaluate(T)
+        return float(v) if np.ndim(v) == 0 and not is_dual(v) else v
+
+    def evaluate(self, T):
+        return sum([w*m(T) for m, w in zip(self.models, self.weights)])/sum(self.weights)
+
+    def __repr__(self):
+        return f'mixed(models={self.models}, weights={self.weights})'
@@ -0,0 +1,173 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan throttle matching
+-------------------------
+
+Inverse engine evaluations: the throttle setting (by default the
+combustion chamber exit temperature 'cc.t01', or any other engine
+definition value, such as the fuel mass flow 'cc.fuel.mf') giving
+a target engine output at each of a set of operating points.
+
+All points are solved together. Their throttle settings are first
+bracketed between the given bounds, and then refined with the
+Illinois variant of the regula falsi method, evaluating the current
+estimates of all unconverged points in a single batched engine run
+per iteration.
+
+    r = match(definition, 'thrust_total', np.array([40e3, 60e3, 80e3]),
+              inputs={'gas.m': np.array([0, 0.2, 0.4])},
+              limit=1600)
+
+    r['cc.t01'], r['cc.fuel.mf'], r['sfc']
+"""
+
+import numpy as np
+
+from huracan.definition import build
+
+
+default_outputs = ['thrust_total', 'sfc']
+
+
+def evaluate(definition, control, x, inputs, output):
+    """
+    Output of the engine at a set of operating points and
+    throttle settings, evaluated in a single batched run.
+
+    :type definition: dict
+    :type control:    str
+    :type x:          np.ndarray
+    :type inputs:     dict
+    :type output:     str
+
+    :return: [np.ndarray] Output at each point.
+             [model]      Engine model.
+    """
+    model = build(definition, {**inputs, control: x}).run()
+    return np.broadcast_to(model.results([output])[output], x.shape).astype(float), model
+
+
+def match(definition, output, target, inputs=None, control='cc.t01', bounds=(800, 2000), limit=None,
+          outputs=None, rtol=1e-9, maxiter=100):
+    """
+    Throttle settings giving a target output at each of a set of
+    operating points.
+
+    :param definition: Engine definition.
+    :param output:     Output to match (see huracan.definition.model.results),
+                       such as 'thrust_total' or 'sfc'.
+    :param target:     Target value of the output at each point.
+    :param inputs:     Definition values defining the operating points, such
+                       as the flight Mach number 'gas.m'. Each is either a
+                       single value or an array with one value per point.
+    :param control:    Throttle setting: definition value to solve for.
+    :param bounds:     Bounds of the throttle setting.
+    :param limit:      Maximum throttle setting, such as a turbine inlet
+                       temperature limit if the throttle setting is 'cc.t01'.
+                       Points whose target cannot be reached within the limit
+                       are evaluated at the limit.
+    :param outputs:    Outputs to return at the matched throttle settings.
+    :param rtol:       Relative tolerance on the output.
+    :param maxiter:    Maximum number of iterations.
+
+    :type definition:  dict
+    :type output:      str
+    :type target:      float or np.ndarray
+    :type inputs:      dict
+    :type control:     str
+    :type bounds:      tuple of float
+    :type limit:       float
+    :type outputs:     list of str
+    :type rtol:        float
+    :type maxiter:     int
+
+    :return: Columnar results: for each point, the throttle setting, the
+             requested outputs, both the fuel mass flow and the exit
+             temperature of the combustor if the throttle setting is
+             either of them, whether the target was met ('converged')
+             and whether the throttle setting was limited ('limited').
+
+    :rtype: dict of np.ndarray
+    """
+    inputs  = dict(inputs) if inputs else {}
+    outputs = list(dict.fromkeys([output] + (list(outputs) if outputs else default_outputs)))
+
+    n      = max([np.size(target)] + [np.size(v) for v in inputs.values()])
+    target = np.broadcast_to(np.asarray(target, dtype=float), (n,))
+    scale  = np.maximum(np.abs(target), 1e-12)
+
+    def subset(i):
+        return {k: np.broadcast_to(v, (n,))[i] if np.ndim(v) > 0 else v for k, v in inputs.items()}
+
+    def f(x, i):
+        return (evaluate(definition, control, x, subset(i), output)[0] - target[i])/scale[i]
+
+    lo, hi = bounds[0], bounds[1] if limit is None else min(bounds[1], limit)
+
+    # Bracketing: both bounds of all points in a single run
+    i     = np.arange(n)
+    F     = f(np.concatenate([np.full(n, lo), np.full(n, hi)]).astype(float), np.concatenate([i, i]))
+    a, fa = np.full(n, lo, dtype=float), F[:n]
+    b, fb = np.full(n, hi, dtype=float), F[n:]
+
+    bracketed = np.sign(fa) != np.sign(fb)
+    converged = (fa == 0) | (fb == 0)
+    limited   = np.zeros(n, dtype=bool)
+    if limit is not None:
+        # Targets beyond the output at the limit
+        limited = ~bracketed & ~converged & (np.abs(fb) < np.abs(fa))
+
+    x = np.where(np.abs(fa) <= np.abs(fb), a, b)
+
+    # Illinois iterations over the unconverged points
+    side    = np.zeros(n)
+    stopped = converged.copy()
+    for _ in range(maxiter):
+        active = np.where(bracketed & ~stopped)[0]
+        if active.size == 0:
+            break
+
+        xa, xb, fxa, fxb = a[active], b[active], fa[active], fb[active]
+        xi = (xa*fxb - xb*fxa)/(fxb - fxa)
+        fi = f(xi, active)
+
+        x[active] = xi
+
+        right = fi*fxb > 0
+        s     = side[active]
+
+        b[active]  = np.where(right, xi, xb)
+        fb[active] = np.where(right, fi, fxb)
+        a[active]  = np.where(right, xa, xi)
+        fa[active] = np.where(right, fxa, fi)
+
+        fa[active] = np.where(right & (s == 1), fa[active]/2, fa[active])
+        fb[active] = np.where(~right & (s == -1), fb[active]/2, fb[active])
+        side[active] = np.where(right, 1, -1)
+
+        # Brackets collapsing without meeting the target enclose a
+        # discontinuity of the output, such as the choking of a nozzle
+        converged[active] = np.abs(fi) < rtol
+        stopped[active]   = converged[active] | (np.abs(b[active] - a[active]) < 1e-12*np.abs(xi))
+
+    x = np.where(limited, hi, x)
+
+    _, model = evaluate(definition, control, x, subset(i), output)
+    results  = {control: x}
+    for k, v in model.results(outputs).items():
+        results[k] = np.broadcast_to(v, (n,)).astype(float)
+
+    # Both throttle quantities of a combustor throttle: its fuel mass
+    # flow and its exit (turbine inlet) temperature
+    name, attr = control.split('.', 1)
+    if attr in ['t01', 'fuel.mf'] and hasattr(model[name], 'fuel'):
+        for k, v in {f'{name}.fuel.mf': model[name].fuel.mf, f'{name}.t01': model[name].t0}.items():
+            if k not in results:
+                results[k] = np.broadcast_to(v, (n,)).astype(float)
+
+    results['converged'] = converged
+    results['limited']   = limited
+
+    return results
@@ -0,0 +1,705 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan transient simulation
+----------------------------
+
+Time-marching simulation of engines with spool dynamics. The
+speeds of the shafts given a polar moment of inertia I and a
+design rotational speed omega are states of the engine, driven
+by the power imbalance of each shaft:
+
+    I*omega**2*N*dN/dt = w_t - w_r
+
+where N is the speed of the shaft relative to its design speed,
+w_t the power extracted from the flow by the turbines of the shaft
+and w_r the power required by the shaft. Optionally, volumes at
+the inlet of components store mass (intercomponent volumes), the
+mass m stored in each being a state of the engine as well:
+
+    dm/dt = mf - capacity*p0/t0**0.5,   p0 = m*R*t0/V
+
+At each instant, the remaining unknowns of the engine (such as its
+inlet mass flow, the beta values of its compressor maps or the
+temperature ratios of its turbines) are solved for so that the
+algebraic matching residuals vanish (see huracan.offdesign),
+starting from their values at the previous instant and reusing
+the Jacobian of the previous solves.
+
+    residuals = [map_flow('c'), flow_capacity('t'), nozzle_area('core')]
+
+    design(definition, residuals)
+
+    sim = transient(definition,
+                    unknowns={'gas.mf': 20, 'c.beta': 0.5, 't.TAU': 0.8},
+                    residuals=residuals,
+                    inputs={'cc.t01': lambda t: 1250 + 100*(t > 0.1)})
+
+    r = sim.run(t_end=2, dt=1e-3)
+
+    r['t'], r['spool.N'], r['thrust_total']
+
+Inputs are constant values or functions of time. The results are
+recorded in arrays allocated before the simulation starts.
+
+Ensembles of engines differing in some of their definition values
+(such as degraded component efficiencies or shaft inertias) are
+simulated in lockstep along an ensemble axis: each evaluation runs
+all engines in a single batched engine run, and the algebraic
+unknowns of all engines are solved together.
+
+    e = ensemble(sim, {'t.eta': np.linspace(0.86, 0.9, 100)})
+
+    r = e.run(t_end=2, dt=1e-2)
+
+    r['spool.N'][:, i]
+
+Ensembles are linearized into stacked state-space models about the
+steady state of each engine, such as over a throttle line:
+
+    ss = ensemble(sim, {'cc.t01': np.linspace(1000, 1400, 200)}).linearize(['cc.t01'])
+
+    ss['A'][i], ss['B'][i], ss['C'][i], ss['D'][i]
+"""
+
+import warnings
+import numpy as np
+
+from huracan.constants import R
+from huracan.definition import build
+from huracan.offdesign import residual, problem, design_speeds, newton, solve, shaft_balance, flow_capacity
+
+
+default_outputs = ['thrust_total', 'sfc']
+
+
+class volume(residual):
+    """
+    Intercomponent volume
+    ---------------------
+
+    Volume at the inlet of a component, storing a mass m of gas at
+    the total temperature of the flow entering the component. As a
+    residual, the total pressure of the flow entering the component
+    minus that of the gas in the volume, relative to the design
+    total pressure. The flow leaving the volume is set by the flow
+    capacity of the component, by default that at the design point.
+    """
+    def __init__(self, component, V, capacity=None):
+        """
+        :param component: Component at whose inlet the volume is.
+        :param V:         [m^3] Volume.
+        :param capacity:  Flow capacity of the component, mf*t0**0.5/p0.
+
+        :type component:  str
+        :type V:          float
+        :type capacity:   float
+        """
+        super().__init__(target=0)
+        self.component = component
+        self.V         = V
+        self.capacity  = capacity
+        self.m         = None
+
+    @property
+    def name(self):
+        return f'{self.component}.m'
+
+    def value(self, model):
+        inlet = model[self.component].inlet
+        return inlet.p0 - self.m*R*inlet.t0/self.V
+
+    def design(self, model):
+        inlet = model[self.component].inlet
+        if self.capacity is None:
+            self.capacity = float(inlet.mf*inlet.t0**0.5/inlet.p0)
+        if self.scale is None:
+            self.scale = float(inlet.p0)
+
+    def mass(self, model):
+        """
+        Mass stored in the volume with the flow entering the
+        component in steady state.
+        """
+        inlet = model[self.component].inlet
+        return inlet.p0*self.V/(R*inlet.t0)
+
+    def flow(self, model):
+        """
+        Rate of change of the mass stored in the volume.
+        """
+        inlet = model[self.component].inlet
+        return inlet.mf - self.capacity*inlet.p0/inlet.t0**0.5
+
+    def steady(self):
+        """
+        Residual of the volume in steady state: the flow capacity
+        of the component.
+        """
+        return flow_capacity(self.component, target=self.capacity)
+
+    def reads(self, graph):
+        return {graph.inlet(graph.model[self.component])}
+
+
+class transient:
+    """
+    Transient simulation
+    --------------------
+    """
+    def __init__(self, definition, unknowns, residuals, inputs=None, volumes=None, outputs=None):
+        """
+        :param definition: Engine definition. The shafts given a polar
+                           moment of inertia I and a design rotational
+                           speed omega are dynamic.
+        :param unknowns:   Algebraic unknowns (see huracan.offdesign.problem)
+                           and their initial guesses.
+        :param residuals:  Algebraic matching residuals, excluding the power
+                           balance of the dynamic shafts and the flow capacity
+                           of the components with inlet volumes.
+        :param inputs:     Definition values defining the operating point,
+                           constant or functions of time.
+        :param volumes:    Intercomponent volumes, whose targets must have
+                           been set (see huracan.offdesign.design).
+        :param outputs:    Outputs recorded at each time step (see
+                           huracan.definition.model.results).
+
+        :type definition:  dict
+        :type unknowns:    dict
+        :type residuals:   list of huracan.offdesign.residual
+        :type inputs:      dict
+        :type volumes:     list of volume
+        :type outputs:     list of str
+        """
+        self.definition = design_speeds(definition)
+        self.inputs     = dict(inputs) if inputs else {}
+        self.volumes    = list(volumes) if volumes else []
+        self.outputs    = list(outputs) if outputs else default_outputs
+
+        model = build(self.definition)
+
+        self.shafts = [name for name, s in model.shafts.items() if s.I is not None and s.omega is not None]
+        self.states = [f'{s}.N' for s in self.shafts] + [v.name for v in self.volumes]
+
+        self.problem = problem(self.definition, unknowns, list(residuals) + self.volumes, persistent=True)
+        self.J       = None
+
+    def values(self, t):
+        """
+        Values of the inputs at a time t.
+        """
+        return {k: v(t) if callable(v) else v for k, v in self.inputs.items()}
+
+    def set(self, t, x, inputs=None):
+        """
+        Set the inputs of the algebraic problem at a time t and
+        states x.
+
+        :param inputs: Values of the inputs overriding those at t.
+        """
+        ns     = len(self.shafts)
+        values = {**self.values(t), **(inputs or {})}
+        self.problem.inputs = {**values, **{f'{s}.N': x[i] for i, s in enumerate(self.shafts)}}
+        for v, m in zip(self.volumes, x[ns:]):
+            v.m = m
+
+    def derivatives(self, t, x, z, tol=1e-8, inputs=None):
+        """
+        Rates of change of the states at a time t, obtained by
+        solving the algebraic unknowns starting from z.
+
+        :param inputs: Values of the inputs overriding those at t.
+
+        :return: [np.ndarray]                  Rates of change of the states.
+                 [huracan.offdesign.solution] Algebraic solution. Its engine model
+                                              is run again by later evaluations.
+        """
+        self.set(t, x, inputs)
+
+        s = newton(self.problem, x0=z, tol=tol, method='chord', J0=self.J)
+        if not s.converged and self.J is not None:
+            # The previous Jacobian may be too far off: start from a fresh one
+            s = newton(self.problem, x0=z, tol=tol, method='chord')
+
+        # Only the Jacobians of converged solves are kept for the following ones
+        if s.converged:
+            self.J = s.J
+
+        return self.rates(s.model, x), s
+
+    def rates(self, model, x):
+        """
+        Rates of change of the states x of a run engine model.
+
+        :param x: States, one row per state (and, for batched models,
+                  one column per point).
+
+        :type model: huracan.definition.model
+        :type x:     np.ndarray
+
+        :rtype: np.ndarray
+        """
+        dx = np.empty(np.shape(x))
+        for i, name in enumerate(self.shafts):
+            sh    = model[name]
+            w_t   = -sum([c.w for c in sh.components if c.__class__.__name__ == 'turbine'])
+            dx[i] = (w_t - sh.w_r())/(sh.I*sh.omega**2*x[i])
+        for i, v in enumerate(self.volumes):
+            dx[len(self.shafts) + i] = v.flow(model)
+        return dx
+
+    def steady(self, t=0, N=None, inputs=None):
+        """
+        Steady state of the engine with the inputs at a time t: the
+        power balance of all dynamic shafts and the flow capacity of
+        the components with inlet volumes are added to the algebraic
+        problem.
+
+        :param N:      Initial guess of the relative shaft speeds.
+        :param inputs: Values of the inputs overriding those at t.
+
+        :return: [np.ndarray]                  States.
+                 [huracan.offdesign.solution] Solution.
+        """
+        N = np.ones(len(self.shafts)) if N is None else np.asarray(N, dtype=float)
+
+        unknowns  = {**dict(zip(self.problem.unknowns, self.problem.x0)),
+                     **{f'{s}.N': n for s, n in zip(self.shafts, N)}}
+        residuals = [r for r in self.problem.residuals if r not in self.volumes] + \
+                    [shaft_balance(s) for s in self.shafts] + \
+                    [v.steady() for v in self.volumes]
+
+        s = newton(problem(self.definition, unknowns, residuals, {**self.values(t), **(inputs or {})}))
+
+        assert s.converged, 'Transient simulation: the steady state of the engine could not be found.'
+
+        x = np.array([s[f'{n}.N'] for n in self.shafts] + [v.mass(s.model) for v in self.volumes])
+        return x, s
+
+    def run(self, t_end, dt, t0=0, x0=None, z0=None, method='heun', rtol=None, atol=1e-6,
+            dt_min=1e-6, dt_max=None, max_steps=100000):
+        """
+        Simulate the engine from t0 to t_end.
+
+        Fixed step integration methods are 'euler', 'heun' and 'rk4'.
+        If a relative tolerance rtol is given, the time step is instead
+        adapted so that the error of each step, estimated as the
+        difference between its Euler and Heun approximations, is
+        within rtol*|x| + atol.
+
+        If the algebraic unknowns cannot be solved for at a time step,
+        even from a fresh Jacobian, the step is marked as unconverged
+        and the simulation stops there with a warning. Adaptive steps
+        whose solves fail are first shortened down to dt_min.
+
+        :param t_end:     End time.
+        :param dt:        Time step, or initial time step if adaptive.
+        :param t0:        Initial time.
+        :param x0:        Initial states. By default, the steady state of
+                          the engine with the inputs at t0.
+        :param z0:        Initial guess of the algebraic unknowns.
+        :param method:    Fixed step integration method.
+        :param rtol:      Relative tolerance of adaptive steps.
+        :param atol:      Absolute tolerance of adaptive steps.
+        :param dt_min:    Minimum adaptive time step.
+        :param dt_max:    Maximum adaptive time step.
+        :param max_steps: Maximum number of adaptive time steps.
+
+        :return: Columnar results: time, states, algebraic unknowns,
+                 outputs and whether the unknowns converged at each
+                 time step.
+
+        :rtype: dict of np.ndarray
+        """
+        assert method in ['euler', 'heun', 'rk4'], f'Transient simulation: unknown method {method}.'
+
+        if x0 is None:
+            x0, s = self.steady(t0)
+            z0    = np.array([s[u] for u in self.problem.unknowns]) if z0 is None else z0
+
+        x = np.array(x0, dtype=float)
+        z = np.array(self.problem.x0 if z0 is None else z0, dtype=float)
+
+        adaptive = rtol is not None
+        n        = max_steps if adaptive else int(np.ceil((t_end - t0)/dt - 1e-9))
+
+        # Preallocated results
+        T = np.empty(n + 1)
+        X = np.empty((n + 1, len(x)))
+        Z = np.empty((n + 1, len(z)))
+        Y = np.empty((n + 1, len(self.outputs)))
+        C = np.empty(n + 1, dtype=bool)
+
+        t = t0
+        k = 0
+        f, s = self.derivatives(t, x, z)
+        converged = s.converged
+        while True:
+            T[k], X[k], Z[k], C[k] = t, x, s.x, converged
+            Y[k] = [np.squeeze(v) for v in s.model.results(self.outputs).values()]
+            z = s.x
+
+            if not converged:
+                warnings.warn(f'Transient simulation: the algebraic unknowns could not be solved for at t = {t}, '
+                              f'the simulation is stopped.')
+                break
+
+            if t >= t_end - 1e-12 or k == n:
+                break
+
+            h = min(dt, t_end - t)
+
+            if method == 'euler' and not adaptive:
+                x = x + h*f
+            elif method == 'rk4' and not adaptive:
+                k2, s2 = self.derivatives(t + h/2, x + h/2*f, z)
+                k3, s3 = self.derivatives(t + h/2, x + h/2*k2, z)
+                k4, s4 = self.derivatives(t + h, x + h*k3, z)
+                converged = s2.converged and s3.converged and s4.converged
+                x = x + h/6*(f + 2*k2 + 2*k3 + k4)
+            else:
+                while True:
+                    f2, s2 = self.derivatives(t + h, x + h*f, z)
+                    converged = s2.converged
+                    if not adaptive:
+                        break
+                    # Heun-Euler error estimate, steps whose solve fails being shortened
+                    error = np.max(np.abs(h/2*(f2 - f))/(rtol*np.abs(x) + atol)) if converged else np.inf
+                    if error <= 1 or h <= dt_min:
+                        break
+                    h = max(h*max(0.9/error**0.5, 0.2), dt_min)
+                x = x + h/2*(f + f2)
+                if adaptive:
+                    dt = min(h*min(0.9/max(error, 1e-12)**0.5, 5), dt_max or np.inf)
+
+            t = t + h
+            k = k + 1
+            f, s = self.derivatives(t, x, z)
+            converged = converged and s.converged
+
+        results = {'t': T[:k+1]}
+        results.update({name: X[:k+1, i] for i, name in enumerate(self.states)})
+        results.update({name: Z[:k+1, i] for i, name in enumerate(self.problem.unknowns)})
+        results.update({name: Y[:k+1, i] for i, name in enumerate(self.outputs)})
+        results['converged'] = C[:k+1]
+        return results
+
+
+class ensemble:
+    """
+    Ensemble transient simulation
+    -----------------------------
+    """
+    def __init__(self, sim, parameters):
+        """
+        :param sim:        Transient simulation.
+        :param parameters: Definition values of each engine of the ensemble,
+                           one array per value, all of the same length.
+
+        :type sim:         transient
+        :type parameters:  dict of np.ndarray
+        """
+        self.sim        = sim
+        self.parameters = {k: np.asarray(v, dtype=float) for k, v in parameters.items()}
+        self.n          = max([v.size for v in self.parameters.values()] + [1])
+
+        assert all(v.ndim == 1 and v.size == self.n for v in self.parameters.values()), \
+            'Ensemble transient simulation: all parameters must be arrays of the same length.'
+
+        self.states = sim.states
+        self.J      = None
+        self.models = {}
+
+    def tile(self, values, c):
+        """
+        Tile the per-engine arrays of a set of definition values
+        over c blocks of columns of a batched engine run. Arrays
+        with one value per column are left as they are.
+        """
+        return {k: np.tile(v, c) if np.size(v) == self.n and np.ndim(v) > 0 else v for k, v in values.items()}
+
+    def evaluate(self, inputs, unknowns, Z, residuals, masses):
+        """
+        Evaluate the residuals of all engines in a single batched
+        engine run.
+
+        :param inputs:    Definition values, scalars or arrays with one
+                          value per engine.
+        :param unknowns:  Names of the unknowns.
+        :param Z:         Values of the unknowns, one column per engine and
+                          perturbation, in blocks of one column per engine.
+        :param residuals: Residuals.
+        :param masses:    Mass stored in each volume, one value per engine
+                          or per column of Z.
+
+        :return: [np.ndarray] Residuals, one column per column of Z.
+                 [model]      Engine model.
+        """
+        c = Z.shape[1]//self.n
+        for v, m in zip(self.sim.volumes, masses):
+            v.m = np.tile(m, c) if np.size(m) == self.n else m
+
+        # Engine models are built once per number of columns and set of
+        # values, and then run again with the values set on them
+        values = {**self.tile(inputs, c), **dict(zip(unknowns, Z))}
+        key    = c, tuple(values.keys())
+        if key in self.models:
+            model = self.models[key].set(values).rerun()
+        else:
+            model = self.models[key] = build(self.sim.definition, values).run()
+        return np.array([np.broadcast_to(r(model), (Z.shape[1],)) for r in residuals]), model
+
+    def newton(self, inputs, unknowns, Z, residuals, masses=(), J=None, tol=1e-8, maxiter=50, step=1e-6,
+               max_change=0.2, contraction=0.5):
+        """
+        Solve the algebraic problems of all engines together with
+        the chord method: the Jacobians of all engines are evaluated
+        in a single batched run, and only again when an iteration of
+        any unconverged engine fails to reduce the norm of its
+        residuals by the contraction factor.
+
+        :param J: Initial Jacobians, one per engine.
+
+        :return: [np.ndarray] Unknowns, one column per engine.
+                 [np.ndarray] Jacobians, one per engine.
+                 [np.ndarray] Whether each engine converged.
+                 [model]      Engine model run at the solution.
+        """
+        n, k = self.n, len(unknowns)
+
+        R, model = self.evaluate(inputs, unknowns, Z, residuals, masses)
+        norm     = np.linalg.norm(R, axis=0)
+        for i in range(maxiter):
+            done = norm < tol
+            if np.all(done):
+                break
+
+            if J is None:
+                # Perturbation of each unknown of all engines, in blocks of n columns
+                h  = step*np.maximum(np.abs(Z), 1)
+                Zp = np.tile(Z, k)
+                for j in range(k):
+                    Zp[j, j*n:(j+1)*n] += h[j]
+                F, _ = self.evaluate(inputs, unknowns, Zp, residuals, masses)
+                J    = ((F.reshape(len(residuals), k, n) - R[:, None, :])/h[None, :, :]).transpose(2, 0, 1)
+
+            try:
+                dx = np.linalg.solve(J, -R.T[:, :, None])[:, :, 0].T
+            except np.linalg.LinAlgError:
+                dx = np.column_stack([solve(J[e], -R[:, e]) for e in range(n)])
+
+            # Limit the change of the unknowns
+            ratio = np.max(np.abs(dx)/(max_change*np.maximum(np.abs(Z), 1e-12)), axis=0)
+            dx    = np.where(done, 0, dx/np.maximum(ratio, 1))
+            Z     = Z + dx
+
+            R, model = self.evaluate(inputs, unknowns, Z, residuals, masses)
+            new      = np.linalg.norm(R, axis=0)
+            if np.any(~done & (new > contraction*norm)):
+                J = None
+            norm = new
+
+        return Z, J, norm < tol, model
+
+    def values(self, t, x):
+        """
+        Inputs of the algebraic problem of all engines at a time t
+        and states x, one column per engine.
+        """
+        return {**self.sim.values(t), **self.parameters,
+                **{f'{s}.N': x[i] for i, s in enumerate(self.sim.shafts)}}
+
+    def derivatives(self, t, x, Z, tol=1e-8):
+        """
+        Rates of change of the states of all engines at a time t.
+
+        :param x: States, one column per engine.
+        :param Z: Initial guess of the unknowns, one column per engine.
+
+        :return: [np.ndarray] Rates of change of the states, one column per engine.
+                 [np.ndarray] Unknowns, one column per engine.
+                 [np.ndarray] Whether the unknowns of each engine converged.
+                 [model]      Engine model.
+        """
+        sim = self.sim
+        ns  = len(sim.shafts)
+
+        Z, self.J, converged, model = self.newton(self.values(t, x), sim.problem.unknowns, Z,
+                                                  sim.problem.residuals, x[ns:], J=self.J, tol=tol)
+
+        return sim.rates(model, x), Z, converged, model
+
+    def steady(self, t=0):
+        """
+        Steady state of all engines with the inputs at a time t.
+
+        :return: [np.ndarray] States, one column per engine.
+                 [np.ndarray] Unknowns, one column per engine.
+        """
+        sim = self.sim
+
+        unknowns  = sim.problem.unknowns + [f'{s}.N' for s in sim.shafts]
+        residuals = [r for r in sim.problem.residuals if r not in sim.volumes] + \
+                    [shaft_balance(s) for s in sim.shafts] + \
+                    [v.steady() for v in sim.volumes]
+
+        Z0 = np.tile(np.concatenate([sim.problem.x0, np.ones(len(sim.shafts))])[:, None], self.n)
+
+        Z, _, converged, model = self.newton({**sim.values(t), **self.parameters}, unknowns, Z0, residuals)
+
+        assert np.all(converged), \
+            f'Ensemble transient simulation: the steady state of engines {np.where(~converged)[0]} could not be found.'
+
+        k = len(sim.problem.unknowns)
+        x = np.vstack([Z[k:]] + [np.broadcast_to(v.mass(model), (self.n,)) for v in sim.volumes])
+        return x, Z[:k]
+
+    def linearize(self, inputs, t=0, x=None, z=None, step=1e-6):
+        """
+        State-space models of all engines, linearized about their
+        steady states (or given states):
+
+            dx/dt = A dx + B du
+            dy    = C dx + D du
+
+        where x are the states, u the given inputs and y the outputs
+        of the simulation. The algebraic unknowns are eliminated with
+        the Jacobian of the matching residuals, which is obtained from
+        the same finite differences. The unknowns, states and inputs of
+        all engines are perturbed in a single batched engine run.
+
+        :param inputs: Definition values making up the inputs u, such as
+                       'cc.fuel.mf' or 'cc.t01'.
+        :param t:      Time at which the inputs of the simulation are evaluated.
+        :param x:      States, one column per engine. By default, the steady
+                       state of each engine.
+        :param z:      Unknowns solving the algebraic problem at the states x.
+        :param step:   Relative finite difference step.
+
+        :type inputs:  list of str
+
+        :return: Stacked state-space matrices 'A', 'B', 'C' and 'D', one per
+                 engine along the first axis, the Jacobian of the matching
+                 residuals with respect to the unknowns 'J' (which is kept
+                 for the following solves), and the values of 'x', 'z', 'u'
+                 and 'y' about which the engines are linearized.
+
+        :rtype: dict of np.ndarray
+        """
+        sim, n = self.sim, self.n
+
+        if x is None:
+            x, z = self.steady(t)
+
+        values = {**sim.values(t), **self.parameters}
+        u = np.array([np.broadcast_to(np.asarray(values[k], dtype=float), (n,)) for k in inputs]).reshape(-1, n)
+
+        nz, nx, nu = len(z), len(x), len(u)
+        v  = np.vstack([z, x, u])
+        h  = step*np.maximum(np.abs(v), 1)
+        nv = len(v)
+
+        # Unperturbed point followed by one block of n columns per perturbation
+        V = np.tile(v, 1 + nv)
+        for j in range(nv):
+            V[j, (j+1)*n:(j+2)*n] += h[j]
+
+        X = V[nz:nz+nx]
+        U = dict(zip(inputs, V[nz+nx:]))
+        R, model = self.evaluate({**values, **U, **{f'{s}.N': X[i] for i, s in enumerate(sim.shafts)}},
+                                 sim.problem.unknowns, V[:nz], sim.problem.residuals, X[len(sim.shafts):])
+        F = sim.rates(model, X)
+        Y = np.array([np.broadcast_to(y, (V.shape[1],)) for y in model.results(sim.outputs).values()])
+
+        G  = np.vstack([R, F, Y]).reshape(-1, 1 + nv, n)
+        dG = ((G[:, 1:] - G[:, :1])/h[None, :, :]).transpose(2, 0, 1)
+
+        nr, ny = len(R), len(Y)
+        gz, gw = dG[:, :nr, :nz], dG[:, :nr, nz:]
+        fz, fw = dG[:, nr:nr+nx, :nz], dG[:, nr:nr+nx, nz:]
+        yz, yw = dG[:, nr+nx:, :nz], dG[:, nr+nx:, nz:]
+
+        # Unknowns following the states and inputs along the matching residuals
+        S  = np.linalg.solve(gz, gw)
+        AB = fw - fz @ S
+        CD = yw - yz @ S
+
+        self.J = gz
+
+        return {'A': AB[:, :, :nx], 'B': AB[:, :, nx:],
+                'C': CD[:, :, :nx], 'D': CD[:, :, nx:],
+                'J': gz,
+                'x': x, 'z': z, 'u': u, 'y': G[nr+nx:, 0]}
+
+    def run(self, t_end, dt, t0=0, x0=None, z0=None, method='heun'):
+        """
+        Simulate all engines from t0 to t_end with a fixed time step.
+
+        :param t_end:  End time.
+        :param dt:     Time step.
+        :param t0:     Initial time.
+        :param x0:     Initial states, one column per engine. By default,
+                       the steady state of each engine at t0.
+        :param z0:     Initial guess of the unknowns, one column per engine.
+        :param method: Integration method: 'euler', 'heun' or 'rk4'.
+
+        :return: Columnar results: time, and states, algebraic unknowns,
+                 outputs and whether the unknowns converged, one row per
+                 time step and one column per engine.
+
+        :rtype: dict of np.ndarray
+        """
+        assert method in ['euler', 'heun', 'rk4'], f'Ensemble transient simulation: unknown method {method}.'
+
+        sim = self.sim
+
+        if x0 is None:
+            x0, z = self.steady(t0)
+            z0    = z if z0 is None else z0
+
+        x = np.array(np.broadcast_to(x0, (len(self.states), self.n)), dtype=float)
+        Z = np.array(np.broadcast_to(np.asarray(sim.problem.x0 if z0 is None else z0).reshape(len(sim.problem.unknowns), -1),
+                                     (len(sim.problem.unknowns), self.n)), dtype=float)
+
+        n = int(np.ceil((t_end - t0)/dt - 1e-9))
+
+        # Preallocated results
+        T = np.empty(n + 1)
+        X = np.empty((n + 1, len(self.states), self.n))
+        U = np.empty((n + 1, len(Z), self.n))
+        Y = np.empty((n + 1, len(sim.outputs), self.n))
+        C = np.empty((n + 1, self.n), dtype=bool)
+
+        t = t0
+        f, Z, converged, model = self.derivatives(t, x, Z)
+        for k in range(n + 1):
+            T[k], X[k], U[k], C[k] = t, x, Z, converged
+            for i, v in enumerate(model.results(sim.outputs).values()):
+                Y[k, i] = np.broadcast_to(v, (self.n,))
+
+            if k == n:
+                break
+
+            h = min(dt, t_end - t)
+
+            if method == 'euler':
+                x = x + h*f
+            elif method == 'heun':
+                f2, _, _, _ = self.derivatives(t + h, x + h*f, Z)
+                x = x + h/2*(f + f2)
+            else:
+                k2, _, _, _ = self.derivatives(t + h/2, x + h/2*f, Z)
+                k3, _, _, _ = self.derivatives(t + h/2, x + h/2*k2, Z)
+                k4, _, _, _ = self.derivatives(t + h, x + h*k3, Z)
+                x = x + h/6*(f + 2*k2 + 2*k3 + k4)
+
+            t = t + h
+            f, Z, converged, model = self.derivatives(t, x, Z)
+
+        results = {'t': T}
+        results.update({name: X[:, i] for i, name in enumerate(self.states)})
+        results.update({name: U[:, i] for i, name in enumerate(sim.problem.unknowns)})
+        results.update({name: Y[:, i] for i, name in enumerate(sim.outputs)})
+        results['converged'] = C
+        return results
@@ -9,10 +9,28 @@ Huracan utilities
 import re
 import sys
 import inspect
+import numpy as np
 
 from matplotlib.colors import to_hex, to_rgba
 
 
+def where(condition, a, b):
+    """
+    Return _a_ where _condition_ is true and _b_ elsewhere.
+
+    Scalar conditions return scalars, so that the same code
+    paths can evaluate single operating points and batches
+    of them (NumPy arrays).
+
+    :type condition: bool or np.ndarray
+    :type a:         float or np.ndarray
+    :type b:         float or np.ndarray
+    """
+    if np.ndim(condition) == 0 and np.ndim(a) == 0 and np.ndim(b) == 0:
+        return a if condition else b
+    return np.where(condition, a, b)
+
+
 def join_set_distance(a, b, d):
     return a + ' '*(d - len(a)) + b
 
@@ -0,0 +1,252 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Huracan warm-start database
+---------------------------
+
+Persistent store of converged off-design operating points, used
+to start new matching problems from the stored solution closest
+to them. Solutions are indexed by the structure of the problem:
+the components, shafts, streams, splits and merges of the engine
+(but not their values), the unknowns, the residuals and the names
+of the inputs. Solutions of the same engine definition are preferred,
+and otherwise those of structurally identical engines (such as the
+same engine with edited efficiencies or pressure ratios) are used.
+Solutions are looked up by nearest neighbour search over the values
+of the inputs (such as the flight Mach number, the ambient
+conditions and the combustor exit temperature), each normalized
+by its range over the stored points.
+
+    db = database('~/.huracan/warmstart.sqlite')
+
+    s = db.solve(problem(definition, unknowns, residuals, inputs={'gas.m': 0.8, 'cc.t01': 1300}))
+
+Nearest neighbours are found with SciPy's KD-tree if SciPy is
+available, and by brute force otherwise.
+"""
+
+import os
+import sqlite3
+import hashlib
+import numpy as np
+
+from huracan.definition import canonical, digest
+from huracan.offdesign import newton
+
+
+class database:
+    """
+    Warm-start database
+    -------------------
+    """
+    def __init__(self, path):
+        """
+        :param path: Path of the SQLite database file.
+
+        :type path:  str
+        """
+        self.path  = os.path.expanduser(str(path))
+        self.db    = None
+        self.index = {}
+
+    def connect(self):
+        """
+        Open the database, creating it if it does not exist.
+        Connections are opened lazily, so that databases can be
+        sent to other processes.
+        """
+        if self.db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.db = sqlite3.connect(self.path, timeout=30)
+            self.db.execute('CREATE TABLE IF NOT EXISTS solutions '
+                            '(key TEXT, engine TEXT, point BLOB, x BLOB, PRIMARY KEY (key, engine, point))')
+            self.db.commit()
+        return self.db
+
+    @staticmethod
+    def key(problem):
+        """
+        Index of the solutions of a matching problem: digest of the
+        structure of its engine, its unknowns, residuals and input names.
+        Matching problems with the same index can start from each
+        other's solutions.
+
+        :type problem: huracan.offdesign.problem
+
+        :rtype: str
+        """
+        index = {'engine':    structure(problem.definition),
+                 'unknowns':  problem.unknowns,
+                 'residuals': [signature(r) for r in problem.residuals],
+                 'inputs':    sorted(problem.inputs.keys())}
+        return hashlib.sha256(canonical(index).encode()).hexdigest()
+
+    @staticmethod
+    def point(inputs):
+        """
+        Operating point: values of the inputs of a matching problem,
+        sorted by name.
+
+        :type inputs: dict
+
+        :rtype: np.ndarray
+        """
+        return np.array([inputs[n] for n in sorted(inputs.keys())], dtype=float)
+
+    def add(self, problem, solutions):
+        """
+        Store the converged solutions of a matching problem. A
+        solution replaces any stored for the same operating point.
+
+        :param solutions: Solutions, and for each the inputs of the
+                          problem it solves (by default, those of the
+                          problem).
+
+        :type problem:    huracan.offdesign.problem
+        :type solutions:  solution or list of (solution, dict)
+        """
+        if not isinstance(solutions, list):
+            solutions = [(solutions, problem.inputs)]
+
+        k    = self.key(problem)
+        e    = digest(problem.definition)
+        rows = []
+        for s, inputs in solutions:
+            if s.converged:
+                rows.append((k, e, self.point(inputs).tobytes(), np.asarray(s.x, dtype=float).tobytes()))
+
+        db = self.connect()
+        db.executemany('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)', rows)
+        db.commit()
+
+        self.index = {i: v for i, v in self.index.items() if i[0] != k}
+
+    def points(self, problem):
+        """
+        Stored operating points and solutions of a matching problem,
+        and their nearest neighbour search index: those of its engine
+        definition if any are stored, and otherwise those of all the
+        structurally identical engines.
+
+        :type problem: huracan.offdesign.problem
+
+        :return: [np.ndarray] Operating points, one row per point.
+                 [np.ndarray] Solutions, one row per point.
+                 [tuple]      Search index: KD-tree (or None) and the
+                              offset and scale normalizing the points.
+        """
+        k = self.key(problem), digest(problem.definition)
+        if k not in self.index:
+            rows  = self.connect().execute('SELECT engine, point, x FROM solutions WHERE key = ?', (k[0],)).fetchall()
+            exact = [(p, x) for e, p, x in rows if e == k[1]]
+            rows  = exact if exact else [(p, x) for _, p, x in rows]
+            n     = len(problem.inputs)
+            P    = np.array([np.frombuffer(p) for p, _ in rows]).reshape(-1, n)
+            X    = np.array([np.frombuffer(x) for _, x in rows]).reshape(-1, len(problem.unknowns))
+
+            offset = P.min(axis=0) if len(P) else np.zeros(n)
+            span   = np.ptp(P, axis=0) if len(P) else np.ones(n)
+            scale  = np.where(span > 0, span, 1)
+
+            self.index[k] = P, X, (kdtree((P - offset)/scale) if len(P) else None, offset, scale)
+        return self.index[k]
+
+    def nearest(self, problem, inputs=None):
+        """
+        Stored solution closest to an operating point of a
+        matching problem, or None if there are none.
+
+        :param inputs: Inputs of the operating point. By default,
+                       those of the problem.
+
+        :type problem: huracan.offdesign.problem
+        :type inputs:  dict
+
+        :rtype: np.ndarray
+        """
+        P, X, (tree, offset, scale) = self.points(problem)
+        if not len(P):
+            return None
+
+        point = (self.point(problem.inputs if inputs is None else inputs) - offset)/scale
+
+        if not isinstance(tree, np.ndarray):
+            return X[tree.query(point)[1]].copy()
+        return X[np.argmin(np.sum((tree - point)**2, axis=1))].copy()
+
+    def solve(self, problem, solver=None, **kwargs):
+        """
+        Solve a matching problem starting from the closest stored
+        solution, and store its solution if converged.
+
+        :param solver: Solver taking the problem and an initial guess
+                       x0, by default huracan.offdesign.newton.
+        :param kwargs: Keyword arguments of the solver.
+
+        :type problem: huracan.offdesign.problem
+
+        :rtype: huracan.offdesign.solution
+        """
+        solver = newton if solver is None else solver
+
+        s = solver(problem, x0=self.nearest(problem), **kwargs)
+        self.add(problem, s)
+        return s
+
+    def clear(self):
+        self.connect().execute('DELETE FROM solutions')
+        self.db.commit()
+        self.index = {}
+
+    def __len__(self):
+        return self.connect().execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def __getstate__(self):
+        return {**self.__dict__, 'db': None, 'index': {}}
+
+
+def structure(definition):
+    """
+    Structure of an engine definition: the types of its components,
+    the components of its shafts and streams, and its splits and
+    merges, without their values.
+
+    :type definition: dict
+
+    :rtype: dict
+    """
+    return {'components': {n: c['type'] for n, c in definition['components'].items()},
+            'shafts':     {n: s['components'] for n, s in definition.get('shafts', {}).items()},
+            'streams':    definition['streams'],
+            'splits':     [[s['stream']] + list(s['into']) for s in definition.get('splits', [])],
+            'merges':     [list(m['streams']) + [m['into']] for m in definition.get('merges', [])]}
+
+
+def signature(residual):
+    """
+    Type of a matching residual and the engine output, component,
+    shaft or stream it applies to.
+
+    :type residual: huracan.offdesign.residual
+
+    :rtype: list of str
+    """
+    return [residual.__class__.__name__] + [getattr(residual, a) for a in ['name', 'component', 'shaft', 'stream']
+                                            if isinstance(getattr(residual, a, None), str)]
+
+
+def kdtree(points):
+    """
+    KD-tree of a set of points if SciPy is available, or the
+    points themselves (searched by brute force) otherwise.
+
+    :type points: np.ndarray
+    """
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        return points
+    return cKDTree(points)
@@ -0,0 +1,75 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+import numpy as np
+
+# Huracan
+from huracan.cache import cache
+from huracan.definition import build
+from huracan.optimize import constraint
+from huracan.architecture import space, search
+
+from tests.test_offdesign import definition
+
+
+architectures = space(definition['gas'], {'LHV': 43e6}, compressors=3, PI=(1.5, 8),
+                      intercooler=True, afterburner=True, bleed=(0.005, 0.05),
+                      variables={'cc.t01': (1200, 1600), 'ab.t01': (1600, 1900)},
+                      specs={'intercooler': {'type': 'intercooler', 'eta': 0.95, 'Q_out': 5e5}})
+
+
+class TestsArchitecture(unittest.TestCase):
+
+    def test_definition(self):
+        names = [g[0] for g in architectures.genes]
+        u     = np.full(len(architectures), 0.9)
+        u[names.index('compressors')] = 0.5
+        u[names.index('c2.shaft')]    = 0.1
+
+        d = architectures.decode(u)
+        assert d['compressors'] == 2 and d['shafts'] == [1, 1] and d['intercooler'] and d['afterburner']
+
+        e = architectures.definition(u)
+        assert e['shafts'] == {'s1': {'eta': 0.99, 'components': ['c1', 'c2', 't1']}}
+        assert e['streams']['core'] == ['ic', 'c2', 'cc', 't1', 'ab', 'n']
+        assert e['components']['ab']['t01'] == 1600 + 0.9*300
+        build(e).run()
+
+        # Genes which do not apply to a candidate do not change its definition
+        v = u.copy()
+        v[names.index('c3.PI')]    = 0.2
+        v[names.index('c3.shaft')] = 0.7
+        assert architectures.definition(v) == e
+
+        v[names.index('afterburner')] = 0.2
+        v[names.index('ab.t01')]      = 0.1
+        w = u.copy()
+        w[names.index('afterburner')] = 0.2
+        assert architectures.definition(v) == architectures.definition(w) and 'ab' not in architectures.definition(w)['components']
+
+    def test_search(self):
+        c = cache(maxsize=2**16)
+        r = search(architectures, 'sfc', [constraint('thrust_total', lower=12e3)],
+                   population=20, generations=10, workers=2, cache=c, seed=0)
+
+        assert r.feasible and r.outputs['thrust_total'] >= 12e3
+        assert np.isfinite(r.objective) and r.objective == np.nanmin(r.statistics['best'])
+
+        # Convergence statistics, with duplicate candidates taken from the cache
+        s = r.statistics
+        assert len(s['generation']) == r.generations + 1
+        assert np.all(np.diff(s['best']) <= 0)
+        assert r.evaluations == s['evaluations'].sum() and r.hits == s['hits'].sum() > 0
+        assert np.all(s['unique'] <= 20) and np.all(s['topologies'] <= s['unique'])
+
+        # A repeated search is served from the cache, in this process
+        again = search(architectures, 'sfc', [constraint('thrust_total', lower=12e3)],
+                       population=20, generations=10, workers=1, cache=c, seed=0)
+        assert again.evaluations == 0 and again.definition == r.definition
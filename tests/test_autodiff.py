@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+import numpy as np
+
+# Huracan
+from huracan.definition import build
+from huracan.autodiff import dual, gradient, current
+from huracan.thermo.properties import model, polynomial, tabulated
+
+from tests.test_offdesign import definition
+
+turbofan = {'gas':        {**definition['gas'], 'mf': 100, 'm': 0.6},
+            'fuels':      definition['fuels'],
+            'components': {'i':   {'type': 'inlet', 'PI': 0.98},
+                           'f':   {'type': 'fan', 'eta': 0.9, 'PI': 1.6},
+                           'c':   {'type': 'compressor', 'eta': 0.85, 'PI': 12},
+                           'cc':  {'type': 'combustion_chamber', 'fuel': 'jet_a', 'eta': 0.98, 'PI': 0.96, 't01': 1500},
+                           'hpt': {'type': 'turbine', 'eta': 0.9},
+                           'lpt': {'type': 'turbine', 'eta': 0.9},
+                           'n':   {'type': 'nozzle', 'eta': 0.97},
+                           'bn':  {'type': 'nozzle', 'eta': 0.97}},
+            'shafts':     {'hp': {'components': ['c', 'hpt'], 'eta': 0.99},
+                           'lp': {'components': ['f', 'lpt'], 'eta': 0.99}},
+            'streams':    {'main': ['i', 'f'], 'core': ['c', 'cc', 'hpt', 'lpt', 'n'], 'bypass': ['bn']},
+            'splits':     [{'stream': 'main', 'fraction': 0.8, 'into': ['core', 'bypass']}]}
+
+
+class TestsAutodiff(unittest.TestCase):
+
+    def test_dual(self):
+        x = dual.seed(np.array([1.5, 2.0]), 0, 2)
+        y = dual.seed(0.5, 1, 2)
+
+        f = np.sqrt(x)*y**2/(1 + x) - 3**y + np.maximum(x, 1.8)
+
+        assert np.allclose(f.value, np.sqrt(x.value)*0.25/(1 + x.value) - 3**0.5 + np.maximum(x.value, 1.8))
+        # Analytic derivatives
+        dx = 0.25*(0.5/np.sqrt(x.value)/(1 + x.value) - np.sqrt(x.value)/(1 + x.value)**2) + (x.value >= 1.8)
+        dy = np.sqrt(x.value)*2*0.5/(1 + x.value) - 3**0.5*np.log(3)
+        assert np.allclose(f.grad[:, 0], dx) and np.allclose(f.grad[:, 1], dy)
+
+    def test_properties(self):
+        T = dual.seed(700., 0, 1)
+
+        assert np.isclose(polynomial([1000, 0.2, 1e-4])(T).grad[0], 0.2 + 2e-4*700)
+        assert np.isclose(tabulated([300, 600, 900], [1000, 1100, 1250])(T).grad[0], 0.5)
+
+        # Models without derivatives are differentiated numerically
+        class quadratic(model):
+            def evaluate(self, T):
+                return 1000 + 1e-4*T**2
+
+        assert np.isclose(quadratic()(T).grad[0], 2e-4*700)
+
+    def test_reductions(self):
+        x = dual.seed(np.arange(6.).reshape(2, 3), 0, 1)
+        y = x*x
+
+        for axis in [None, 0, 1, -1, (0, 1)]:
+            assert np.allclose(np.mean(y, axis=axis).value, np.mean(y.value, axis=axis))
+            assert np.allclose(np.mean(y, axis=axis).grad[..., 0], np.mean(2*x.value, axis=axis))
+            assert np.allclose(np.sum(y, axis=axis).grad[..., 0], np.sum(2*x.value, axis=axis))
+        assert np.mean(y, axis=1, keepdims=True).grad.shape == (2, 1, 1)
+
+    def test_gradient(self):
+        parameters = ['f.eta', 'f.PI', 'c.PI', 'cc.t01', 'hpt.eta', 'bypass.fraction']
+        outputs    = ['thrust_total', 'sfc', 'efficiency_total']
+
+        g = gradient(turbofan, parameters, outputs)
+
+        base = build(turbofan).run().results(outputs)
+        for o in outputs:
+            assert abs(g[o].value - base[o]) < 1e-9*abs(base[o])
+
+        # Central differences
+        for p in parameters:
+            v = current(turbofan, p)
+            h = 1e-6*max(abs(v), 1)
+            a = build(turbofan, {p: v + h}).run().results(outputs)
+            b = build(turbofan, {p: v - h}).run().results(outputs)
+            for o in outputs:
+                fd = (a[o] - b[o])/(2*h)
+                assert abs(g[o][p] - fd) <= 1e-6*max(abs(fd), 1e-12) + 1e-12, (o, p, g[o][p], fd)
+
+    def test_batched(self):
+        t01 = np.array([1200., 1400.])
+        g   = gradient(definition, ['c.PI', 'cc.t01'], values={'cc.t01': t01, 'gas.m': 0.5})
+
+        assert g['thrust_total'].value.shape == g['thrust_total']['c.PI'].shape == (2,)
+        for i in range(2):
+            s = gradient(definition, ['c.PI', 'cc.t01'], values={'cc.t01': t01[i], 'gas.m': 0.5})
+            assert np.isclose(g['sfc']['cc.t01'][i], s['sfc']['cc.t01'])
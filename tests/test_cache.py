@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import pickle
+import unittest
+import tempfile
+
+# Huracan
+from huracan.definition import load
+from huracan.cache import cache, lru, store, key, evaluate
+
+definition = load(Path(__file__).parents[1]/'examples'/'definitions'/'turbojet_1s-2s-bleed.json')
+
+
+class TestsCache(unittest.TestCase):
+
+    def test_key(self):
+        assert key(definition, {'cc.t01': 1500}) == key(dict(reversed(list(definition.items()))), {'cc.t01': 1500})
+        assert key(definition, {'cc.t01': 1500}) != key(definition, {'cc.t01': 1501})
+        assert key(definition, outputs=['sfc']) != key(definition, outputs=['thrust_total'])
+
+    def test_lru(self):
+        c = lru(maxsize=2)
+        c.set('a', 1)
+        c.set('b', 2)
+        c.get('a')
+        c.set('c', 3)
+
+        assert 'a' in c and 'c' in c and 'b' not in c
+
+    def test_memoization(self):
+        c = cache()
+
+        r0 = c.evaluate(definition, {'cc.t01': 1500}, ['thrust_total', 'sfc', 'cc.t0'])
+        r1 = c.evaluate(definition, {'cc.t01': 1500}, ['thrust_total', 'sfc', 'cc.t0'])
+
+        assert r0 == r1 == evaluate(definition, {'cc.t01': 1500}, ['thrust_total', 'sfc', 'cc.t0'])
+        assert r0['cc.t0'] == 1500
+        assert c.hits == 1 and c.misses == 1
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d)/'cache.sqlite'
+
+            r = cache(path=path).evaluate(definition)
+
+            # New session: the result is found on disk
+            c = pickle.loads(pickle.dumps(cache(path=path)))
+            assert c.evaluate(definition) == r
+            assert c.hits == 1
+
+    def test_eviction(self):
+        with tempfile.TemporaryDirectory() as d:
+            s = store(Path(d)/'cache.sqlite', max_bytes=1000)
+
+            for i in range(10):
+                s.set(str(i), b'x'*200)
+
+            assert s.size() <= 1000
+            assert '9' in s and '0' not in s
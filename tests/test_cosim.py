@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+import numpy as np
+
+# Huracan
+from huracan.offdesign import design, map_flow, flow_capacity, nozzle_area
+from huracan.transient import transient
+from huracan.cosim import cosimulation, ring
+
+from tests.test_transient import dynamic
+
+
+def simulation():
+    residuals = [map_flow('c'), flow_capacity('t'), nozzle_area('core')]
+    d = design(dynamic, residuals)
+    sim = transient(dynamic,
+                    unknowns={'gas.mf': 20, 'c.beta': 0.5, 't.TAU': float(d['t'].process.TAU)},
+                    residuals=residuals,
+                    inputs={'cc.t01': None})
+    return sim, float(d['cc'].fuel.mf), residuals[-1].target
+
+
+class TestsCoSimulation(unittest.TestCase):
+
+    def test_ring(self):
+        r = ring(4, ['a', 'b'])
+        for i in range(6):
+            r.append(np.array([i, -i]))
+
+        assert len(r) == 4
+        assert np.array_equal(r['a'], [2, 3, 4, 5])
+        assert np.array_equal(r.array()[:, 1], [-2, -3, -4, -5])
+
+    def test_speed_control(self):
+        sim, mf, A = simulation()
+
+        def controller(t, sensors, actuators):
+            # Integral fuel flow control of the spool speed
+            actuators['cc.fuel.mf'] += 0.1*(0.92 - sensors['N']['spool'])
+
+        co  = cosimulation(sim, controller, actuators={'cc.fuel.mf': mf*0.9}, capacity=50)
+        log = co.run(t_end=2, dt=1e-2)
+
+        assert set(co.sensors['t0'].keys()) == {'0.il', '0.cp', '0.cc', '0.tb', '0.nz'}
+        assert len(log) == 50 and abs(log['t'][-1] - 2) < 1e-9 and abs(log['t'][0] - 1.51) < 1e-9
+        assert np.all(np.abs(log['spool.N'] - 0.92) < 1e-3)
+        assert log['cc.fuel.mf'][-1] < mf    # below the fuel flow at the design speed
+        assert np.allclose(log['0.cc.t0'][-1], co.sensors['t0']['0.cc'])
+
+    def test_nozzle(self):
+        sim, mf, A = simulation()
+
+        def controller(t, sensors, actuators):
+            actuators['core.A_exit'] = A*(1 + 0.1*(t >= 0.1))
+
+        co  = cosimulation(sim, controller, actuators={'cc.fuel.mf': mf, 'core.A_exit': A})
+        log = co.run(t_end=0.5, dt=1e-2)
+
+        assert np.allclose(log['spool.N'][:10], log['spool.N'][0])
+        assert abs(log['spool.N'][-1] - log['spool.N'][0]) > 1e-4
+        assert log['0.tb.p0'][-1] != log['0.tb.p0'][0]
+
+    def test_reuse(self):
+        sim, mf, A = simulation()
+        co = cosimulation(sim, lambda t, sensors, actuators: None, actuators={'cc.fuel.mf': mf*0.95})
+
+        calls = []
+        derivatives = sim.derivatives
+        sim.derivatives = lambda *args, **kwargs: calls.append(1) or derivatives(*args, **kwargs)
+
+        # With the actuators held, the end-of-step solution is reused by the next step
+        for _ in range(10):
+            co.step(1e-2)
+        assert len(calls) == 1 + 2*10
+
+        # Changed actuators are not
+        co.actuators['cc.fuel.mf'] = mf
+        co.step(1e-2)
+        assert len(calls) == 1 + 2*10 + 3
@@ -0,0 +1,145 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import json
+import pickle
+import numpy as np
+import unittest
+
+# Huracan
+from huracan.engine import shaft
+from huracan.thermo.fluids import gas, fuel
+from huracan.definition import load, loads, build, digest, override
+from huracan.components import inlet, compressor, bleed_duct, combustion_chamber, turbine, nozzle, electrical_system
+
+path = Path(__file__).parents[1]/'examples'/'definitions'/'turbojet_1s-2s-bleed.json'
+
+
+def turbojet():
+    g = gas(mf=160,
+            cp=lambda T: 1150 if T > 600 else 1000,
+            k=lambda T: 1.33 if T > 600 else 1.4,
+            m=0, t_0=288, p_0=101325)
+
+    i  = inlet             (PI=0.92)
+    c1 = compressor        (eta=0.85, PI=4)
+    c2 = compressor        (eta=0.85, PI=4)
+    bd = bleed_duct        (t01=288.15, eta=0.95)
+    cc = combustion_chamber(fuel=fuel(LHV=43e6), eta=0.97, t01=1450)
+    t1 = turbine           (eta=0.9)
+    t2 = turbine           (eta=0.9)
+    n  = nozzle            (eta=0.95)
+    elctr = electrical_system(w=970000, eta_g=0.7, eta_c=0.98)
+
+    shaft(c1, t2,        eta=0.99)
+    shaft(c2, t1, elctr, eta=0.99)
+
+    s = g-i-c1
+    core, bleed = s*0.005
+    bleed-bd
+    core-c2-cc-t1-t2-n
+
+    return s
+
+
+class TestsDefinition(unittest.TestCase):
+
+    def test_build(self):
+        engine = build(load(path)).run()
+
+        s = turbojet()
+        s.run(log=False)
+
+        assert abs(engine.stream.thrust_total() - s.thrust_total()) < 1e-6
+        assert abs(engine['cc'].fuel.mf - s.system['1.m.cc'].fuel.mf) < 1e-12
+        assert engine['core'].stages() == ['1.m.cp', '1.m.cc', '1.m.tb1', '1.m.tb2', '1.m.nz']
+
+    def test_digest(self):
+        d = load(path)
+        reordered = json.loads(json.dumps(d, sort_keys=True))
+
+        assert digest(d) == digest(reordered)
+        assert digest(d) != digest(override(d, {'cc.t01': 1500}))
+        assert build(d).digest == digest(d)
+
+    def test_override(self):
+        d = load(path)
+        hot = build(d, {'cc.t01': 1500, 'gas.m': 0.3}).run()
+
+        assert hot['cc'].t0 == 1500
+        assert hot['main'].gas.m == 0.3
+        assert d['components']['cc']['t01'] == 1450
+
+        # Split fractions, batched
+        bled = build(d, {'bleed.fraction': np.array([0.005, 0.05])}).run()
+        assert np.allclose(bled['bleed'].gas.mf, [0.8, 8])
+        assert override(d, {'bleed.fraction': 0.05})['splits'][0]['fraction'] == 0.05
+
+    def test_rerun(self):
+        d      = load(path)
+        engine = build(d).run()
+        values = {'cc.t01': 1500, 'gas.m': 0.3, 'bleed.fraction': np.array([0.005, 0.05]), 'hp.eta': 0.98}
+
+        engine.set(values).rerun()
+        again = build(d, values).run()
+
+        assert np.allclose(engine.stream.thrust_total(), again.stream.thrust_total(), rtol=1e-12)
+        assert np.allclose(engine['bleed'].gas.mf, again['bleed'].gas.mf)
+        assert engine.digest == digest(override(d, values))
+
+        # Fuel mass flows computed by previous runs are discarded
+        engine.set({'cc.t01': None, 'cc.fuel.mf': 2}).rerun()
+        assert engine['cc'].fuel.mf == 2
+        engine.set({'cc.t01': 1400}).rerun()
+        assert np.allclose(engine['cc'].t0, 1400)
+
+        # Arguments not kept as attributes of the same name cannot be set
+        self.assertRaises(AssertionError, engine.set, {'elctr.eta_g': 0.8})
+
+    def test_merge(self):
+        d = {'gas':        {'mf': 100, 'cp': 1000, 'k': 1.4, 'm': 0.5, 't_0': 288, 'p_0': 101325},
+             'components': {'i':  {'type': 'inlet', 'PI': 0.98},
+                            'fn': {'type': 'fan', 'eta': 0.9, 'PI': 1.5},
+                            'nz': {'type': 'nozzle', 'eta': 0.95}},
+             'streams':    {'main': ['i', 'fn'], 'a': [], 'b': [], 'mixed': ['nz']},
+             'splits':     [{'stream': 'main', 'fraction': 0.5, 'into': ['a', 'b']}],
+             'merges':     [{'streams': ['a', 'b'], 'into': 'mixed'}]}
+
+        engine = build(d).run()
+
+        assert abs(engine['mixed'].gas.mf - 100) < 1e-9
+        assert engine['mixed'].stages() == ['2.nz']
+
+    def test_toml(self):
+        d = loads('''
+            [gas]
+            mf = 100
+            cp = 1000
+            m = 0
+            t_0 = 288
+            p_0 = 101325
+
+            [gas.k]
+            model = "piecewise_constant"
+            values = [1.4, 1.33]
+            breakpoints = [600]
+
+            [components]
+            c = {type = "compressor", eta = 0.9, PI = 10}
+
+            [streams]
+            main = ["c"]
+            ''', fmt='toml')
+
+        engine = build(d).run()
+        assert engine['c'].p0 == 10*101325
+
+    def test_pickle(self):
+        engine = pickle.loads(pickle.dumps(build(load(path)))).run()
+        assert engine.stream.thrust_total() > 0
@@ -50,3 +50,50 @@ class TestsFluid(unittest.TestCase):
 
         assert i.mf == mf*(1-fr)
         assert j.mf == mf*fr
+
+    def test_lazy_state(self):
+        calls = []
+
+        def cp(T):
+            calls.append(T)
+            return 1150 if T > 600 else 1000
+
+        l = gas(mf=mf, cp=cp, k=lambda T: 1.33 if T > 600 else 1.4,
+                m=m, t_0=t, p_0=p)
+
+        # No state variables computed until read
+        n = len(calls)
+        l.compression(eta=0.9, PI=2)
+        l.expansion(eta=0.9, PI=0.8)
+        assert len(calls) == n + 2
+
+        # cp evaluated at most once per state
+        n = len(calls)
+        l.H, l.E, l.cp0, l.H
+        assert len(calls) == n + 1
+        assert l.H == l.cp0/l.k0*l.t0 + l.p0*l.V
+
+    def test_calorically_perfect(self):
+        import numpy as np
+
+        c = gas(mf=mf, cp=1000, k=1.4, m=m, t_0=t, p_0=p)
+        l = gas(mf=mf, cp=lambda T: 1000, k=lambda T: 1.4, m=m, t_0=t, p_0=p)
+
+        assert c.calorically_perfect
+        assert not l.calorically_perfect
+
+        c.compression(eta=0.9, PI=10)
+        l.compression(eta=0.9, PI=10)
+        assert c.t0 == l.t0
+        assert c.H == l.H
+
+        # Mixtures of calorically perfect gases are calorically perfect
+        d = gas(mf=mf/2, cp=1150, k=1.33, m=m, t_0=t, p_0=p)
+        assert (c+d).calorically_perfect
+        assert abs((c+d).cp0 - (1000*mf + 1150*mf/2)/(1.5*mf)) < 1e-9
+
+        # Closed-form processes over arrays of states
+        a = gas(mf=mf, cp=1000, k=1.4, m=m, t_0=np.array([250., 288.]), p_0=p)
+        a.compression(eta=0.9, PI=np.array([20., 10.]))
+        assert a.t0.shape == (2,)
+        assert abs(a.t0[1] - l.t0) < 1e-9 and abs(a.p0[1] - l.p0) < 1e-6
@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+import json
+import tempfile
+import numpy as np
+from copy import deepcopy
+
+# Huracan
+from huracan.definition import build
+from huracan.components.maps import performance_map, read_map, parse_map, corrected_flow, mass_flow, library
+from huracan.offdesign import design, design_speeds, problem, newton, map_flow, flow_capacity, shaft_balance, nozzle_area
+
+from tests.test_offdesign import definition
+
+# Corrected mass flow of the compressor at the design point
+Wc_d = corrected_flow(20, 288.15, 101325*0.98)
+
+N    = np.linspace(0.5, 1.1, 13)
+beta = np.linspace(0, 1, 11)
+
+Wc  = Wc_d*N[:, None]*(1.1 - 0.2*beta[None, :])
+PI  = 1 + 9*N[:, None]**2*(0.8 + 0.4*beta[None, :])
+eta = 0.85 - 0.1*(N[:, None] - 1)**2 - 0.05*(beta[None, :] - 0.5)**2
+
+
+def text(N, beta, tables):
+    lines = []
+    for name, t in zip(['Mass Flow', 'Pressure Ratio', 'Efficiency'], tables):
+        lines += [name, 'N/beta ' + ' '.join([str(b) for b in beta])]
+        lines += [' '.join([str(n)] + [repr(float(v)) for v in row]) for n, row in zip(N, t)]
+        lines += ['']
+    return '\n'.join(['# Synthetic compressor map'] + lines)
+
+
+mapped = deepcopy(definition)
+mapped['components']['c'] = {'type': 'compressor', 'beta': 0.5,
+                             'map': {'N': N.tolist(), 'beta': beta.tolist(),
+                                     'Wc': Wc.tolist(), 'PI': PI.tolist(), 'eta': eta.tolist()}}
+
+
+class TestsMaps(unittest.TestCase):
+
+    def test_parse(self):
+        m = parse_map(text(N, beta, [Wc, PI, eta]))
+
+        assert np.allclose(m.N, N) and np.allclose(m.beta, beta)
+        assert np.allclose(m.PI, PI)
+
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d)/'compressor.map'
+            path.write_text(text(N, beta, [Wc, PI, eta]))
+            assert np.allclose(read_map(str(path)).eta, eta)
+
+    def test_lookup(self):
+        m = performance_map(N, beta, Wc, PI, eta)
+
+        # Map nodes
+        assert np.allclose(m(1, 0.5), (Wc_d, 10, 0.85))
+
+        # Bilinear interpolation: exact for the corrected flow
+        w, pi, e = m(np.array([0.52, 0.97, 1.0]), np.array([0.05, 0.33, 0.5]))
+        assert np.allclose(w, Wc_d*np.array([0.52, 0.97, 1])*(1.1 - 0.2*np.array([0.05, 0.33, 0.5])))
+        assert w.shape == pi.shape == e.shape == (3,)
+
+        # Interpolation buffers are reused, while returned values are not overwritten
+        buffers = m.buffers
+        again   = m(np.array([0.6, 0.7, 0.8]), 0.2)
+        assert m.buffers is buffers and not np.allclose(again[0], w)
+        assert np.allclose(w, Wc_d*np.array([0.52, 0.97, 1])*(1.1 - 0.2*np.array([0.05, 0.33, 0.5])))
+        assert m(np.ones((2, 2)), 0.5)[1].shape == (2, 2)
+
+    def test_library(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d)/'compressor.map'
+            path.write_text(text(N, beta, [Wc, PI, eta]))
+
+            lib = library(Path(d)/'maps')
+            assert lib.compile([str(path)]) == ['compressor']
+            assert lib.compile([str(path)]) == []
+            assert lib.names() == ['compressor']
+
+            m = library(Path(d)/'maps')['compressor']
+            assert isinstance(m.tables, np.memmap) and not m.tables.flags.writeable
+            assert np.allclose(m(0.97, 0.33), performance_map(N, beta, Wc, PI, eta)(0.97, 0.33))
+
+            # Definitions referring to library maps
+            spec = deepcopy(mapped)
+            spec['components']['c']['map'] = {'library': str(Path(d)/'maps'), 'name': 'compressor'}
+            assert abs(build(spec).run().stream.thrust_total() - build(mapped).run().stream.thrust_total()) < 1e-6
+
+    def test_corrected(self):
+        assert abs(mass_flow(corrected_flow(20, 500, 5e5), 500, 5e5) - 20) < 1e-12
+
+    def test_design_point(self):
+        a = build(definition).run()
+        b = build(mapped).run()
+
+        assert abs(a.stream.thrust_total() - b.stream.thrust_total()) < 1e-6
+        assert abs(b['c'].Wc_in/b['c'].Wc - 1) < 1e-12
+
+    def test_offdesign(self):
+        residuals = [map_flow('c'), flow_capacity('t'), shaft_balance('spool'), nozzle_area('core')]
+        d = design(mapped, residuals)
+
+        p = problem(mapped,
+                    unknowns={'gas.mf': 20, 'c.beta': 0.5, 'spool.N': 1, 't.TAU': d['t'].process.TAU},
+                    residuals=residuals,
+                    inputs={'cc.t01': 1250})
+        s = newton(p)
+
+        assert s.converged
+        assert s['spool.N'] < 1 and s['gas.mf'] < 20
+        assert s.model.stream.thrust_total() < d.stream.thrust_total()
+
+    def test_design_speed(self):
+        with open(Path(__file__).parents[1]/'examples'/'definitions'/'turbojet_1s-2s-bleed.json') as f:
+            spec = json.load(f)
+        spec['gas']['m'] = 0.6
+
+        # High pressure compressor and turbine maps
+        spec['components']['c2'] = {'type': 'compressor', 'beta': 0.5,
+                                    'map': {'N': N.tolist(), 'beta': beta.tolist(), 'Wc': Wc.tolist(),
+                                            'PI': (1 + (PI - 1)/3).tolist(), 'eta': eta.tolist()}}
+        spec['components']['t1'] = {'type': 'turbine', 'beta': 0.5,
+                                    'map': {'N': N.tolist(), 'beta': beta.tolist(), 'Wc': Wc.tolist(),
+                                            'PI': (1 + (PI - 1)/6).tolist(), 'eta': (eta + 0.05).tolist()}}
+
+        d = design_speeds(spec)
+        m = build(d).run()
+
+        # Both run on their design speed line at the design point, although
+        # their inlet temperatures differ from the reference temperature
+        assert d['components']['c2']['Nc_design'] < 1 and d['components']['t1']['Nc_design'] < 0.5
+        assert abs(m['c2'].Nc - 1) < 1e-12 and abs(m['t1'].Nc - 1) < 1e-12
+        assert abs(build(spec).run()['c2'].Nc - 1) < 1e-12
+
+        # Off-design, the maps are read relative to the design corrected speed
+        assert abs(build(d, {'hp.N': 0.9}).run()['c2'].Nc - 0.9) < 1e-12
+        assert build(d, {'gas.m': 0}).run()['c2'].Nc > 1
@@ -0,0 +1,187 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import json
+import unittest
+import numpy as np
+
+# Huracan
+from huracan.offdesign import design, problem, newton, sweep, report, continuation_order, output, flow_capacity, shaft_balance, nozzle_area
+
+definition = {
+    'gas':        {'mf': 20, 'm': 0, 't_0': 288.15, 'p_0': 101325,
+                   'cp': {'model': 'piecewise_constant', 'values': [1000, 1150], 'breakpoints': [600]},
+                   'k':  {'model': 'piecewise_constant', 'values': [1.4, 1.33], 'breakpoints': [600]}},
+    'fuels':      {'jet_a': {'LHV': 43e6}},
+    'components': {'i':  {'type': 'inlet', 'PI': 0.98},
+                   'c':  {'type': 'compressor', 'eta': 0.85, 'PI': 10},
+                   'cc': {'type': 'combustion_chamber', 'fuel': 'jet_a', 'eta': 0.98, 'PI': 0.96, 't01': 1400},
+                   't':  {'type': 'turbine', 'eta': 0.9},
+                   'n':  {'type': 'nozzle', 'eta': 0.97}},
+    'shafts':     {'spool': {'components': ['c', 't'], 'eta': 0.99}},
+    'streams':    {'core': ['i', 'c', 'cc', 't', 'n']},
+}
+
+
+def bled(n):
+    """
+    Two-spool turbojet with n bleed flows, diverted in succession
+    after the low pressure compressor.
+    """
+    with open(Path(__file__).parents[1]/'examples'/'definitions'/'turbojet_1s-2s-bleed.json') as f:
+        d = json.load(f)
+
+    d['streams'] = {'main': ['i', 'c1'], 'core': ['c2', 'cc', 't1', 't2', 'n']}
+    d['splits']  = []
+
+    upstream = 'main'
+    for k in range(1, n+1):
+        d['components'][f'bd{k}'] = {'type': 'bleed_duct', 't01': 300 + 10*k, 'eta': 0.95}
+        d['streams'][f'b{k}']     = [f'bd{k}']
+        into = 'core' if k == n else f's{k}'
+        d['splits'].append({'stream': upstream, 'fraction': 0.005, 'into': [into, f'b{k}']})
+        upstream = into
+
+    return d
+
+
+def residuals():
+    return [flow_capacity('t'), shaft_balance('spool'), nozzle_area('core')]
+
+
+class TestsOffDesign(unittest.TestCase):
+
+    def setUp(self):
+        self.residuals = residuals()
+        self.design    = design(definition, self.residuals)
+        self.unknowns  = {'gas.mf': 20, 'c.PI': 10, 't.TAU': self.design['t'].process.TAU}
+
+    def test_batched_evaluation(self):
+        p = problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1300})
+
+        X = np.array([[20, 19, 18], [10, 9, 8], [0.8, 0.8, 0.8]])
+        F, _ = p.evaluate(X)
+
+        for j in range(3):
+            assert np.allclose(F[:, j], p.evaluate(X[:, j])[0][:, 0])
+
+    def test_design_point(self):
+        p = problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1400})
+        s = newton(p)
+
+        assert s.converged and s.iterations == 0
+        assert abs(s.model.stream.thrust_total() - self.design.stream.thrust_total()) < 1e-6
+
+    def test_throttle(self):
+        p = problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1200})
+        s = newton(p)
+
+        assert s.converged
+        assert np.all(np.abs(s.r) < 1e-8)
+        assert s['gas.mf'] < 20 and s['c.PI'] < 10
+        # Choked turbine and nozzle: constant turbine temperature ratio
+        assert abs(s['t.TAU'] - self.unknowns['t.TAU']) < 1e-9
+        assert s.model.stream.thrust_total() < self.design.stream.thrust_total()
+
+    def test_sweep(self):
+        assert np.array_equal(continuation_order(np.array([[1000], [1400], [1100], [1300], [1200]])), [0, 2, 4, 3, 1])
+
+        t01 = np.array([1400, 1000, 1200, 1100, 1300, 1150, 1350, 1050, 1250])
+
+        p = problem(definition, self.unknowns, self.residuals)
+        solutions = sweep(p, {'cc.t01': t01})
+
+        assert all(s.converged for s in solutions)
+        assert p.inputs == {}
+
+        # Continuation: fewer iterations than solving each point from the design point
+        cold = [newton(problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': t})) for t in t01]
+        assert sum(s.iterations for s in solutions) < sum(s.iterations for s in cold)
+
+        for s, c in zip(solutions, cold):
+            assert np.allclose(s.x, c.x, rtol=1e-6)
+
+        # The inputs of the problem are restored when a solve raises
+        def failing(problem, x0=None):
+            raise ArithmeticError
+
+        p = problem(definition, self.unknowns, self.residuals, inputs={'gas.m': 0.2})
+        with self.assertRaises(ArithmeticError):
+            sweep(p, {'cc.t01': t01}, solver=failing)
+        assert p.inputs == {'gas.m': 0.2}
+
+    def test_quasi_newton(self):
+        p = problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1200})
+        n = newton(p)
+
+        for method in ['chord', 'broyden']:
+            s = newton(p, method=method)
+
+            assert s.converged and np.allclose(s.x, n.x, rtol=1e-6)
+            assert s.evaluations < n.evaluations
+            assert len(s.history) == s.iterations + 1
+
+        assert s.report().startswith('Converged in')
+
+        # Reuse of the Jacobian across a sweep
+        t01 = np.linspace(1400, 1000, 9)
+        a = sweep(problem(definition, self.unknowns, self.residuals), {'cc.t01': t01})
+        b = sweep(problem(definition, self.unknowns, self.residuals), {'cc.t01': t01}, method='broyden', reuse=True)
+
+        assert all(s.converged for s in b)
+        assert sum(s.evaluations for s in b) < 2*sum(s.evaluations for s in a)/3
+        assert sum(s.jacobians for s in b) == 1
+        assert report(b).startswith('9/9 points converged')
+
+        # No Jacobian is evaluated at converged points
+        assert a[0].iterations == 0 and a[0].jacobians == 0 and a[0].evaluations == 1
+
+        # Steps of a stale Jacobian which fail are retried within the same iteration
+        s = newton(p, method='chord', J0=-n.J, maxiter=8)
+        assert s.converged and s.jacobians >= 1 and np.all(np.diff(s.history) < 0)
+        assert len(s.history) == s.iterations + 1
+
+    def test_step_halving(self):
+        p = problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1000})
+
+        # Full Newton steps overshoot, increasing the residuals and then leaving the engine unable to run
+        s = newton(p, max_change=1, halvings=0)
+        assert not s.converged and s.history[1] > s.history[0]
+
+        s = newton(p, max_change=1)
+        assert s.converged and np.all(np.diff(s.history) <= 0)
+
+    def test_sparse(self):
+        n = 4
+        d = bled(n)
+        r = [flow_capacity('t1'), flow_capacity('t2'), shaft_balance('lp'), shaft_balance('hp'), nozzle_area('core')] + \
+            [output(f'bd{k}.Q_out') for k in range(1, n+1)]
+        m = design(d, r)
+        u = {'gas.mf': 160, 'c1.PI': 4, 'c2.PI': 4, 't1.TAU': m['t1'].process.TAU, 't2.TAU': m['t2'].process.TAU,
+             **{f'bd{k}.t01': 300 for k in range(1, n+1)}}
+
+        dense  = problem(d, u, r, inputs={'cc.t01': 1350})
+        sparse = problem(d, u, r, inputs={'cc.t01': 1350}, sparse=True)
+
+        pattern, groups = sparse.structure()
+
+        # Each bleed flow only affects its own residual
+        assert np.array_equal(pattern[5:, 5:], np.eye(n, dtype=bool))
+        assert not np.any(pattern[:5, 5:])
+        # The bleed flows are perturbed together with the high pressure turbine
+        assert len(groups) == 5 and sorted(groups[2]) == [2, 5, 6, 7, 8]
+
+        # The pattern holds all non-zero entries of the Jacobian
+        J, _ = dense.jacobian(dense.x0)
+        assert np.all(pattern | (J == 0))
+        assert np.allclose(sparse.jacobian(sparse.x0)[0], J)
+
+        a, b = newton(dense), newton(sparse)
+        assert a.converged and b.converged
+        assert np.allclose(a.x, b.x) and b.evaluations < a.evaluations
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+import numpy as np
+
+# Huracan
+from huracan.cache import cache
+from huracan.optimize import optimize, constraint, evaluator
+
+from tests.test_offdesign import definition
+
+variables   = {'c.PI': (4, 40), 'cc.t01': (1100, 1700)}
+constraints = [constraint('cc.t0', upper=1500), constraint('thrust_total', lower=15e3)]
+
+try:
+    import scipy
+except ImportError:
+    scipy = None
+
+
+class TestsOptimize(unittest.TestCase):
+
+    def test_evaluator(self):
+        f = evaluator(definition, ['c.PI'], ['sfc', 'thrust_total'], values={'gas.m': 0.5})
+
+        X = np.array([[5.], [10.], [5.], [1e-3]])
+        Y = f(X)
+
+        # Repeated points are evaluated once, and points where the engine cannot be run are not finite
+        assert f.evaluations == 3 and np.array_equal(Y[0], Y[2]) and np.all(np.isnan(Y[3]))
+        f(X[:2])
+        assert f.evaluations == 3
+
+    @unittest.skipIf(scipy is None, 'SciPy is not available')
+    def test_slsqp(self):
+        r = optimize(definition, 'sfc', variables, constraints, values={'gas.m': 0.5}, method='slsqp')
+
+        assert r.feasible
+        # Both constraints are active at the optimum
+        assert abs(r.outputs['cc.t0'] - 1500) < 1e-3 and abs(r.outputs['thrust_total'] - 15e3) < 1
+        assert r.runs < r.evaluations
+
+    def test_evolution(self):
+        c = cache(maxsize=2**16)
+        r = optimize(definition, 'sfc', variables, constraints, values={'gas.m': 0.5}, method='evolution',
+                     population=20, seed=1, cache=c)
+
+        assert r.feasible and abs(r['cc.t01'] - 1500) < 1 and 19 < r['c.PI'] < 20.5
+        assert r.runs <= r.iterations + 1 + 10
+
+        # Repeated optimizations are served from the cache
+        again = optimize(definition, 'sfc', variables, constraints, values={'gas.m': 0.5}, method='evolution',
+                         population=20, seed=1, cache=c)
+        assert again.evaluations == 0 and again.x == r.x
+
+    def test_maximize(self):
+        r = optimize(definition, 'thrust_total', {'c.PI': (4, 40)}, [constraint('sfc', upper=3e-5)],
+                     values={'gas.m': 0.5}, method='evolution', population=10, seed=0, maxiter=30)
+        s = optimize(definition, 'thrust_total', {'c.PI': (4, 40)}, values={'gas.m': 0.5},
+                     method='evolution', population=10, seed=0, maxiter=30)
+
+        assert r.feasible and r.outputs['sfc'] <= 3e-5*(1 + 1e-6)
+        assert s.objective >= r.objective
+
+        # The history records the objective when maximizing, not its sign-flipped counterpart
+        t = optimize(definition, 'thrust_total', {'c.PI': (4, 40)}, maximize=True, values={'gas.m': 0.5},
+                     method='evolution', population=10, seed=0, maxiter=30)
+        assert t.objective > s.objective and np.all(np.diff(t.history) >= 0)
+        assert np.isclose(t.history[-1], t.objective)
+
+    def test_no_iterations(self):
+        r = optimize(definition, 'sfc', variables, values={'gas.m': 0.5}, method='evolution',
+                     population=10, seed=0, maxiter=0)
+
+        assert r.iterations == 0 and r.history == [] and np.isfinite(r.objective)
@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+import numpy as np
+
+# Huracan
+from huracan.definition import build
+from huracan.pareto import matrix, nondominated, ranks, crowding, hypervolume, front
+
+from tests.test_offdesign import definition
+
+
+def brute_force(F):
+    """
+    First front by comparison of all pairs of points.
+    """
+    finite = np.all(np.isfinite(F), axis=1)
+    G      = F[finite]
+    first  = np.zeros(len(F), dtype=bool)
+    first[finite] = [not np.any(np.all(G <= g, axis=1) & np.any(G < g, axis=1)) for g in G]
+    return first
+
+
+class TestsPareto(unittest.TestCase):
+
+    def test_nondominated(self):
+        rng = np.random.default_rng(0)
+        for m in [1, 2, 3, 5]:
+            for _ in range(10):
+                # Coarse values, so that there are ties and repeated points
+                F = rng.integers(0, 6, (80, m)).astype(float)
+                F[rng.random(80) < 0.05] = np.nan
+                assert np.array_equal(nondominated(F), brute_force(F))
+
+    def test_ranks(self):
+        F = np.array([[0, 3], [1, 2], [2, 2], [3, 0], [3, 3], [np.nan, 0]])
+        assert np.array_equal(ranks(F), [0, 0, 1, 0, 2, -1])
+
+    def test_metrics(self):
+        assert np.array_equal(crowding([[0, 3], [1, 2], [2, 1], [3, 0]]), [np.inf, 4/3, 4/3, np.inf])
+
+        assert hypervolume([[0, 0.5], [0.5, 0]], [1, 1]) == 0.75
+        # Dominated points and points beyond the reference do not contribute
+        assert hypervolume([[0, 0.5], [0.5, 0], [0.6, 0.6], [2, 0]], [1, 1]) == 0.75
+        assert abs(hypervolume([[0, 0.5, 0.5], [0.5, 0, 0.5], [0.5, 0.5, 0]], [1, 1, 1]) - 0.5) < 1e-12
+
+    def test_front(self):
+        PI      = np.linspace(2, 40, 39)
+        model   = build(definition, {'gas.m': 0.5, 'c.PI': PI}).run()
+        results = {'c.PI': PI, **model.results(['thrust_total', 'sfc']), 'Mach': 0.5}
+
+        F = matrix(results, ['thrust_total', 'sfc'], maximize=['thrust_total'])
+        assert np.array_equal(F[:, 0], -results['thrust_total'])
+
+        p = front(results, ['thrust_total', 'sfc'], maximize=['thrust_total'])
+        assert np.array_equal(np.sort(p['c.PI']), PI[brute_force(F)]) and p['Mach'] == 0.5
+        assert np.all(np.diff(p['thrust_total']) <= 0) and len(p['crowding']) == len(p['c.PI'])
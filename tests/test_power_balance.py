@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+import numpy as np
+from copy import deepcopy
+
+# Huracan
+from huracan.definition import build, load
+
+from tests.test_offdesign import definition
+
+
+class TestsPowerBalance(unittest.TestCase):
+
+    def test_shared_shaft(self):
+        d = deepcopy(definition)
+        d['components'].pop('t')
+        d['components']['ta'] = {'type': 'turbine', 'eta': 0.9}
+        d['components']['tb'] = {'type': 'turbine', 'eta': 0.9}
+        d['shafts']['spool']['components'] = ['c', 'ta', 'tb']
+        d['streams']['core'] = ['i', 'c', 'cc', 'ta', 'tb', 'n']
+
+        m  = build(d).run()
+        pb = m.stream.power_balance()
+
+        # Both turbines power the shaft together
+        assert np.allclose(pb.A, [[0.5], [0.5]])
+        assert abs(m['ta'].w - m['tb'].w) < 1e-6
+        assert abs(pb.imbalance()[0]) < 1e-6*m['spool'].w_r()
+
+    def test_fixed_turbine(self):
+        d = deepcopy(definition)
+        d['components'].pop('t')
+        d['components']['ta'] = {'type': 'turbine', 'eta': 0.9, 'TAU': 0.9}
+        d['components']['tb'] = {'type': 'turbine', 'eta': 0.9}
+        d['shafts']['spool']['components'] = ['c', 'ta', 'tb']
+        d['streams']['core'] = ['i', 'c', 'cc', 'ta', 'tb', 'n']
+
+        m  = build(d).run()
+        pb = m.stream.power_balance()
+
+        # The free turbine provides the power not extracted by the fixed one
+        assert pb.turbines == [m['tb']] and pb.fixed == [m['ta']] and np.allclose(pb.F, [[1]])
+        assert -m['ta'].w < m['spool'].w_r() and abs(pb.imbalance()[0]) < 1e-6*m['spool'].w_r()
+
+        # Single linear map of the shaft and fixed turbine power, the chamber
+        # heating both turbines providing the net power required by the shaft
+        assert np.allclose(pb.L, [[1, -1], [0, 1]]) and np.allclose(pb.Q, [[1, 0]])
+        assert abs(m['cc'].Q_min() - m['spool'].w_r()) < 1e-6*m['spool'].w_r()
+
+        # The balance is built once per run
+        assert m.stream.power_balance() is pb
+        m.stream.rerun()
+        assert m.stream.power_balance() is not pb
+
+        # Fixed turbines must be run before the free turbines of their shaft
+        d['streams']['core'] = ['i', 'c', 'cc', 'tb', 'ta', 'n']
+        self.assertRaises(AssertionError, build(d).run)
+
+    def test_shared_turbine(self):
+        d = deepcopy(definition)
+        d['components']['cc']  = {'type': 'combustion_chamber', 'fuel': 'jet_a', 'eta': 0.98, 'PI': 0.96}
+        d['components']['cc2'] = {'type': 'combustion_chamber', 'fuel': 'jet_a', 'eta': 0.98, 'PI': 0.96}
+        d['streams']['core']   = ['i', 'c', 'cc', 'cc2', 't', 'n']
+
+        m = build(d).run()
+
+        # The heat required by the turbine is provided once, by both chambers
+        assert np.allclose(m.stream.power_balance().B, [[0.5], [0.5]])
+        assert abs((m['cc'].Q + m['cc2'].Q)*0.98 - m['spool'].w_r()) < 1e-6*m['spool'].w_r()
+
+    def test_multi_spool(self):
+        m  = build(load(Path(__file__).parents[1]/'examples'/'definitions'/'turbojet_1s-2s-bleed.json')).run()
+        pb = m.stream.power_balance()
+
+        assert set(pb.shafts) == {m['lp'], m['hp']}
+        assert pb.A.shape == (2, 2) and pb.B.shape == (1, 2)
+        assert np.allclose(pb.imbalance(), 0, atol=1e-6*m['hp'].w_r())
+        assert abs(m['cc'].Q_min() - m['lp'].w_r() - m['hp'].w_r()) < 1e-6*m['hp'].w_r()
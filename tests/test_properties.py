@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import pickle
+import unittest
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Huracan
+from huracan.engine import shaft
+from huracan.thermo.fluids import gas, fuel
+from huracan.thermo.properties import constant, piecewise_constant, polynomial, tabulated, mixed
+from huracan.components import inlet, fan, compressor, intercooler, combustion_chamber, turbine, nozzle
+
+
+def turbofan(t01=1838):
+    g = gas(mf=1440,
+            cp=piecewise_constant(values=[1000, 1150], breakpoints=[1000]),
+            k=piecewise_constant(values=[1.4, 1.33], breakpoints=[1000]),
+            m=0.4, t_0=281.65, p_0=89874)
+
+    i  = inlet             (PI=0.98)
+    fn = fan               (eta=0.94,  PI=1.54)
+    c1 = compressor        (eta=0.991, PI=9.61)
+    ic = intercooler       (eta=0.95,  Q_out=15e6)
+    c2 = compressor        (eta=0.92,  PI=3.38)
+    cc = combustion_chamber(fuel=fuel(LHV=43e6), eta=0.985, PI=0.99, t01=t01)
+    t1 = turbine           (eta=0.96)
+    t2 = turbine           (eta=0.965)
+    t3 = turbine           (eta=0.97)
+    nc = nozzle            (eta=0.95)
+    nf = nozzle            (eta=0.96)
+
+    shaft(fn, t3, eta=0.995)
+    shaft(c1, t2, eta=0.995)
+    shaft(c2, t1, eta=0.995)
+
+    s = g-i-fn
+    core, bypass = s*(9.6/10.6)
+    core-c1-ic-c2-cc-t1-t2-t3-nc
+    bypass-nf
+
+    return s
+
+
+def thrust(s):
+    s.run(log=False)
+    return s.thrust_total()
+
+
+class TestsProperties(unittest.TestCase):
+
+    def test_models(self):
+        T = np.array([300., 600., 601., 1200.])
+
+        pc = piecewise_constant(values=[1000, 1150], breakpoints=[600])
+        assert [pc(t) for t in T] == [1150 if t > 600 else 1000 for t in T]
+        assert np.all(pc(T) == np.array([1000, 1000, 1150, 1150]))
+
+        p = polynomial([1000, 0.1, 1e-4])
+        assert abs(p(500) - (1000 + 0.1*500 + 1e-4*500**2)) < 1e-9
+
+        tb = tabulated(T=[300, 1000], values=[1000, 1200])
+        assert tb(650) == 1100 and tb(200) == 1000 and tb(2000) == 1200
+
+        mx = mixed([constant(1000), tb], [1, 3])
+        assert mx(650) == (1000 + 3*1100)/4
+        assert isinstance(pc(300.), float)
+
+    def test_pickle_models(self):
+        for m in [constant(1.4),
+                  piecewise_constant(values=[1.4, 1.33], breakpoints=[600]),
+                  polynomial([1000, 0.1]),
+                  tabulated(T=[300, 1000], values=[1000, 1200]),
+                  mixed([constant(1000), polynomial([1000, 0.1])], [1, 2])]:
+            assert pickle.loads(pickle.dumps(m))(700) == m(700)
+
+    def test_pickle_system(self):
+        s = turbofan()
+        reference = thrust(turbofan())
+
+        # Before running
+        r = pickle.loads(pickle.dumps(s))
+        assert abs(thrust(r) - reference) < 1e-6
+
+        # After running
+        r = pickle.loads(pickle.dumps(r))
+        assert r.run.__self__ is r.system
+        assert abs(r.thrust_total() - reference) < 1e-6
+
+    def test_process_pool(self):
+        engines = [turbofan(t01) for t01 in [1700, 1838]]
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(thrust, engines))
+
+        assert abs(results[1] - thrust(turbofan())) < 1e-6
+        assert results[0] < results[1]
@@ -0,0 +1,51 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+import tempfile
+import numpy as np
+
+# Huracan
+from huracan.realtime import plan, realtime
+
+from tests.test_transient import simulation
+
+
+class TestsRealTime(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sim  = simulation()
+        cls.plan = plan(cls.sim, {'spool.N': np.linspace(0.85, 1, 31), 'cc.t01': np.array([1250, 1350])})
+
+    def test_step(self):
+        r  = self.sim.run(t_end=1, dt=1e-2, method='euler')
+        rt = realtime(self.plan, dt=1e-2, x0=[r['spool.N'][0]], u0=[1250], method='euler')
+
+        N = [rt.x[0]]
+        for k in range(100):
+            N.append(rt.step([1250 + 100*(k*1e-2 > 0.1)])[0])
+
+        assert np.max(np.abs(np.array(N) - r['spool.N'])) < 1e-3
+        assert abs(rt.y[0] - r['thrust_total'][-2]) < 1e-2*r['thrust_total'][-2]
+
+        latency = rt.latency()
+        assert latency['steps'] == 100 and latency['worst'] >= latency['mean'] > 0
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as d:
+            self.plan.save(Path(d)/'turbojet.npz')
+            p = plan.load(Path(d)/'turbojet.npz')
+
+        assert p.states == ['spool.N'] and p.inputs == ['cc.t01'] and p.outputs == self.plan.outputs
+
+        a = realtime(self.plan, dt=1e-2, x0=[0.9], u0=[1300])
+        b = realtime(p, dt=1e-2, x0=[0.9], u0=[1300])
+        for _ in range(10):
+            assert np.array_equal(a.step(), b.step())
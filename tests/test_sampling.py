@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+import numpy as np
+
+# Huracan
+from huracan.definition import build
+from huracan.sampling import sampler
+
+from tests.test_offdesign import definition
+
+
+class TestsSampling(unittest.TestCase):
+
+    def test_refinement(self):
+        s = sampler(definition, {'c.PI': (1.2, 30)}, tol=1e-3, min_size=1/256)
+        r = s.run()
+        assert s.converged and s.error <= 1
+
+        # Fewer samples than a uniform grid of the smallest cell size
+        n = len(r['c.PI'])
+        assert n < 257/4 and s.f.runs <= s.iterations + 1
+
+        # Samples are denser where the outputs change fastest, at low pressure ratios
+        x = np.sort(r['c.PI'])
+        assert np.diff(x)[0] < np.diff(x)[-1]/4
+
+        # Linear interpolation of the samples is within tolerance of the outputs
+        PI = np.linspace(3, 30, 200)
+        Y  = build(definition, {'c.PI': PI}).run().results(['sfc', 'thrust_total'])
+        for o in ['sfc', 'thrust_total']:
+            i = np.argsort(r['c.PI'])
+            e = np.interp(PI, r['c.PI'][i], r[o][i]) - Y[o]
+            assert np.max(np.abs(e)) <= 4e-3*np.ptp(r[o])
+
+    def test_choking(self):
+        s = sampler(definition, {'c.PI': (1.2, 30), 'gas.m': (0, 0.9)}, tol=1e-2, min_size=1/64)
+        r = s.run()
+        assert s.converged and r['choked'].dtype == bool and np.any(r['choked']) and not np.all(r['choked'])
+
+        # The choking boundary is resolved down to the smallest cell size
+        i = np.argsort(r['c.PI'])
+        m = r['gas.m'][i] == 0
+        x, choked = r['c.PI'][i][m], r['choked'][i][m]
+        k = np.flatnonzero(np.diff(choked))
+        assert len(k) == 1 and x[k[0] + 1] - x[k[0]] <= 28.8/64 + 1e-9
+
+    def test_budget(self):
+        s = sampler(definition, {'c.PI': (1.2, 30), 'gas.m': (0, 0.9)}, tol=1e-4, max_points=100)
+        r = s.run()
+        assert not s.converged and len(r['c.PI']) <= 100
@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+
+# Huracan
+from huracan.engine import shaft
+from huracan.thermo.fluids import gas, fuel, snapshot
+from huracan.components import inlet, compressor, combustion_chamber, turbine, afterburner, nozzle
+
+
+def turbojet(t01_ab=1850, eta_n=0.95):
+    g = gas(mf=160,
+            cp=lambda T: 1150 if T > 600 else 1000,
+            k=lambda T: 1.33 if T > 600 else 1.4,
+            m=0, t_0=288, p_0=101325)
+
+    i  = inlet(PI=0.92)
+    c1 = compressor(eta=0.85, PI=4)
+    c2 = compressor(eta=0.85, PI=4)
+    cc = combustion_chamber(fuel(LHV=43e6), eta=0.97, t01=1450)
+    t1 = turbine(0.9)
+    t2 = turbine(0.9)
+    ab = afterburner(fuel(LHV=43e6), eta=0.95, t01=t01_ab)
+    n  = nozzle(eta_n)
+
+    shaft(c1, t2, eta=0.99)
+    shaft(c2, t1, eta=0.99)
+
+    return g-i-c1-c2-cc-t1-t2-ab-n
+
+
+class TestsSnapshots(unittest.TestCase):
+
+    def test_snapshots(self):
+        s = turbojet()
+        s.run(log=False)
+
+        assert len(s.snapshots) == len(s.components) + 1
+        assert all([isinstance(state, snapshot) for state in s.snapshots])
+        assert s.snapshots[-1].t0 == s.gas.t0
+        assert s.snapshots[3].t0 == s['0.cp2'].t0
+
+        with self.assertRaises(AttributeError):
+            s.snapshots[0].t0 = 0
+
+    def test_from_snapshot(self):
+        s = turbojet()
+        s.run(log=False)
+
+        g = gas.from_snapshot(s.snapshots[4])
+
+        assert g.t0 == s['0.cc'].t0
+        assert g.p0 == s['0.cc'].p0
+        assert g.H  == s['0.cc'].H
+
+    def test_rerun(self):
+        s = turbojet()
+        s.run(log=False)
+
+        s['0.ab'].t01 = 1700
+        s['0.nz'].eta = 0.9
+        s.rerun('0.ab', log=False)
+
+        r = turbojet(t01_ab=1700, eta_n=0.9)
+        r.run(log=False)
+
+        assert abs(s.gas.t0 - r.gas.t0) < 1e-9
+        assert abs(s.gas.p0 - r.gas.p0) < 1e-6
+        assert abs(s.thrust_total() - r.thrust_total()) < 1e-6
+        assert abs(s.fmf() - r.fmf()) < 1e-9
+
+    def test_system_rerun(self):
+        g = gas(mf=700,
+                cp=lambda T: 1150 if T > 600 else 1000,
+                k=lambda T: 1.33 if T > 600 else 1.4,
+                m=0.6, t_0=288, p_0=101325)
+
+        s = g-inlet(PI=0.98)-compressor(eta=0.9, PI=1.5)
+        core, bypass = s*0.8
+        core-nozzle(eta=0.95)
+        bypass-nozzle(eta=0.95)
+
+        s.run(log=False)
+        thrust = s.thrust_total()
+
+        # Same compressor: the system is unchanged
+        s.rerun('0.cp', log=False)
+        assert abs(s.thrust_total() - thrust) < 1e-6
+
+        # Less efficient nozzle in the bypass stream only
+        bypass['1.s.nz'].eta = 0.9
+        s.rerun('1.s.nz', log=False)
+        assert s.thrust_total() < thrust
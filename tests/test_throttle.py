@@ -0,0 +1,60 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+from copy import deepcopy
+import numpy as np
+
+# Huracan
+from huracan.definition import build
+from huracan.throttle import match
+
+from tests.test_offdesign import definition
+
+
+class TestsThrottle(unittest.TestCase):
+
+    def test_thrust(self):
+        m = np.array([0, 0.2, 0.3, 0])
+        r = match(definition, 'thrust_total', np.array([11e3, 14e3, 17e3, 25e3]), inputs={'gas.m': m}, limit=1600)
+
+        assert np.array_equal(r['converged'], [True, True, True, False])
+        assert np.array_equal(r['limited'], [False, False, False, True])
+        assert np.allclose(r['thrust_total'][:3], [11e3, 14e3, 17e3], rtol=1e-6)
+        assert r['cc.t01'][3] == 1600
+
+        # Scalar runs at the matched throttle settings
+        for k in range(4):
+            e = build(definition, {'gas.m': m[k], 'cc.t01': r['cc.t01'][k]}).run()
+            assert abs(e.stream.thrust_total() - r['thrust_total'][k]) < 1e-6*r['thrust_total'][k]
+            assert abs(e['cc'].fuel.mf - r['cc.fuel.mf'][k]) < 1e-9
+
+    def test_sfc(self):
+        r = match(definition, 'sfc', 2.4e-5, bounds=(900, 1800))
+
+        assert r['converged'][0] and abs(r['sfc'][0]/2.4e-5 - 1) < 1e-6
+
+    def test_fuel_flow(self):
+        r = match(definition, 'thrust_total', 12e3, control='cc.fuel.mf', bounds=(0.2, 0.8), inputs={'cc.t01': None})
+
+        assert r['converged'][0] and abs(r['thrust_total'][0]/12e3 - 1) < 1e-6
+
+        # The matched turbine inlet temperature is returned with the fuel flow
+        t = match(definition, 'thrust_total', 12e3, bounds=(900, 1800))
+        assert abs(r['cc.t01'][0] - t['cc.t01'][0]) < 1e-3 and abs(r['cc.fuel.mf'][0] - t['cc.fuel.mf'][0]) < 1e-8
+
+    def test_combustor_name(self):
+        d = deepcopy(definition)
+        d['components']['b'] = d['components'].pop('cc')
+        d['streams']['core'] = ['i', 'c', 'b', 't', 'n']
+
+        r = match(d, 'thrust_total', 12e3, control='b.t01', bounds=(900, 1800))
+
+        # The fuel flow of the throttled combustor is returned whatever its name
+        assert r['converged'][0] and 'b.fuel.mf' in r and 'cc.fuel.mf' not in r
@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import unittest
+import numpy as np
+from copy import deepcopy
+
+# Huracan
+from huracan.offdesign import design, map_flow, flow_capacity, nozzle_area
+from huracan.transient import transient, volume, ensemble
+
+from tests.test_maps import mapped
+
+dynamic = deepcopy(mapped)
+dynamic['shafts']['spool'].update({'I': 0.5, 'omega': 1500})
+
+
+def simulation(volumes=None):
+    residuals = [map_flow('c'), nozzle_area('core')] + ([] if volumes else [flow_capacity('t')])
+    d = design(dynamic, residuals + (volumes or []))
+    return transient(dynamic,
+                     unknowns={'gas.mf': 20, 'c.beta': 0.5, 't.TAU': float(d['t'].process.TAU)},
+                     residuals=residuals,
+                     inputs={'cc.t01': lambda t: 1250 + 100*(t > 0.1)},
+                     volumes=volumes)
+
+
+class TestsTransient(unittest.TestCase):
+
+    def test_acceleration(self):
+        sim = simulation()
+        r   = sim.run(t_end=2, dt=1e-2)
+
+        N, _ = sim.steady(t=2)
+
+        assert r['t'].shape == r['spool.N'].shape == r['thrust_total'].shape == (201,)
+        # Steady until the throttle step, then accelerating towards the new steady state
+        assert np.allclose(r['spool.N'][:10], r['spool.N'][0])
+        assert np.all(np.diff(r['spool.N'][11:]) > 0)
+        assert abs(r['spool.N'][-1] - N[0]) < 1e-3
+        assert r['thrust_total'][-1] > r['thrust_total'][0]
+
+        # The engine is built once for single points and once for Jacobians
+        assert len(sim.problem.models) == 2
+
+    def test_failed_solve(self):
+        sim = simulation()
+        # Throttle cut below the lowest temperature at which the engine can be matched
+        sim.inputs['cc.t01'] = lambda t: 1250 if t < 0.1 else 700
+
+        with self.assertWarns(UserWarning):
+            r = sim.run(t_end=1, dt=1e-2)
+
+        # The simulation stops at the first step whose unknowns cannot be solved for
+        assert np.all(r['converged'][:-1]) and not r['converged'][-1]
+        assert len(r['t']) < 101 and r['t'][-1] >= 0.1
+        # Jacobians of failed solves are not kept
+        assert np.all(np.isfinite(sim.J))
+
+    def test_adaptive(self):
+        sim   = simulation()
+        fixed = sim.run(t_end=2, dt=1e-2, method='rk4')
+        r     = sim.run(t_end=2, dt=1e-2, rtol=1e-4)
+
+        assert r['t'][-1] == 2 and len(r['t']) < len(fixed['t'])
+        assert abs(np.interp(1, r['t'], r['spool.N']) - np.interp(1, fixed['t'], fixed['spool.N'])) < 1e-3
+
+    def test_volume(self):
+        v   = volume('t', 0.05)
+        sim = simulation([v])
+        r   = sim.run(t_end=0.2, dt=1e-3)
+
+        # Mass stored in the volume at steady state
+        assert np.allclose(r['t.m'][:100], r['t.m'][0])
+        assert abs(r['t.m'][-1] - r['t.m'][0]) > 1e-4
+        assert r['spool.N'][-1] > r['spool.N'][0]
+
+    def test_ensemble(self):
+        sim = simulation()
+        I   = np.linspace(0.25, 1, 7)
+        e   = ensemble(sim, {'spool.I': I})
+        r   = e.run(t_end=1, dt=1e-2)
+        s   = sim.run(t_end=1, dt=1e-2)
+
+        assert r['spool.N'].shape == r['thrust_total'].shape == (101, 7) and np.all(r['converged'])
+        # Engine of the ensemble with the inertia of the single engine
+        assert np.max(np.abs(r['spool.N'][:, 2] - s['spool.N'])) < 1e-6
+        # Lighter spools accelerate faster
+        assert np.all(np.diff(r['spool.N'][50]) < 0)
+
+        # Degraded turbines
+        x, _ = ensemble(sim, {'t.eta': np.array([0.86, 0.88, 0.9])}).steady()
+        assert np.all(np.diff(x[0]) > 0)
+
+    def test_linearize(self):
+        sim = simulation()
+        t01 = np.linspace(1100, 1400, 50)
+        ss  = ensemble(sim, {'cc.t01': t01}).linearize(['cc.t01'])
+
+        assert ss['A'].shape == (50, 1, 1) and ss['B'].shape == (50, 1, 1)
+        assert ss['C'].shape == ss['D'].shape == (50, 2, 1)
+        # Stable spool dynamics
+        assert np.all(ss['A'] < 0)
+
+        # Central differences of fully matched engines
+        i, d = 20, 1e-4
+        x, z = ss['x'][:, i], ss['z'][:, i]
+        fp, _ = sim.derivatives(0, x + d, z, inputs={'cc.t01': t01[i]})
+        fm, _ = sim.derivatives(0, x - d, z, inputs={'cc.t01': t01[i]})
+        assert abs((fp - fm)[0]/(2*d) - ss['A'][i, 0, 0]) < 1e-4*abs(ss['A'][i, 0, 0])
+
+        # The engine model is reused by later evaluations: its outputs are read at once
+        fp, p = sim.derivatives(0, x, z, inputs={'cc.t01': t01[i] + 0.1})
+        Tp    = p.model.stream.thrust_total()
+        fm, m = sim.derivatives(0, x, z, inputs={'cc.t01': t01[i] - 0.1})
+        Tm    = m.model.stream.thrust_total()
+        assert abs((fp - fm)[0]/0.2 - ss['B'][i, 0, 0]) < 1e-4*abs(ss['B'][i, 0, 0])
+        dT = (Tp - Tm)/0.2
+        assert abs(dT - ss['D'][i, 0, 0]) < 1e-4*abs(dT)
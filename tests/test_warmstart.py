@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: © 2024 Antonio López Rivera <antonlopezr99@gmail.com>
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Path
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parents[1]))
+
+# General imports
+import pickle
+import unittest
+import tempfile
+import numpy as np
+from copy import deepcopy
+
+# Huracan
+from huracan.offdesign import design, problem, newton, sweep, output
+from huracan.warmstart import database
+
+from tests.test_offdesign import definition, residuals
+
+
+class TestsWarmStart(unittest.TestCase):
+
+    def setUp(self):
+        self.residuals = residuals()
+        self.unknowns  = {'gas.mf': 20, 'c.PI': 10, 't.TAU': design(definition, self.residuals)['t'].process.TAU}
+
+    def test_nearest(self):
+        with tempfile.TemporaryDirectory() as d:
+            db = database(Path(d)/'warmstart.sqlite')
+            p  = problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1100})
+
+            assert db.nearest(p) is None
+
+            sweep(p, {'cc.t01': np.linspace(1400, 1000, 5)}, database=db)
+            assert len(db) == 5
+
+            # A new session starts from the closest stored solution
+            db = pickle.loads(pickle.dumps(db))
+            s  = newton(p)
+            assert np.allclose(db.nearest(p), s.x)
+            assert np.allclose(db.nearest(p, {'cc.t01': 1130}), s.x)
+
+            w = db.solve(problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1150}))
+            c = newton(problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1150}))
+            assert w.converged and w.evaluations < c.evaluations
+            assert len(db) == 6
+
+    def test_index(self):
+        with tempfile.TemporaryDirectory() as d:
+            db = database(Path(d)/'warmstart.sqlite')
+            a  = db.solve(problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1200}))
+
+            # Edited engines start from the solutions of structurally identical ones
+            edited = deepcopy(definition)
+            edited['components']['c']['eta'] = 0.86
+
+            p = problem(edited, self.unknowns, self.residuals, inputs={'cc.t01': 1200})
+            assert np.allclose(db.nearest(p), a.x)
+
+            w = db.solve(p)
+            c = newton(problem(edited, self.unknowns, self.residuals, inputs={'cc.t01': 1200}))
+            assert w.converged and w.evaluations < c.evaluations
+
+            # Solutions of the same engine definition are preferred
+            assert np.allclose(db.nearest(problem(edited, self.unknowns, self.residuals, inputs={'cc.t01': 1300})), w.x)
+            assert np.allclose(db.nearest(problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1300})), a.x)
+
+            # Solutions are kept apart by engine structure, unknowns, residuals and inputs
+            bled = deepcopy(definition)
+            bled['components']['bd'] = {'type': 'bleed_duct', 't01': 300, 'eta': 0.95}
+            bled['streams']['bleed'] = ['bd']
+            bled['splits']           = [{'stream': 'core', 'fraction': 0.01, 'into': ['core', 'bleed']}]
+
+            assert db.nearest(problem(bled, self.unknowns, self.residuals, inputs={'cc.t01': 1200})) is None
+            assert db.nearest(problem(definition, self.unknowns, self.residuals[:2] + [output('sfc')], inputs={'cc.t01': 1200})) is None
+            assert db.nearest(problem(definition, self.unknowns, self.residuals, inputs={'gas.m': 0.5})) is None
+
+    def test_sweep_inputs(self):
+        with tempfile.TemporaryDirectory() as d:
+            db = database(Path(d)/'warmstart.sqlite')
+            p  = problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1200})
+
+            # Swept inputs not among those of the problem
+            s = sweep(p, {'gas.m': np.array([0, 0.2, 0.4])}, database=db)
+            assert len(db) == 3 and p.inputs == {'cc.t01': 1200}
+
+            assert db.nearest(p) is None
+            q = problem(definition, self.unknowns, self.residuals, inputs={'cc.t01': 1200, 'gas.m': 0.21})
+            assert np.allclose(db.nearest(q), s[1].x)